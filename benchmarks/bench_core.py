@@ -0,0 +1,312 @@
+"""Benchmarks of the core GA hot paths.
+
+Every benchmark runs over a grid of population sizes, chromosome lengths,
+gene types and storage modes ("object" for gobjs2.Population of Chromosome
+objects, "compact" for gobjs2.CompactChromosome objects, "matrix" for
+gobjs2.PopulationMatrix). Times are the best of
+``--repeat`` runs; peak memory is measured with tracemalloc in a separate
+run, so tracing does not distort the times. Results are written as JSON
+and can be compared with a previous run:
+
+    python benchmarks/bench_core.py --output new.json --compare old.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "galgopy"))
+
+import evaluators
+import gobjs2
+import gtypes
+
+################################################################################
+
+GENE_TYPES = {
+    "binary": (gtypes.BinaryType(), 1),
+    "int": (gtypes.IntType(0, 9), 0),
+    "float": (gtypes.FloatType(0, 9, 2), 0.0),
+    "str": (gtypes.StrType(), "a"),
+}
+MODES = ("object", "compact", "matrix")
+CROSSOVERS = {
+    "one_point": (gobjs2.OnePointCrossover, {}),
+    "multipoint": (gobjs2.MultipointCrossover, {"cut_points_count": 3}),
+    "uniform": (gobjs2.UniformCrossover, {}),
+}
+
+
+def make_population(mode, size, length, gene_type):
+    ct = gobjs2.ChromosomeTemplate([gene_type] * length)
+    if mode == "matrix":
+        return gobjs2.PopulationMatrix.generate_random_population(size, ct)
+    return gobjs2.Population.generate_random_population(
+        size, ct, compact=mode == "compact"
+    )
+
+
+def make_fitness(mode, target):
+    if mode == "object":
+        return (
+            lambda c: len([g for g in c.genes_list if g.value == target]),
+            evaluators.SerialEvaluator(),
+        )
+    if mode == "compact":
+        return lambda c: c.values.count(target), evaluators.SerialEvaluator()
+    return (
+        lambda genomes: (genomes == target).sum(axis=1),
+        evaluators.BatchEvaluator(),
+    )
+
+
+def evaluated_population(mode, size, length, gene_type, target):
+    population = make_population(mode, size, length, gene_type)
+    func, evaluator = make_fitness(mode, target)
+    population.fitness(func, evaluator=evaluator)
+    return population
+
+
+def parents_of(population):
+    if isinstance(population, gobjs2.PopulationMatrix):
+        return population
+    return population.chromosome_list
+
+
+################################################################################
+# Each benchmark returns (setup, run): ``setup()`` builds the input outside
+# of the timed region and ``run(data)`` is the measured call.
+
+
+def bench_generate(mode, size, length, gene_type, target):
+    return (
+        lambda: None,
+        lambda _: make_population(mode, size, length, gene_type),
+    )
+
+
+def bench_validate(mode, size, length, gene_type, target):
+    # Object modes check gene values one by one, matrix mode validates the
+    # genome array at once.
+    if mode != "matrix":
+        return (
+            lambda: [
+                g.value
+                for c in make_population(mode, size, length, gene_type)
+                for g in c.genes_list
+            ],
+            lambda values: [gene_type.validate(v) for v in values],
+        )
+    return (
+        lambda: make_population(mode, size, length, gene_type).genomes,
+        lambda genomes: gene_type.validate_batch(genomes).all(),
+    )
+
+
+def bench_fitness(mode, size, length, gene_type, target):
+    func, evaluator = make_fitness(mode, target)
+
+    def run(population):
+        population.fitness(func, evaluator=evaluator)
+        population[0]  # applies the deferred sort
+
+    return lambda: make_population(mode, size, length, gene_type), run
+
+
+def bench_get_parents(mode, size, length, gene_type, target):
+    return (
+        lambda: evaluated_population(mode, size, length, gene_type, target),
+        lambda population: population.get_parents(max(size // 2, 2)),
+    )
+
+
+def make_crossover_bench(crossover, kwargs):
+    def bench(mode, size, length, gene_type, target):
+        return (
+            lambda: evaluated_population(mode, size, length, gene_type, target),
+            lambda population: crossover(
+                parents_of(population),
+                size,
+                proportionate_selection=False,
+                **kwargs,
+            ).generate_new_population(),
+        )
+
+    return bench
+
+
+BENCHMARKS = {
+    "generate": bench_generate,
+    "validate": bench_validate,
+    "fitness": bench_fitness,
+    "get_parents": bench_get_parents,
+    **{
+        f"crossover_{name}": make_crossover_bench(crossover, kwargs)
+        for name, (crossover, kwargs) in CROSSOVERS.items()
+    },
+}
+
+################################################################################
+
+
+def measure(setup, run, repeat):
+    seconds = []
+    for _ in range(repeat):
+        data = setup()
+        start = time.perf_counter()
+        run(data)
+        seconds.append(time.perf_counter() - start)
+
+    data = setup()
+    tracemalloc.start()
+    try:
+        run(data)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(seconds), peak_memory
+
+
+def run_suite(
+    benchmarks,
+    modes,
+    gene_types,
+    sizes,
+    lengths,
+    repeat=3,
+    max_object_genes=10**6,
+    log=None,
+):
+    results = []
+    for name in benchmarks:
+        for mode in modes:
+            for type_name in gene_types:
+                gene_type, target = GENE_TYPES[type_name]
+                for size in sizes:
+                    for length in lengths:
+                        genes = size * length
+                        if mode != "matrix" and genes > max_object_genes:
+                            continue
+                        random.seed(0)
+                        setup, run = BENCHMARKS[name](
+                            mode, size, length, gene_type, target
+                        )
+                        seconds, peak_memory = measure(setup, run, repeat)
+                        result = {
+                            "benchmark": name,
+                            "mode": mode,
+                            "gene_type": type_name,
+                            "population_size": size,
+                            "chromosome_length": length,
+                            "seconds": seconds,
+                            "genes_per_sec": genes / seconds,
+                            "evaluations_per_sec": size / seconds,
+                            "peak_memory_bytes": peak_memory,
+                        }
+                        results.append(result)
+                        if log is not None:
+                            log(format_result(result))
+    return results
+
+
+def metadata():
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def result_key(result):
+    return (
+        result["benchmark"],
+        result["mode"],
+        result["gene_type"],
+        result["population_size"],
+        result["chromosome_length"],
+    )
+
+
+def format_result(result, baseline=None):
+    line = (
+        "{benchmark:<22} {mode:<6} {gene_type:<6} "
+        "{population_size:>7} x {chromosome_length:<5} "
+        "{seconds:>10.6f} s {genes_per_sec:>14,.0f} genes/s "
+        "{peak_memory_bytes:>13,} B"
+    ).format(**result)
+    if baseline is not None:
+        line += f"  x{baseline['seconds'] / result['seconds']:.2f}"
+    return line
+
+
+def compare(results, baseline_results):
+    baseline = {result_key(r): r for r in baseline_results}
+    return [
+        format_result(r, baseline[result_key(r)])
+        for r in results
+        if result_key(r) in baseline
+    ]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=list(BENCHMARKS), default=None
+    )
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument(
+        "--gene-types",
+        nargs="+",
+        choices=list(GENE_TYPES),
+        default=list(GENE_TYPES),
+    )
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[100, 1000, 10000]
+    )
+    parser.add_argument("--lengths", nargs="+", type=int, default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--max-object-genes",
+        type=int,
+        default=10**6,
+        help="skip object and compact mode cases with more genes than this",
+    )
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run_suite(
+        args.benchmarks or list(BENCHMARKS),
+        args.modes,
+        args.gene_types,
+        args.sizes,
+        args.lengths,
+        args.repeat,
+        args.max_object_genes,
+        log=None if args.compare else print,
+    )
+    if args.compare:
+        with open(args.compare) as f:
+            print("\n".join(compare(results, json.load(f)["results"])))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"metadata": metadata(), "results": results}, f, indent=1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import numpy as np
+
+import evaluators
+import gobjs2
+import grandom
+import gtypes
+import instrument
+import mutation
+
+################################################################################
+
+WORD_BITS = 64
+
+
+def words_count(genes_count):
+    return -(-genes_count // WORD_BITS)
+
+
+def pack(genomes):
+    """Packs a 0/1 genome matrix into uint64 words.
+
+    Gene ``j`` is stored in bit ``j % 64`` of word ``j // 64``; padding bits
+    of the last word are zero.
+    """
+    genomes = np.asarray(genomes, dtype=np.uint8)
+    padded = np.zeros(
+        (len(genomes), words_count(genomes.shape[1]) * WORD_BITS), np.uint8
+    )
+    padded[:, : genomes.shape[1]] = genomes
+    packed = np.packbits(padded, axis=1, bitorder="little")
+    return packed.view("<u8").astype(np.uint64)
+
+
+def unpack(words, genes_count):
+    words = np.ascontiguousarray(words, dtype="<u8")
+    return np.unpackbits(
+        words.view(np.uint8), axis=-1, count=genes_count, bitorder="little"
+    )
+
+
+def prefix_mask(bits_count, words):
+    """Word masks with the first ``bits_count`` bits set.
+
+    ``bits_count`` is an integer array of shape (n, 1); the result has
+    shape (n, words).
+    """
+    bits = np.clip(bits_count - np.arange(words) * WORD_BITS, 0, WORD_BITS)
+    partial = np.left_shift(
+        np.uint64(1), np.minimum(bits, WORD_BITS - 1).astype(np.uint64)
+    ) - np.uint64(1)
+    return np.where(bits == WORD_BITS, ~np.uint64(0), partial)
+
+
+def random_words(shape, rng):
+    return rng.integers(
+        0, np.iinfo(np.uint64).max, size=shape, dtype=np.uint64, endpoint=True
+    )
+
+
+if hasattr(np, "bitwise_count"):
+
+    def popcount(words):
+        return np.bitwise_count(words)
+
+else:
+    _POPCOUNT_TABLE = np.array(
+        [bin(i).count("1") for i in range(256)], dtype=np.uint8
+    )
+
+    def popcount(words):
+        words = np.ascontiguousarray(words, dtype=np.uint64)
+        return (
+            _POPCOUNT_TABLE[words.view(np.uint8)]
+            .reshape(words.shape + (8,))
+            .sum(axis=-1, dtype=np.uint8)
+        )
+
+
+def count_ones(words):
+    """Number of set genes per chromosome (the OneMax fitness)."""
+    return popcount(words).sum(axis=-1, dtype=np.int64)
+
+
+def hamming_distance(a, b):
+    """Number of differing genes between packed chromosomes.
+
+    Arguments broadcast, so one chromosome can be compared with a whole
+    population.
+    """
+    return count_ones(np.bitwise_xor(a, b))
+
+
+def match_count(words, target, genes_count):
+    """Number of genes equal to the packed ``target`` chromosome."""
+    return genes_count - hamming_distance(words, target)
+
+
+################################################################################
+
+
+class PackedBinaryPopulation:
+    """Population of all-BinaryType chromosomes packed into uint64 words.
+
+    Each row of ``words`` is one chromosome (see ``pack``), which takes 64
+    times less memory than a uint8 genome matrix row per gene. The
+    population plugs into the batch path of the gobjs2 crossover classes,
+    which then build word masks and combine parents with word-wide AND/OR
+    operations.
+    """
+
+    packed = True
+
+    def __init__(self, words, genes_count, fitness=None) -> None:
+        words = np.array(words, dtype=np.uint64, ndmin=2)
+        if genes_count < 1 or words.shape[1] != words_count(genes_count):
+            raise ValueError()
+        if (words & ~_valid_bits(genes_count)).any():
+            raise ValueError()
+        self._init(words, genes_count, fitness)
+
+    def _init(self, words, genes_count, fitness=None):
+        if fitness is None:
+            fitness = np.zeros(len(words), dtype=np.float64)
+        else:
+            fitness = np.array(fitness, dtype=np.float64)
+            if fitness.shape != (len(words),):
+                raise ValueError()
+        self._words = words
+        self._genes_count = genes_count
+        self._fitness = fitness
+        self._chromosome_tmplt = None
+        self._sort_mode = None
+
+    @classmethod
+    def _wrap(cls, words, genes_count, fitness=None):
+        population = cls.__new__(cls)
+        population._init(words, genes_count, fitness)
+        return population
+
+    def __str__(self) -> str:
+        return str(self.to_population_matrix())
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    @property
+    def words(self):
+        self._apply_sort()
+        return self._words
+
+    @property
+    def genes_count(self):
+        return self._genes_count
+
+    @property
+    def fitness_array(self):
+        self._apply_sort()
+        return self._fitness
+
+    @property
+    def chromosome_tmplt(self):
+        if self._chromosome_tmplt is None:
+            self._chromosome_tmplt = gobjs2.ChromosomeTemplate(
+                [gtypes.BinaryType()] * self._genes_count
+            )
+        return self._chromosome_tmplt
+
+    @property
+    def genomes(self):
+        return unpack(self.words, self._genes_count)
+
+    def fitness(self, func, mode="maximize", chunk_size=None):
+        """Evaluates ``func(words)``, which returns one value per row.
+
+        Ordering is deferred as in gobjs2.Population.fitness.
+        """
+        self._sort_mode = None
+        for start, stop in grandom.iter_chunks(len(self), chunk_size):
+            self._fitness[start:stop] = evaluators.check_batch(
+                func(self._words[start:stop]), stop - start
+            )
+        self._sort_mode = mode
+
+    def _apply_sort(self):
+        if self._sort_mode is not None:
+            mode, self._sort_mode = self._sort_mode, None
+            order = np.argsort(self._fitness, kind="stable")
+            if mode == "maximize":
+                order = order[::-1]
+            self._words[:] = self._words[order]
+            self._fitness[:] = self._fitness[order]
+
+    def get_parents(self, parents_count=2):
+        if parents_count > len(self):
+            raise ValueError()
+        elif parents_count < 1:
+            raise ValueError()
+        if self._sort_mode is None or parents_count == len(self):
+            self._apply_sort()
+            rows = slice(parents_count)
+        else:
+            rows = gobjs2.top_k_indices(
+                self._fitness, parents_count, self._sort_mode == "maximize"
+            )
+        return PackedBinaryPopulation._wrap(
+            self._words[rows].copy(), self._genes_count, self._fitness[rows]
+        )
+
+    def _allocate(self, rows_count):
+        return PackedBinaryPopulation._wrap(
+            np.empty((rows_count, self._words.shape[1]), np.uint64),
+            self._genes_count,
+        )
+
+    def _recombine(self, indices, mask, out=None, start=0):
+        if out is None:
+            out = self._allocate(len(mask) * 2)
+        stop = start + len(mask)
+        if (
+            out is self
+            or out._words.shape[1] != self._words.shape[1]
+            or len(out) < stop * 2
+        ):
+            raise ValueError()
+        p1 = self._words[indices[:, 0]]
+        p2 = self._words[indices[:, 1]]
+        out._words[start * 2 : stop * 2 : 2] = (p1 & mask) | (p2 & ~mask)
+        out._words[start * 2 + 1 : stop * 2 : 2] = (p2 & mask) | (p1 & ~mask)
+        out._fitness[start * 2 : stop * 2] = 0
+        out._sort_mode = None
+        return out
+
+    def _take(self, rows):
+        return PackedBinaryPopulation._wrap(
+            self._words[rows], self._genes_count, self._fitness[rows]
+        )
+
+    def to_population_matrix(self):
+        return gobjs2.PopulationMatrix._wrap(
+            self.genomes, self.chromosome_tmplt, self._fitness
+        )
+
+    @staticmethod
+    def from_population(population):
+        if not all(
+            isinstance(t, gtypes.BinaryType)
+            for t in population.chromosome_tmplt.types_list
+        ):
+            raise ValueError("Only BinaryType templates can be packed")
+        genomes = population.genomes
+        return PackedBinaryPopulation._wrap(
+            pack(genomes),
+            genomes.shape[1],
+            [c.fitness for c in population.chromosome_list],
+        )
+
+    @staticmethod
+    def generate_random_population(population_size, genes_count, rng=None):
+        words = random_words(
+            (population_size, words_count(genes_count)), grandom.get_rng(rng)
+        )
+        return PackedBinaryPopulation._wrap(
+            words & _valid_bits(genes_count), genes_count
+        )
+
+
+def _valid_bits(genes_count):
+    return pack(np.ones((1, genes_count), dtype=np.uint8))[0]
+
+
+class PackedFlipMutation(mutation.FlipMutation):
+    """FlipMutation for PackedBinaryPopulation, XOR-ing sampled bits."""
+
+    @instrument.timed("mutation")
+    def apply_mutation(self):
+        rng = grandom.get_rng(self._rng)
+        genes_count = self._population.genes_count
+        total = len(self._population) * genes_count
+        positions = rng.choice(
+            total, size=rng.binomial(total, self._mutation_rate), replace=False
+        )
+        instrument.count("mutated_genes", len(positions))
+        cols = positions % genes_count
+        np.bitwise_xor.at(
+            self._population.words,
+            (positions // genes_count, cols // WORD_BITS),
+            np.left_shift(np.uint64(1), (cols % WORD_BITS).astype(np.uint64)),
+        )
+        return self._population
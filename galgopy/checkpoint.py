@@ -0,0 +1,221 @@
+import io
+import json
+import os
+
+import numpy as np
+
+import gobjs2
+import gtypes
+
+################################################################################
+
+FORMAT_VERSION = 1
+
+GENE_TYPES = {
+    cls.__name__: cls
+    for cls in (
+        gtypes.BinaryType,
+        gtypes.IntType,
+        gtypes.FloatType,
+        gtypes.StrType,
+    )
+}
+
+
+def describe_template(chromosome_tmplt):
+    """JSON-compatible description of a template.
+
+    Consecutive equal gene types are run-length encoded as
+    ``[count, type name, params]``, so long homogeneous templates take a
+    few bytes.
+    """
+    description = []
+    for t in chromosome_tmplt.types_list:
+        if description and description[-1][1:] == [type(t).__name__, t.params]:
+            description[-1][0] += 1
+        else:
+            description.append([1, type(t).__name__, t.params])
+    return description
+
+
+def template_from_description(description, gene_types=None):
+    """Rebuilds a template from ``describe_template`` output.
+
+    ``gene_types`` maps names of custom GeneType classes to the classes.
+    """
+    known = {**GENE_TYPES, **(gene_types or {})}
+    types_list = []
+    for count, name, params in description:
+        if name not in known:
+            raise ValueError(f"Unknown gene type: {name}")
+        types_list += [known[name](**params)] * count
+    return gobjs2.ChromosomeTemplate(types_list)
+
+
+def atomic_write(path, data):
+    """Writes ``data`` to a temporary file and renames it over ``path``, so
+    readers see either the old or the new content, never a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _encode_genomes(genomes, chromosome_tmplt):
+    # Object genomes (mixed gene dtypes) are stored as one native array per
+    # gene dtype, so no array needs pickling.
+    dtype = chromosome_tmplt.dtype
+    if not dtype.hasobject:
+        return {"genomes": np.asarray(genomes, dtype=dtype)}
+    arrays = {}
+    dtypes = [t.dtype for t in chromosome_tmplt.types_list]
+    for i, column_dtype in enumerate(sorted(set(dtypes), key=str)):
+        if column_dtype.hasobject:
+            raise ValueError("Gene values cannot be stored without pickling")
+        cols = [j for j, d in enumerate(dtypes) if d == column_dtype]
+        arrays[f"genomes_{i}"] = genomes[:, cols].astype(column_dtype)
+        arrays[f"genomes_{i}_cols"] = np.array(cols, dtype=np.int64)
+    return arrays
+
+
+def _decode_genomes(arrays, chromosome_tmplt):
+    if "genomes" in arrays:
+        return arrays["genomes"]
+    dtype_count = sum(1 for name in arrays if name.endswith("_cols"))
+    rows = len(arrays["genomes_0"])
+    genomes = np.empty((rows, len(chromosome_tmplt.types_list)), dtype=object)
+    for i in range(dtype_count):
+        genomes[:, arrays[f"genomes_{i}_cols"]] = arrays[f"genomes_{i}"]
+    return genomes
+
+
+def _pack(meta, arrays):
+    buffer = io.BytesIO()
+    meta_bytes = json.dumps({"version": FORMAT_VERSION, **meta}).encode()
+    np.savez(buffer, meta=np.frombuffer(meta_bytes, np.uint8), **arrays)
+    return buffer.getvalue()
+
+
+def _unpack(path):
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+    meta = json.loads(arrays.pop("meta").tobytes())
+    if meta.get("version") != FORMAT_VERSION:
+        raise ValueError("Unsupported checkpoint version")
+    return meta, arrays
+
+
+def save_population(path, population):
+    """Saves a gobjs2 population (genomes, fitness values and template)."""
+    chromosome_tmplt = population.chromosome_tmplt
+    if hasattr(population, "fitness_array"):
+        fitness = population.fitness_array
+    else:
+        fitness = [c.fitness for c in population.chromosome_list]
+    arrays = _encode_genomes(population.genomes, chromosome_tmplt)
+    arrays["fitness"] = np.asarray(fitness, dtype=np.float64)
+    atomic_write(
+        path, _pack({"template": describe_template(chromosome_tmplt)}, arrays)
+    )
+
+
+def load_population(path, gene_types=None):
+    """Loads a population saved by ``save_population`` as a
+    gobjs2.PopulationMatrix."""
+    meta, arrays = _unpack(path)
+    chromosome_tmplt = template_from_description(meta["template"], gene_types)
+    genomes = _decode_genomes(arrays, chromosome_tmplt)
+    return gobjs2.PopulationMatrix._wrap(
+        genomes.astype(chromosome_tmplt.dtype),
+        chromosome_tmplt,
+        arrays["fitness"],
+    )
+
+
+################################################################################
+
+
+class Checkpoint:
+    """Checkpoint directory of a gbase.GAlgo run.
+
+    ``template.json`` describes the chromosome template and is written by
+    the first save only; every save then rewrites ``state.npz`` with the
+    population, the best chromosome, the counters and the RNG states (see
+    GAlgo.get_state). Arrays are stored raw (numpy ``.npy`` members, no
+    pickling) and both files are replaced atomically, so a run killed
+    while saving resumes from the previous checkpoint.
+
+    Pass the checkpoint to GAlgo to save every ``interval`` generations
+    and resume with ``GAlgo.run(resume=True)``.
+    """
+
+    def __init__(self, path, interval=1, gene_types=None) -> None:
+        if interval < 1:
+            raise ValueError("Invalid checkpoint interval")
+        self._path = os.fspath(path)
+        self._interval = interval
+        self._gene_types = gene_types
+        self._template = None
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def interval(self):
+        return self._interval
+
+    @property
+    def template_path(self):
+        return os.path.join(self._path, "template.json")
+
+    @property
+    def state_path(self):
+        return os.path.join(self._path, "state.npz")
+
+    def exists(self):
+        return os.path.exists(self.state_path)
+
+    def save(self, galgo):
+        chromosome_tmplt = galgo.chromosome_tmplt
+        if self._template is not chromosome_tmplt:
+            os.makedirs(self._path, exist_ok=True)
+            description = describe_template(chromosome_tmplt)
+            atomic_write(self.template_path, json.dumps(description).encode())
+            self._template = chromosome_tmplt
+
+        state = galgo.get_state()
+        arrays = _encode_genomes(state.pop("genomes"), chromosome_tmplt)
+        arrays["fitness"] = state.pop("fitness")
+        best = _encode_genomes(state.pop("best_genome"), chromosome_tmplt)
+        arrays.update({f"best_{name}": array for name, array in best.items()})
+        arrays["best_fitness"] = state.pop("best_fitness")
+        # Other arrays of the engine's state (e.g. the steady-state ranking).
+        for name in [n for n, v in state.items() if isinstance(v, np.ndarray)]:
+            arrays[f"state_{name}"] = state.pop(name)
+        atomic_write(self.state_path, _pack(state, arrays))
+
+    def load(self, galgo):
+        with open(self.template_path, "rb") as f:
+            chromosome_tmplt = template_from_description(
+                json.loads(f.read()), self._gene_types
+            )
+        if chromosome_tmplt != galgo.chromosome_tmplt:
+            raise ValueError("Checkpoint template does not match")
+        state, arrays = _unpack(self.state_path)
+        del state["version"]
+        for name in [n for n in arrays if n.startswith("state_")]:
+            state[name[len("state_") :]] = arrays.pop(name)
+        best = {
+            name[len("best_") :]: arrays.pop(name)
+            for name in list(arrays)
+            if name.startswith("best_") and name != "best_fitness"
+        }
+        state["best_genome"] = _decode_genomes(best, chromosome_tmplt)
+        state["best_fitness"] = arrays.pop("best_fitness")
+        state["fitness"] = arrays.pop("fitness")
+        state["genomes"] = _decode_genomes(arrays, chromosome_tmplt)
+        galgo.set_state(state)
+        self._template = galgo.chromosome_tmplt
@@ -0,0 +1,408 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import instrument
+from grandom import iter_chunks
+
+################################################################################
+
+
+class Evaluator(ABC):
+    """Strategy used by Population.fitness to compute fitness values.
+
+    ``evaluate`` returns one fitness value per chromosome, in population
+    order. Multi-objective engines (see nsga2.NSGA2) use fitness functions
+    returning one vector of objectives per chromosome instead.
+    """
+
+    @abstractmethod
+    def evaluate(self, func, population):
+        pass
+
+
+class SerialEvaluator(Evaluator):
+    """Calls ``func(chromosome)`` once per chromosome."""
+
+    def evaluate(self, func, population):
+        return [func(c) for c in population.chromosome_list]
+
+
+class BatchEvaluator(Evaluator):
+    """Calls ``func(genomes)`` on the genome matrix.
+
+    ``func`` gets a 2D array (one row per chromosome) and must return a
+    fitness vector with one value per row (or a 2D array with one row of
+    objectives per chromosome). With ``chunk_size`` (by default
+    the population's own ``chunk_size``, if any) the matrix is passed in
+    slices of at most that many rows.
+    """
+
+    def __init__(self, chunk_size=None) -> None:
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("Invalid chunk size")
+        self._chunk_size = chunk_size
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    def evaluate(self, func, population):
+        genomes = population.genomes
+        values = None
+        chunk_size = _chunk_size(self._chunk_size, population)
+        for start, stop in iter_chunks(len(genomes), chunk_size):
+            values = _store(
+                values, len(genomes), start, stop, func(genomes[start:stop])
+            )
+        return _stored(values)
+
+
+class CachedEvaluator(Evaluator):
+    """Memoizes fitness values by genome.
+
+    Keys are built from the chromosome template and the raw bytes of each
+    genome row, so identical chromosomes (within a generation or across
+    generations) are evaluated only once by the wrapped ``evaluator``. At
+    most ``maxsize`` entries are kept (``None`` means unbounded), evicting
+    the least recently used ones first.
+    """
+
+    def __init__(self, evaluator=None, maxsize=100000) -> None:
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("Invalid cache size")
+        self._evaluator = evaluator or SerialEvaluator()
+        self._maxsize = maxsize
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def evaluator(self):
+        return self._evaluator
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    def clear(self):
+        self._cache.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def evaluate(self, func, population):
+        genomes = population.genomes
+        # Templates are interned and hash their fingerprint once, so equal
+        # templates share entries and distinct ones never collide.
+        tmplt_key = population.chromosome_tmplt
+        if genomes.dtype.hasobject:
+            keys = [(tmplt_key, tuple(g)) for g in genomes]
+        else:
+            keys = [(tmplt_key, g.tobytes()) for g in genomes]
+
+        values = [None] * len(keys)
+        missing = {}
+        hits = self._hits
+        for row, key in enumerate(keys):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                values[row] = self._cache[key]
+                self._hits += 1
+            elif key in missing:
+                missing[key].append(row)
+                self._hits += 1
+            else:
+                missing[key] = [row]
+                self._misses += 1
+        instrument.count("cache_hits", self._hits - hits)
+        instrument.count("cache_misses", len(missing))
+
+        if missing:
+            rows = [r[0] for r in missing.values()]
+            new_values = self._evaluator.evaluate(func, population._take(rows))
+            for (key, key_rows), value in zip(missing.items(), new_values):
+                for row in key_rows:
+                    values[row] = value
+                self._cache[key] = value
+            if self._maxsize is not None:
+                while len(self._cache) > self._maxsize:
+                    self._cache.popitem(last=False)
+        return values
+
+
+class AsyncEvaluator(Evaluator):
+    """Awaits a coroutine fitness function for many chromosomes at once.
+
+    At most ``concurrency`` calls are in flight: that many worker
+    coroutines take the next chromosome as soon as their previous call
+    completes, so one slow call only holds up its own worker. With
+    ``batch=True`` ``func`` gets chunks of ``chunk_size`` genome rows (see
+    BatchEvaluator) instead of chromosome objects.
+
+    ``evaluate`` runs its own event loop; inside a running loop use
+    ``evaluate_async`` (or Population.fitness_async).
+    """
+
+    def __init__(self, concurrency=100, batch=False, chunk_size=None) -> None:
+        if concurrency < 1:
+            raise ValueError("Invalid concurrency")
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("Invalid chunk size")
+        self._concurrency = concurrency
+        self._batch = batch
+        self._chunk_size = chunk_size
+
+    @property
+    def concurrency(self):
+        return self._concurrency
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    def evaluate(self, func, population):
+        return asyncio.run(self.evaluate_async(func, population))
+
+    async def evaluate_async(self, func, population):
+        if self._batch:
+            genomes = population.genomes
+            values = None
+            chunks = iter_chunks(
+                len(genomes), _chunk_size(self._chunk_size, population)
+            )
+
+            async def call(chunk):
+                nonlocal values
+                start, stop = chunk
+                batch = await func(genomes[start:stop])
+                values = _store(values, len(genomes), start, stop, batch)
+
+        else:
+            chromosomes = population.chromosome_list
+            values = [None] * len(chromosomes)
+            chunks = enumerate(chromosomes)
+
+            async def call(chunk):
+                values[chunk[0]] = await func(chunk[1])
+
+        async def worker():
+            for chunk in chunks:
+                await call(chunk)
+
+        tasks = [
+            asyncio.ensure_future(worker())
+            for _ in range(min(self._concurrency, len(population)))
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return _stored(values) if self._batch else values
+
+
+def _chunk_size(chunk_size, population):
+    if chunk_size is None:
+        return getattr(population, "chunk_size", None)
+    return chunk_size
+
+
+def check_batch(values, size):
+    """``values`` returned by a batch fitness function for ``size`` rows as
+    a float64 array (one value or one vector per row).
+
+    Raises ValueError when their shape does not match the rows.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim not in (1, 2) or len(values) != size:
+        raise ValueError("Fitness function returned an invalid vector")
+    return values
+
+
+def _store(values, size, start, stop, batch):
+    # Copies the results of rows start:stop into ``values``, which is
+    # allocated by the first batch: one value or one vector per row.
+    batch = check_batch(batch, stop - start)
+    if values is None:
+        values = np.empty((size,) + batch.shape[1:], dtype=np.float64)
+    elif values.shape[1:] != batch.shape[1:]:
+        raise ValueError("Fitness function returned an invalid vector")
+    values[start:stop] = batch
+    return values
+
+
+def _stored(values):
+    return np.empty(0, dtype=np.float64) if values is None else values
+
+
+class ProcessPoolEvaluator(Evaluator):
+    """Evaluates chunks of the population in a pool of worker processes.
+
+    The genome matrix is copied once into a shared memory block and
+    workers read their rows from it, so no Chromosome/Gene objects are
+    pickled. Memory-mapped genomes (mapped.MappedPopulation) are not
+    copied: workers map the same file. Templates with object dtype cannot
+    be shared and fall back to sending each chunk as an array. With
+    ``batch=True`` ``func`` gets the rows of a chunk as a 2D array (see
+    BatchEvaluator), otherwise it is called once per chromosome view.
+    ``func`` must be picklable, i.e. defined at module level.
+
+    The pool is started on first use and reused across generations; call
+    ``close`` (or use the evaluator as a context manager) to stop it.
+    """
+
+    def __init__(self, workers=None, chunk_size=None, batch=False) -> None:
+        if workers is not None and workers < 1:
+            raise ValueError("Invalid workers count")
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("Invalid chunk size")
+        self._workers = workers or os.cpu_count() or 1
+        self._chunk_size = chunk_size
+        self._batch = batch
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def evaluate(self, func, population):
+        genomes = population.genomes
+        chromosome_tmplt = population.chromosome_tmplt
+        values = None
+        if not len(genomes):
+            return _stored(values)
+        chunk_size = _chunk_size(self._chunk_size, population) or -(
+            -len(genomes) // (self._workers * 4)
+        )
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self._workers)
+
+        shm = None
+        if getattr(genomes, "filename", None) is not None:
+            # The file's identity is part of the key, so workers remap a file
+            # recreated at the same path instead of reading a stale mapping.
+            stat = os.stat(genomes.filename)
+            source = (
+                "file",
+                os.fspath(genomes.filename),
+                genomes.shape,
+                genomes.dtype.str,
+                stat.st_ino,
+                stat.st_mtime_ns,
+            )
+            tasks = [
+                (source, start, stop)
+                for start, stop in iter_chunks(len(genomes), chunk_size)
+            ]
+        elif genomes.dtype.hasobject:
+            tasks = [
+                (genomes[start:stop], start, stop)
+                for start, stop in iter_chunks(len(genomes), chunk_size)
+            ]
+        else:
+            shm = shared_memory.SharedMemory(
+                create=True, size=max(genomes.nbytes, 1)
+            )
+            shared = np.ndarray(genomes.shape, genomes.dtype, buffer=shm.buf)
+            shared[:] = genomes
+            del shared
+            source = ("shm", shm.name, genomes.shape, genomes.dtype.str)
+            tasks = [
+                (source, start, stop)
+                for start, stop in iter_chunks(len(genomes), chunk_size)
+            ]
+        try:
+            futures = [
+                self._pool.submit(
+                    _evaluate_chunk,
+                    func,
+                    chromosome_tmplt,
+                    self._batch,
+                    source,
+                    start,
+                    stop,
+                )
+                for source, start, stop in tasks
+            ]
+            for future, (_, start, stop) in zip(futures, tasks):
+                values = _store(
+                    values, len(genomes), start, stop, future.result()
+                )
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        return values
+
+
+_attached = None
+
+
+def _attach(source):
+    global _attached
+    if _attached is None or _attached[0] != source:
+        _detach()
+        if source[0] == "file":
+            shm = None
+            genomes = np.lib.format.open_memmap(source[1], mode="r")
+        else:
+            name, shape, dtype = source[1:]
+            shm = shared_memory.SharedMemory(name=name)
+            genomes = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+        _attached = (source, shm, genomes)
+    return _attached[2]
+
+
+def _detach():
+    global _attached
+    if _attached is not None:
+        shm = _attached[1]
+        _attached = None
+        if shm is not None:
+            shm.close()
+
+
+def _evaluate_chunk(func, chromosome_tmplt, batch, source, start, stop):
+    if isinstance(source, np.ndarray):
+        genomes = source
+    else:
+        genomes = _attach(source)[start:stop]
+    if batch:
+        return check_batch(func(genomes), stop - start)
+
+    import gobjs2
+
+    population = gobjs2.PopulationMatrix._wrap(genomes, chromosome_tmplt)
+    return [func(c) for c in population.chromosome_list]
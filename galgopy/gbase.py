@@ -1,6 +1,21 @@
+import functools
 import random
+import time
 
+import numpy as np
+
+import gobjs2
+import grandom
 import gtypes
+import instrument
+import stats
+from mutation import (
+    AlphabetResetMutation,
+    FlipMutation,
+    GaussianMutation,
+    RandomResetMutation,
+)
+from selection import TournamentSelection
 
 
 class ChromosomeTemplate:
@@ -110,35 +125,666 @@ def fitness_calculation(chromosome):
 
 
 class GAlgo:
-    """Genetic Algorithm (GA)"""
+    """Genetic Algorithm (GA)
+
+    Generational engine working on gobjs2.PopulationMatrix. Every
+    generation is evaluated with ``fitness_func`` (through ``evaluator``,
+    see the evaluators module), then the next one is bred into a second,
+    preallocated population: ``crossover`` builds the offspring from the
+    ``parents_count`` best chromosomes (the whole population by default)
+    using ``selection``, every ``mutation`` operator is applied and the
+    ``elitism`` best chromosomes are copied over unchanged. The two
+    populations are swapped, so no population or chromosome objects are
+    created per generation.
+
+    ``crossover`` and ``mutation`` are factories with the signatures of the
+    gobjs2 crossover and mutation classes (the classes themselves or
+    functools.partial objects); ``mutation`` may also be a list of them.
+    By default one operator per gene type is used with a mutation rate of
+    one gene per chromosome.
+
+    The run stops after ``max_generations``, when ``target_fitness`` is
+    reached, after ``stagnation_limit`` generations without improvement of
+    the best fitness, or when the ``time_limit`` (seconds) or
+    ``max_evaluations`` budget would be exceeded.
+
+    With a checkpoint.Checkpoint the state is saved every
+    ``checkpoint.interval`` generations and when the run stops;
+    ``run(resume=True)`` continues from the last save.
+
+    Every phase of a generation reports to an enabled
+    instrument.Profiler.
+
+    All randomness of the built-in operators comes from ``rng`` (a seed,
+    SeedSequence or Generator). The initial population and the offspring
+    are generated chunk by chunk on ``workers`` threads, each chunk with
+    its own random stream spawned from ``rng`` (see grandom.map_chunks),
+    so a seeded run gives the same result with any number of workers.
+    """
 
-    def __init__(self) -> None:
-        pass
+    def __init__(
+        self,
+        chromosome_tmplt: gobjs2.ChromosomeTemplate,
+        fitness_func,
+        population_size=100,
+        mode="maximize",
+        crossover=gobjs2.OnePointCrossover,
+        mutation=None,
+        selection=None,
+        parents_count=None,
+        elitism=1,
+        evaluator=None,
+        max_generations=100,
+        target_fitness=None,
+        stagnation_limit=None,
+        time_limit=None,
+        max_evaluations=None,
+        checkpoint=None,
+        rng=None,
+        workers=None,
+    ) -> None:
+        if population_size < 2 or population_size % 2:
+            raise ValueError("Population size must be an even number")
+        if parents_count is None:
+            parents_count = population_size
+        if not 0 < parents_count <= population_size:
+            raise ValueError("Invalid parents count")
+        if not 0 <= elitism <= population_size:
+            raise ValueError("Invalid elitism")
+        if max_evaluations is not None and max_evaluations < population_size:
+            raise ValueError("Invalid evaluations budget")
+        if mutation is None:
+            mutation = _default_mutations(chromosome_tmplt)
+        elif callable(mutation):
+            mutation = [mutation]
+
+        self._chromosome_tmplt = chromosome_tmplt
+        self._fitness_func = fitness_func
+        self._population_size = population_size
+        self._mode = mode
+        self._crossover = crossover
+        self._mutation = list(mutation)
+        self._selection = selection or TournamentSelection(mode=mode)
+        self._parents_count = parents_count
+        self._elitism = elitism
+        self._evaluator = evaluator
+        self._max_generations = max_generations
+        self._target_fitness = target_fitness
+        self._stagnation_limit = stagnation_limit
+        self._time_limit = time_limit
+        self._max_evaluations = max_evaluations
+        self._checkpoint = checkpoint
+        self._rng = grandom.get_rng(rng)
+        self._workers = workers
+        self._population = None
+        self._evaluated = None
+        self._best = None
+        self._generation = 0
+        self._evaluations = 0
+        self._stop_reason = None
+
+    @property
+    def chromosome_tmplt(self):
+        return self._chromosome_tmplt
+
+    @property
+    def population(self):
+        return self._population
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def evaluations(self):
+        return self._evaluations
+
+    @property
+    def best(self):
+        return self._best[0] if self._best is not None else None
+
+    @property
+    def best_fitness(self):
+        return self._best[0].fitness if self._best is not None else None
+
+    @property
+    def stop_reason(self):
+        return self._stop_reason
+
+    @instrument.timed("initialization")
+    def reset(self):
+        population = gobjs2.PopulationMatrix.generate_random_population(
+            self._population_size,
+            self._chromosome_tmplt,
+            self._rng,
+            self._workers,
+        )
+        self._allocate(population.genomes, population.genomes[:1].copy())
+        self._evaluated = None
+        self._generation = 0
+        self._evaluations = 0
+        self._stagnation = 0
+        self._stop_reason = None
+        self._start_time = time.perf_counter()
+
+    def _allocate(self, genomes, best_genome, fitness=None, best_fitness=None):
+        self._population = gobjs2.PopulationMatrix._wrap(
+            genomes, self._chromosome_tmplt, fitness
+        )
+        self._next_population = gobjs2.PopulationMatrix._wrap(
+            np.empty_like(genomes), self._chromosome_tmplt
+        )
+        self._best = gobjs2.PopulationMatrix._wrap(
+            best_genome, self._chromosome_tmplt, best_fitness
+        )
 
+    def get_state(self):
+        """Arrays and JSON-compatible values needed to continue the run
+        (see checkpoint.Checkpoint), including the state of ``rng`` and of
+        the random module."""
+        version, internal_state, gauss_next = random.getstate()
+        return {
+            "genomes": self._population.genomes,
+            "fitness": self._population.fitness_array,
+            "best_genome": self._best.genomes,
+            "best_fitness": self._best.fitness_array,
+            "evaluated": self._population is self._evaluated,
+            "generation": self._generation,
+            "evaluations": self._evaluations,
+            "stagnation": self._stagnation,
+            "stop_reason": self._stop_reason,
+            "elapsed": time.perf_counter() - self._start_time,
+            "rng_state": self._rng.bit_generator.state,
+            "random_state": [version, list(internal_state), gauss_next],
+        }
+
+    def set_state(self, state):
+        dtype = self._chromosome_tmplt.dtype
+        genomes = np.array(state["genomes"], dtype=dtype)
+        if genomes.shape != (
+            self._population_size,
+            len(self._chromosome_tmplt.types_list),
+        ):
+            raise ValueError("State does not match the population size")
+        self._allocate(
+            genomes,
+            np.array(state["best_genome"], dtype=dtype),
+            state["fitness"],
+            state["best_fitness"],
+        )
+        self._evaluated = self._population if state["evaluated"] else None
+        self._generation = state["generation"]
+        self._evaluations = state["evaluations"]
+        self._stagnation = state["stagnation"]
+        self._stop_reason = state["stop_reason"]
+        self._start_time = time.perf_counter() - state["elapsed"]
+        self._rng.bit_generator.state = state["rng_state"]
+        version, internal_state, gauss_next = state["random_state"]
+        random.setstate((version, tuple(internal_state), gauss_next))
+
+    def run(self, resume=False):
+        """Runs the GA from a new random population (or, with ``resume``,
+        from the last checkpoint if there is one) and returns the best
+        chromosome found."""
+        self._start_run(resume)
+        while not self.step():
+            pass
+        return self.best
+
+    def iterate(self, resume=False, diversity=True):
+        """Runs the GA like ``run`` but as a generator yielding a
+        stats.Snapshot after every evaluated generation.
+
+        Nothing is kept between snapshots, and the caller can stop the run
+        at any point by not consuming further snapshots (``step`` then
+        continues from there). Set ``diversity`` to False to skip the
+        diversity computation, the only per-generation cost that grows with
+        the genome matrix.
+        """
+        self._start_run(resume)
+        while True:
+            generation = self._generation
+            stopped = self.step()
+            if self._generation != generation:
+                yield self._snapshot(diversity)
+            if stopped:
+                return
+
+    @instrument.timed("snapshot")
+    def _snapshot(self, diversity):
+        population = self._evaluated
+        fitness = stats.fitness_stats(
+            population._fitness, getattr(population, "chunk_size", None)
+        )
+        best = self._generation_best
+        return stats.Snapshot(
+            generation=self._generation,
+            evaluations=self._evaluations,
+            elapsed=time.perf_counter() - self._start_time,
+            best_fitness=best.fitness_array[0].item(),
+            mean_fitness=fitness.mean,
+            std_fitness=fitness.std,
+            best_genome=best.genomes[0].copy(),
+            diversity=(
+                stats.diversity(population._genomes) if diversity else None
+            ),
+        )
 
-################################################################################
+    async def run_async(self, resume=False):
+        """Coroutine version of ``run``: generations are evaluated with
+        Population.fitness_async, so a coroutine ``fitness_func`` is awaited
+        concurrently (see evaluators.AsyncEvaluator) without blocking the
+        running event loop."""
+        self._start_run(resume)
+        while not await self.step_async():
+            pass
+        return self.best
+
+    @instrument.timed("generation")
+    def step(self):
+        """Evaluates the current generation and breeds the next one.
+
+        Returns True (without breeding) when the run has to stop.
+        """
+        if self._start_step():
+            return True
+        self._population.fitness(
+            self._fitness_func, self._mode, self._evaluator
+        )
+        return self._finish_step()
+
+    @instrument.timed("generation")
+    async def step_async(self):
+        if self._start_step():
+            return True
+        await self._population.fitness_async(
+            self._fitness_func, self._mode, self._evaluator
+        )
+        return self._finish_step()
+
+    def get_migrants(self, count):
+        """Genomes and fitness values of the ``count`` best chromosomes of
+        the last evaluated generation."""
+        if self._evaluated is None:
+            raise ValueError("No evaluated generation")
+        migrants = self._evaluated.get_parents(count)
+        return migrants.genomes.copy(), migrants.fitness_array.copy()
+
+    def add_migrants(self, genomes):
+        """Replaces the last chromosomes of the next generation (which are
+        never elites) with ``genomes``."""
+        genomes = np.asarray(genomes)
+        count = len(genomes)
+        if count > self._population_size - self._elitism:
+            raise ValueError("Too many migrants")
+        if self._population is None or self._population is self._evaluated:
+            raise ValueError("No bred generation")
+        if count:
+            self._population.genomes[-count:] = genomes
+
+    def _start_run(self, resume):
+        if (
+            resume
+            and self._checkpoint is not None
+            and self._checkpoint.exists()
+        ):
+            self._checkpoint.load(self)
+        else:
+            self.reset()
+
+    def _start_step(self):
+        if self._population is None:
+            self.reset()
+        elif self._stop_reason is not None:
+            return True
+        if (
+            self._max_evaluations is not None
+            and self._evaluations + self._step_evaluations()
+            > self._max_evaluations
+        ):
+            self._stop_reason = "max_evaluations"
+            return True
+        return False
+
+    def _step_evaluations(self):
+        return self._population_size
+
+    def _finish_step(self):
+        self._update_best()
+        self._stop_reason = self._check_stop()
+        if self._stop_reason is None:
+            self._breed()
+        if self._checkpoint is not None and (
+            self._stop_reason is not None
+            or self._generation % self._checkpoint.interval == 0
+        ):
+            with instrument.phase("checkpoint"):
+                self._checkpoint.save(self)
+        return self._stop_reason is not None
+
+    def _update_best(self):
+        self._evaluations += self._population_size
+        self._generation += 1
+        self._evaluated = self._population
+
+        best = self._population.get_parents(1)
+        self._generation_best = best
+        if self._generation == 1 or self._is_better(
+            best.fitness_array[0], self._best.fitness_array[0]
+        ):
+            self._best.genomes[:] = best.genomes
+            self._best.fitness_array[:] = best.fitness_array
+            self._stagnation = 0
+        else:
+            self._stagnation += 1
+
+    def _check_stop(self):
+        if self._target_fitness is not None and not self._is_better(
+            self._target_fitness, self.best_fitness
+        ):
+            return "target_fitness"
+        elif self._generation >= self._max_generations:
+            return "max_generations"
+        elif (
+            self._stagnation_limit is not None
+            and self._stagnation >= self._stagnation_limit
+        ):
+            return "stagnation"
+        elif (
+            self._time_limit is not None
+            and time.perf_counter() - self._start_time >= self._time_limit
+        ):
+            return "time_limit"
+        return None
 
-if __name__ == "__main__":
-    chromosome_len = 5
-    init_population_size = 5
-    parents_count = 2
+    def _breed(self):
+        population = self._population
+        elites = (
+            population.get_parents(self._elitism) if self._elitism else None
+        )
+        if self._parents_count == self._population_size:
+            parents = population
+        else:
+            parents = population.get_parents(self._parents_count)
+
+        # Custom crossover factories need not accept ``workers``.
+        workers = {} if self._workers is None else {"workers": self._workers}
+        offspring = self._crossover(
+            parents,
+            self._population_size,
+            rng=self._rng,
+            selection=self._selection,
+            **workers,
+        ).generate_new_population(out=self._next_population)
+        for operator in self._mutation:
+            operator(offspring, rng=self._rng).apply_mutation()
+        if elites is not None:
+            with instrument.phase("elitism"):
+                offspring.genomes[: self._elitism] = elites.genomes
+
+        self._population, self._next_population = offspring, population
+
+    def _is_better(self, a, b):
+        if self._mode == "maximize":
+            return a > b
+        return a < b
+
+
+class SteadyStateGAlgo(GAlgo):
+    """Steady-state Genetic Algorithm
+
+    Works on a single gobjs2.PopulationMatrix: after the initial population
+    is evaluated, every step breeds ``replacement_count`` offspring from
+    the current population (with ``crossover``, ``selection`` and every
+    ``mutation`` operator, as GAlgo does), evaluates only those and writes
+    them over the ``replacement_count`` worst chromosomes. The best
+    ``population_size - replacement_count`` chromosomes always survive, so
+    ``elitism`` is not used.
+
+    Rows are ranked by a sorted array of fitness values (``ranking`` holds
+    the row indices, best first) that is updated in place: the offspring
+    are inserted with a binary search, O(k log N) comparisons for k
+    offspring, and only the entries ranked below the best offspring move.
+    Population rows themselves are never reordered.
+
+    A step counts as a generation for ``max_generations``,
+    ``stagnation_limit``, checkpoint intervals and ``iterate`` (whose
+    snapshots summarize the whole population). Offspring are bred at the
+    start of each step, so between steps the state is just the population
+    and checkpoints resume exactly. Other arguments are those of GAlgo.
+    """
 
-    ct = ChromosomeTemplate()
+    def __init__(
+        self,
+        chromosome_tmplt: gobjs2.ChromosomeTemplate,
+        fitness_func,
+        population_size=100,
+        replacement_count=2,
+        **kwargs,
+    ) -> None:
+        if not 0 < replacement_count < population_size:
+            raise ValueError("Invalid replacement count")
+        super().__init__(
+            chromosome_tmplt, fitness_func, population_size, **kwargs
+        )
+        self._replacement_count = replacement_count
+        self._ranking = None
+        self._keys = None
+        self._migrants = None
+
+    @property
+    def replacement_count(self):
+        return self._replacement_count
+
+    @property
+    def ranking(self):
+        return self._ranking
+
+    def _allocate(self, genomes, best_genome, fitness=None, best_fitness=None):
+        self._population = gobjs2.PopulationMatrix._wrap(
+            genomes, self._chromosome_tmplt, fitness
+        )
+        # Crossovers breed pairs, so an odd count leaves one spare child.
+        pairs_count = -(-self._replacement_count // 2)
+        self._next_population = self._population._allocate(pairs_count * 2)
+        self._offspring = gobjs2.PopulationMatrix._wrap(
+            self._next_population._genomes[: self._replacement_count],
+            self._chromosome_tmplt,
+        )
+        self._best = gobjs2.PopulationMatrix._wrap(
+            best_genome, self._chromosome_tmplt, best_fitness
+        )
+        self._ranking = None
+        self._keys = None
+        self._migrants = None
+
+    def get_state(self):
+        state = super().get_state()
+        if self._evaluated is not None:
+            # Chromosomes of equal fitness are ranked by age, which the
+            # fitness values alone do not tell.
+            state["ranking"] = self._ranking
+        return state
+
+    def set_state(self, state):
+        super().set_state(state)
+        if self._evaluated is not None:
+            self._rank_population(state.get("ranking"))
+
+    @instrument.timed("generation")
+    def step(self):
+        """Evaluates the initial population, or breeds, evaluates and
+        inserts one batch of offspring.
+
+        Returns True when the run has to stop.
+        """
+        if self._start_step():
+            return True
+        self._next_batch().fitness(
+            self._fitness_func, self._mode, self._evaluator
+        )
+        return self._finish_step()
+
+    @instrument.timed("generation")
+    async def step_async(self):
+        if self._start_step():
+            return True
+        await self._next_batch().fitness_async(
+            self._fitness_func, self._mode, self._evaluator
+        )
+        return self._finish_step()
+
+    def get_migrants(self, count):
+        if self._evaluated is None:
+            raise ValueError("No evaluated generation")
+        migrants = self._population._take(self._ranking[:count])
+        return migrants.genomes, migrants.fitness_array
+
+    def add_migrants(self, genomes):
+        """Sends ``genomes`` in place of the last offspring of the next
+        step."""
+        genomes = np.array(genomes, dtype=self._chromosome_tmplt.dtype)
+        if len(genomes) > self._replacement_count:
+            raise ValueError("Too many migrants")
+        if self._evaluated is None or self._stop_reason is not None:
+            raise ValueError("No bred generation")
+        self._migrants = genomes if len(genomes) else None
+
+    def _step_evaluations(self):
+        if self._evaluated is None:
+            return self._population_size
+        return self._replacement_count
+
+    def _next_batch(self):
+        if self._evaluated is None:
+            return self._population
+        if self._parents_count == self._population_size:
+            parents = self._population
+        else:
+            parents = self._population._take(
+                self._ranking[: self._parents_count]
+            )
+        workers = {} if self._workers is None else {"workers": self._workers}
+        self._crossover(
+            parents,
+            len(self._next_population),
+            rng=self._rng,
+            selection=self._selection,
+            **workers,
+        ).generate_new_population(out=self._next_population)
+        for operator in self._mutation:
+            operator(self._offspring, rng=self._rng).apply_mutation()
+        if self._migrants is not None:
+            self._offspring._genomes[-len(self._migrants) :] = self._migrants
+            self._migrants = None
+        return self._offspring
+
+    def _breed(self):
+        # Offspring are bred by the next step (see _next_batch).
+        pass
 
-    population = Population.generate_random_population(init_population_size, ct)
-    fitness_value = 0
+    def _update_best(self):
+        evaluations = self._step_evaluations()
+        if self._evaluated is None:
+            self._population._apply_sort()
+            self._rank_population()
+            self._evaluated = self._population
+        else:
+            self._offspring._sort_mode = None
+            self._replace_worst(self._offspring)
+        self._evaluations += evaluations
+        self._generation += 1
+
+        best = self._population._take(self._ranking[:1])
+        self._generation_best = best
+        if self._generation == 1 or self._is_better(
+            best.fitness_array[0], self._best.fitness_array[0]
+        ):
+            self._best.genomes[:] = best.genomes
+            self._best.fitness_array[:] = best.fitness_array
+            self._stagnation = 0
+        else:
+            self._stagnation += 1
+
+    def _sort_keys(self, fitness):
+        # Ascending keys rank the best chromosome first.
+        return -fitness if self._mode == "maximize" else fitness
+
+    @instrument.timed("sort")
+    def _rank_population(self, ranking=None):
+        keys = self._sort_keys(self._population._fitness)
+        if ranking is None:
+            ranking = np.argsort(keys, kind="stable")
+        else:
+            ranking = np.array(ranking, dtype=np.intp)
+            if (
+                not np.array_equal(np.sort(ranking), np.arange(len(keys)))
+                or (np.diff(keys[ranking]) < 0).any()
+            ):
+                raise ValueError("Invalid ranking")
+        self._ranking = ranking
+        self._keys = keys[ranking]
+
+    @instrument.timed("replacement")
+    def _replace_worst(self, offspring):
+        count = len(offspring)
+        kept = self._population_size - count
+        rows = self._ranking[kept:].copy()
+        self._population._genomes[rows] = offspring._genomes
+        self._population._fitness[rows] = offspring._fitness
+
+        keys = self._sort_keys(offspring._fitness)
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        rows = rows[order]
+        # Offspring rank before kept chromosomes of equal fitness.
+        positions = np.searchsorted(self._keys[:kept], keys)
+        # Entries between two insertion points move down by the number of
+        # offspring inserted above them (slices handle the overlap).
+        stops = np.append(positions[1:], kept)
+        for shift in range(count, 0, -1):
+            start, stop = positions[shift - 1], stops[shift - 1]
+            if start < stop:
+                self._keys[start + shift : stop + shift] = self._keys[
+                    start:stop
+                ]
+                self._ranking[start + shift : stop + shift] = self._ranking[
+                    start:stop
+                ]
+        targets = positions + np.arange(count)
+        self._keys[targets] = keys
+        self._ranking[targets] = rows
+
+
+def _default_mutations(chromosome_tmplt):
+    rate = 1 / len(chromosome_tmplt.types_list)
+    return [
+        functools.partial(operator, mutation_rate=rate)
+        for operator in (
+            FlipMutation,
+            RandomResetMutation,
+            GaussianMutation,
+            AlphabetResetMutation,
+        )
+        if any(
+            isinstance(t, operator.gene_type_class)
+            for t in chromosome_tmplt.types_list
+        )
+    ]
 
-    while fitness_value != 8:
-        population.fitness(fitness_calculation)
 
-        parents = population.get_parents(parents_count)
-        fitness_value = parents[0].fitness
-        print(parents[0])
-        cross = crossover.OnePointCrossover(parents, 10)
-        population = cross.get_next_population()
+################################################################################
 
-        m = mutation.FlipMutation(population)
-        population = m.apply_mutation()
+if __name__ == "__main__":
+    ct = gobjs2.ChromosomeTemplate()
+
+    galgo = GAlgo(
+        ct,
+        lambda c: sum([g.value for g in c.genes_list]),
+        population_size=10,
+        target_fitness=8,
+    )
+    print(galgo.run(), galgo.generation, galgo.stop_reason)
 
 
 ################################################################################
@@ -99,7 +99,6 @@ class Chromosome:
         if any([g.gene_type != genes_list[0].gene_type for g in genes_list]):
             raise ValueError
         self._genes_list = genes_list
-        print(genes_list)
         self._chromosome_tmplt = ChromosomeTemplate(
             [g.gene_type for g in genes_list]
         )
@@ -159,8 +158,6 @@ class Chromosome:
 
     @staticmethod
     def generate_random_chromosome(chromosome_tmplt: ChromosomeTemplate):
-        print(chromosome_tmplt)
-        print("-------")
         chromosome = Chromosome(
             [Gene.generate_random_gene(t) for t in chromosome_tmplt]
         )
@@ -226,7 +223,6 @@ class Population:
             Chromosome.generate_random_chromosome(chromosome_tmplt)
             for _ in range(population_count)
         ]
-        print(population)
         return Population(population)
 
 
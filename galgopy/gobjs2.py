@@ -1,18 +1,125 @@
-import random
+import heapq
+import inspect
+import operator
+import weakref
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 
+import numpy as np
+
+import evaluators
+import grandom
 import gtypes
+import instrument
+from selection import RandomSelection, RouletteSelection
 
 ################################################################################
 
 
+def _to_python(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _default_evaluator(func):
+    if inspect.iscoroutinefunction(func):
+        return evaluators.AsyncEvaluator()
+    return evaluators.SerialEvaluator()
+
+
+_fitness_key = operator.attrgetter("fitness")
+
+
+def random_genomes(
+    genomes, chromosome_tmplt, rng=None, workers=None, chunk_size=None
+):
+    """Fills the 2D array ``genomes`` with random gene values.
+
+    Rows are filled ``chunk_size`` (by default grandom.DEFAULT_CHUNK_SIZE)
+    at a time, each chunk from its own random stream (see
+    grandom.map_chunks), on up to ``workers`` threads. The values depend on
+    ``rng`` and ``chunk_size`` only, not on ``workers``. Templates with
+    gene types that do not override ``GeneType.sample`` (and so use the
+    random module) are filled serially. Within a chunk, columns with equal
+    gene types are drawn with a single ``sample`` call.
+    """
+    groups = []
+    for col, t in enumerate(chromosome_tmplt.types_list):
+        for gene_type, cols in groups:
+            if gene_type is t or gene_type == t:
+                cols.append(col)
+                break
+        else:
+            groups.append((t, [col]))
+    if any(type(t).sample is gtypes.GeneType.sample for t, _ in groups):
+        workers = None
+
+    def fill(start, stop, chunk_rng):
+        chunk = genomes[start:stop]
+        for gene_type, cols in groups:
+            values = gene_type.sample((stop - start) * len(cols), chunk_rng)
+            if len(cols) == genomes.shape[1]:
+                chunk[:] = values.reshape(stop - start, len(cols))
+            else:
+                chunk[:, cols] = values.reshape(stop - start, len(cols))
+
+    grandom.map_chunks(
+        fill,
+        len(genomes),
+        chunk_size or grandom.DEFAULT_CHUNK_SIZE,
+        rng,
+        workers,
+    )
+    return genomes
+
+
+def top_k_indices(values, k, maximize=True):
+    """Indices of the ``k`` best values, best first.
+
+    The result equals the first ``k`` entries of a stable argsort of
+    ``values`` (reversed when maximizing), but only O(n) work is done on the
+    whole array and the k selected entries are sorted.
+    """
+    values = np.asarray(values)
+    if np.isnan(values).any():
+        # NaN is neither above, below nor equal to the threshold; fall back to
+        # the argsort, which keeps every row and puts NaN last.
+        order = np.argsort(values, kind="stable")
+        return (order[::-1] if maximize else order)[:k]
+    if maximize:
+        threshold = np.partition(values, len(values) - k)[len(values) - k]
+        better = np.flatnonzero(values > threshold)
+        ties = np.flatnonzero(values == threshold)[::-1]
+    else:
+        threshold = np.partition(values, k - 1)[k - 1]
+        better = np.flatnonzero(values < threshold)
+        ties = np.flatnonzero(values == threshold)
+    rows = np.concatenate([better, ties[: k - len(better)]])
+    if maximize:
+        return rows[np.lexsort((-rows, -values[rows]))]
+    return rows[np.lexsort((rows, values[rows]))]
+
+
 class Gene:
+    __slots__ = ("_value", "_gene_type")
+
     def __init__(self, value=0, gene_type=gtypes.BinaryType()) -> None:
+        if instrument.active is not None:
+            instrument.active.count("validations")
         if not gene_type.validate(value):
             raise ValueError()
         self._value = value
         self._gene_type = gene_type
 
+    @classmethod
+    def _wrap(cls, value, gene_type):
+        # Unchecked constructor for values known to be valid.
+        gene = cls.__new__(cls)
+        gene._value = value
+        gene._gene_type = gene_type
+        return gene
+
     def __str__(self) -> str:
         return f"Gene({self._value})"
 
@@ -22,6 +129,8 @@ class Gene:
 
     @value.setter
     def value(self, value):
+        if instrument.active is not None:
+            instrument.active.count("validations")
         if not self._gene_type.validate(value):
             raise ValueError()
         self._value = value
@@ -39,18 +148,57 @@ class Gene:
         return Gene(gene_type.get_random_val(), gene_type)
 
 
+# Interned templates by class and identities of their (interned) gene types.
+_templates = weakref.WeakValueDictionary()
+
+
 class ChromosomeTemplate:
-    def __init__(self, types_list=[gtypes.BinaryType() for i in range(8)]):
-        self._types_list = types_list
+    """Gene types of a chromosome.
+
+    Templates are interned like gene types: constructing a template with
+    the same gene types as an existing one returns the existing template,
+    so chromosomes and populations share one template object and checking
+    that two templates match is usually a pointer comparison. The
+    structural ``fingerprint`` and the hash are computed once, and
+    ``types_list`` is a tuple, so a shared template cannot be modified.
+    """
+
+    def __new__(cls, types_list=[gtypes.BinaryType() for i in range(8)]):
+        types = tuple([gtypes.intern(t) for t in types_list])
+        key = (cls, tuple(map(id, types)))
+        template = _templates.get(key)
+        if template is None:
+            template = super().__new__(cls)
+            template._types_list = types
+            template._fingerprint = tuple(
+                t.fingerprint if hasattr(t, "fingerprint") else t for t in types
+            )
+            template._hash = None
+            template._dtype = None
+            _templates[key] = template
+        return template
+
+    def __reduce__(self):
+        # Unpickled templates are interned again.
+        return (type(self), (self._types_list,))
 
     def __str__(self) -> str:
         return f"CT({' '.join([str(t) for t in self._types_list])})"
 
     def __eq__(self, __o: object) -> bool:
-        return (
+        return self is __o or (
             isinstance(__o, type(self)) and self._types_list == __o.types_list
         )
 
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(self._fingerprint)
+        return self._hash
+
+    @property
+    def fingerprint(self):
+        return self._fingerprint
+
     @property
     def types_list(self):
         return self._types_list
@@ -59,19 +207,54 @@ class ChromosomeTemplate:
     def types_list(self, value):
         raise ValueError()
 
+    @property
+    def dtype(self):
+        if self._dtype is None:
+            self._dtype = self._common_dtype()
+        return self._dtype
+
+    def _common_dtype(self):
+        dtypes = [t.dtype for t in self._types_list]
+        if all(d == dtypes[0] for d in dtypes):
+            return dtypes[0]
+        elif all(d.kind in "buif" for d in dtypes):
+            return np.result_type(*dtypes)
+        return np.dtype(object)
+
 
 class Chromosome:
+    __slots__ = ("_genes_list", "_chromosome_tmplt", "_fitness")
+
     def __init__(self, genes_list=[Gene() for i in range(8)]):
-        if any([g.gene_type != genes_list[0].gene_type for g in genes_list]):
-            raise ValueError
-        elif not genes_list:
+        if not genes_list:
             raise ValueError("Invalid genes list")
+        first = genes_list[0].gene_type
+        if any(
+            g.gene_type is not first and g.gene_type != first
+            for g in genes_list
+        ):
+            raise ValueError
+        if instrument.active is not None:
+            instrument.active.count("chromosomes")
         self._genes_list = genes_list
         self._chromosome_tmplt = ChromosomeTemplate(
             [g.gene_type for g in genes_list]
         )
         self._fitness = 0
 
+    @classmethod
+    def _wrap(cls, genes_list, chromosome_tmplt):
+        """Unchecked constructor for operator offspring: the genes come from
+        valid parents with ``chromosome_tmplt``, which is shared instead of
+        being rebuilt."""
+        if instrument.active is not None:
+            instrument.active.count("chromosomes")
+        chromosome = cls.__new__(cls)
+        chromosome._genes_list = genes_list
+        chromosome._chromosome_tmplt = chromosome_tmplt
+        chromosome._fitness = 0
+        return chromosome
+
     def __str__(self) -> str:
         return (
             f"Chromosome({' '.join([str(t.value) for t in self._genes_list])})"
@@ -90,6 +273,27 @@ class Chromosome:
     def genes_list(self):
         return self._genes_list
 
+    @property
+    def values(self):
+        """Tuple of the gene values."""
+        return tuple([g._value for g in self._genes_list])
+
+    # List crossover recombines slices of ``_sequence`` and builds children
+    # with ``_offspring``, so they keep the kind of chromosome of the
+    # parents.
+
+    @property
+    def _sequence(self):
+        return self._genes_list
+
+    def _offspring(self, sequence):
+        return Chromosome._wrap(sequence, self._chromosome_tmplt)
+
+    def _set_value(self, col, value, gene_type):
+        # Offspring built by crossover share Gene objects with their
+        # parents, so genes are replaced rather than modified.
+        self._genes_list[col] = Gene._wrap(value, gene_type)
+
     @genes_list.setter
     def genes_list(self, value):
         raise ValueError()
@@ -118,89 +322,706 @@ class Chromosome:
         return chromosome
 
 
-class Population:
+class CompactGeneView(Gene):
+    """Gene backed by a single value of a CompactChromosome."""
+
+    __slots__ = ("_chromosome", "_col")
+
+    def __init__(self, chromosome, col) -> None:
+        self._chromosome = chromosome
+        self._col = col
+        self._gene_type = chromosome.chromosome_tmplt.types_list[col]
+
+    def __str__(self) -> str:
+        return f"Gene({self.value})"
+
+    @property
+    def value(self):
+        return self._chromosome.values[self._col]
+
+    @value.setter
+    def value(self, value):
+        if instrument.active is not None:
+            instrument.active.count("validations")
+        if not self._gene_type.validate(value):
+            raise ValueError()
+        self._chromosome._set_value(self._col, value, self._gene_type)
+
+
+class CompactChromosome(Chromosome):
+    """Chromosome storing its gene values in one tuple.
+
+    No Gene objects are kept: ``values`` is the tuple itself, while
+    indexing and ``genes_list`` return CompactGeneView objects built on
+    demand (assigning to them replaces the tuple). Fitness functions should
+    read ``values``. A 500-gene chromosome takes a few kilobytes instead
+    of tens of kilobytes, and list crossover recombines tuple slices.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values, chromosome_tmplt: ChromosomeTemplate):
+        values = tuple(values)
+        types_list = chromosome_tmplt.types_list
+        if not values or len(values) != len(types_list):
+            raise ValueError("Invalid values")
+        if instrument.active is not None:
+            instrument.active.count("validations", len(values))
+        if not all(t.validate(v) for v, t in zip(values, types_list)):
+            raise ValueError()
+        self._values = values
+        self._chromosome_tmplt = chromosome_tmplt
+        self._fitness = 0
+        if instrument.active is not None:
+            instrument.active.count("chromosomes")
+
+    @classmethod
+    def _wrap(cls, values, chromosome_tmplt):
+        if instrument.active is not None:
+            instrument.active.count("chromosomes")
+        chromosome = cls.__new__(cls)
+        chromosome._values = values
+        chromosome._chromosome_tmplt = chromosome_tmplt
+        chromosome._fitness = 0
+        return chromosome
+
+    def __str__(self) -> str:
+        return f"Chromosome({' '.join([str(v) for v in self._values])})"
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [CompactGeneView(self, col) for col in range(len(self))[i]]
+        return CompactGeneView(self, range(len(self))[i])
+
+    @property
+    def genes_list(self):
+        return self[:]
+
+    @property
+    def values(self):
+        return self._values
+
+    @property
+    def _sequence(self):
+        return self._values
+
+    def _offspring(self, sequence):
+        return CompactChromosome._wrap(tuple(sequence), self._chromosome_tmplt)
+
+    def _set_value(self, col, value, gene_type):
+        self._values = self._values[:col] + (value,) + self._values[col + 1 :]
+
+
+class Population(Sequence):
     def __init__(self, chromosome_list):
-        if any(
-            [
-                c.chromosome_tmplt != chromosome_list[0].chromosome_tmplt
+        if chromosome_list:
+            first = chromosome_list[0].chromosome_tmplt
+            if any(
+                c.chromosome_tmplt is not first and c.chromosome_tmplt != first
                 for c in chromosome_list
-            ]
-        ):
-            raise ValueError
+            ):
+                raise ValueError
         self._chromosome_list = chromosome_list
         self._index = 0
+        self._sort_mode = None
+
+    @classmethod
+    def _wrap(cls, chromosome_list):
+        # Unchecked constructor for chromosomes known to share a template.
+        population = cls.__new__(cls)
+        population._chromosome_list = chromosome_list
+        population._index = 0
+        population._sort_mode = None
+        return population
 
     def __str__(self) -> str:
         return "Population(\n    {}\n    )".format(
-            "\n    ".join([str(c) for c in self._chromosome_list])
+            "\n    ".join([str(c) for c in self.chromosome_list])
         )
 
-    def fitness(self, func, mode="maximize"):
-        for c in self._chromosome_list:
-            c.fitness = func(c)
-        self._chromosome_list.sort()
+    def __len__(self) -> int:
+        return len(self._chromosome_list)
+
+    def __getitem__(self, i):
+        self._apply_sort()
+        return self._chromosome_list[i]
+
+    @property
+    def chromosome_list(self):
+        self._apply_sort()
+        return self._chromosome_list
+
+    @chromosome_list.setter
+    def chromosome_list(self, value):
+        raise ValueError()
+
+    @property
+    def chromosome_tmplt(self):
+        if not self._chromosome_list:
+            return None
+        return self._chromosome_list[0].chromosome_tmplt
+
+    @property
+    def genomes(self):
+        return np.array(
+            [c.values for c in self.chromosome_list],
+            dtype=self.chromosome_tmplt.dtype,
+        )
+
+    @instrument.timed("fitness")
+    def fitness(self, func, mode="maximize", evaluator=None):
+        """Evaluates every chromosome and orders the population by fitness.
+
+        Ordering is deferred: it is applied the first time the population
+        is indexed or iterated, while ``get_parents`` only selects the best
+        chromosomes (in the same order) without sorting everything.
+        Coroutine functions are evaluated concurrently by an
+        evaluators.AsyncEvaluator unless another evaluator is given.
+        """
+        if evaluator is None:
+            evaluator = _default_evaluator(func)
+        self._sort_mode = None
+        self._set_fitness(evaluator.evaluate(func, self))
+        self._sort_mode = mode
+        instrument.count("evaluations", len(self))
+
+    @instrument.timed("fitness")
+    async def fitness_async(self, func, mode="maximize", evaluator=None):
+        """Coroutine version of ``fitness`` for use inside an event loop.
+
+        Evaluators without ``evaluate_async`` are called synchronously.
+        """
+        if evaluator is None:
+            evaluator = _default_evaluator(func)
+        self._sort_mode = None
+        if hasattr(evaluator, "evaluate_async"):
+            values = await evaluator.evaluate_async(func, self)
+        else:
+            values = evaluator.evaluate(func, self)
+        self._set_fitness(values)
+        self._sort_mode = mode
+        instrument.count("evaluations", len(self))
+
+    def _apply_sort(self):
+        if self._sort_mode is not None:
+            mode, self._sort_mode = self._sort_mode, None
+            self._sort(mode)
+
+    def _set_fitness(self, values):
+        for c, value in zip(self._chromosome_list, values):
+            c.fitness = _to_python(value)
+
+    @instrument.timed("sort")
+    def _sort(self, mode):
+        self._chromosome_list.sort(key=_fitness_key)
         if mode == "maximize":
             self._chromosome_list.reverse()
 
+    @instrument.timed("get_parents")
     def get_parents(self, parents_count=2):
         if parents_count > len(self._chromosome_list):
             raise ValueError()
         elif parents_count < 1:
             raise ValueError()
-        return self._chromosome_list[:parents_count]
+        if self._sort_mode is None or parents_count == len(self):
+            return self.chromosome_list[:parents_count]
+        return [
+            self._chromosome_list[row] for row in self._top_k(parents_count)
+        ]
+
+    def _top_k(self, k):
+        # Same order as the stable sort (reversed when maximizing).
+        select = (
+            heapq.nlargest if self._sort_mode == "maximize" else heapq.nsmallest
+        )
+        return select(
+            k,
+            range(len(self._chromosome_list)),
+            key=lambda row: (self._chromosome_list[row].fitness, row),
+        )
+
+    def _take(self, rows):
+        return Population([self._chromosome_list[row] for row in rows])
 
     @staticmethod
+    @instrument.timed("generate")
     def generate_random_population(
-        population_size, chromosome_tmplt: ChromosomeTemplate
+        population_size,
+        chromosome_tmplt: ChromosomeTemplate,
+        rng=None,
+        compact=False,
+        workers=None,
     ):
-        return Population(
-            [
-                Chromosome.generate_random_chromosome(chromosome_tmplt)
-                for _ in range(population_size)
+        """Random population of Chromosome objects, or of CompactChromosome
+        objects with ``compact``. Values are drawn as by ``random_genomes``
+        (on ``workers`` threads)."""
+        dtype = chromosome_tmplt.dtype
+        if any(t.dtype != dtype for t in chromosome_tmplt.types_list):
+            # Each gene keeps its own type's values, e.g. ints are not turned
+            # into floats by a mixed numeric template.
+            dtype = np.dtype(object)
+        genomes = random_genomes(
+            np.empty(
+                (population_size, len(chromosome_tmplt.types_list)),
+                dtype=dtype,
+            ),
+            chromosome_tmplt,
+            rng,
+            workers,
+        )
+        return Population._wrap(
+            _chromosomes(genomes.tolist(), chromosome_tmplt, compact)
+        )
+
+
+def _chromosomes(genomes, chromosome_tmplt, compact=False):
+    # Chromosomes wrapping the rows of a list of valid genomes.
+    if compact:
+        return [
+            CompactChromosome._wrap(tuple(genome), chromosome_tmplt)
+            for genome in genomes
+        ]
+    types_list = chromosome_tmplt.types_list
+    return [
+        Chromosome._wrap(
+            [Gene._wrap(v, t) for v, t in zip(genome, types_list)],
+            chromosome_tmplt,
+        )
+        for genome in genomes
+    ]
+
+
+################################################################################
+
+
+class GeneView(Gene):
+    """Gene backed by a single cell of a PopulationMatrix."""
+
+    __slots__ = ("_population", "_row", "_col")
+
+    def __init__(self, population, row, col) -> None:
+        self._population = population
+        self._row = row
+        self._col = col
+        self._gene_type = population.chromosome_tmplt.types_list[col]
+
+    def __str__(self) -> str:
+        return f"Gene({self.value})"
+
+    @property
+    def value(self):
+        return _to_python(self._population.genomes[self._row, self._col])
+
+    @value.setter
+    def value(self, value):
+        if instrument.active is not None:
+            instrument.active.count("validations")
+        if not self._gene_type.validate(value):
+            raise ValueError()
+        self._population.genomes[self._row, self._col] = value
+
+
+class ChromosomeView(Chromosome):
+    """Chromosome backed by a single row of a PopulationMatrix.
+
+    Views are live: they always reflect the current content of the row,
+    so reordering the population (e.g. by ``fitness``) changes what an
+    existing view points at. Crossover offspring of views are Chromosome
+    objects holding copies of the values.
+    """
+
+    __slots__ = ("_population", "_row")
+
+    def __init__(self, population, row) -> None:
+        self._population = population
+        self._row = row
+
+    def __str__(self) -> str:
+        return "Chromosome({})".format(
+            " ".join([str(_to_python(v)) for v in self.genome])
+        )
+
+    def __len__(self) -> int:
+        return self._population.genomes.shape[1]
+
+    def __lt__(self, __o):
+        return self.fitness < __o.fitness
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [
+                GeneView(self._population, self._row, col)
+                for col in range(len(self))[i]
             ]
+        return GeneView(self._population, self._row, range(len(self))[i])
+
+    @property
+    def genome(self):
+        return self._population.genomes[self._row]
+
+    @property
+    def values(self):
+        return tuple(self.genome.tolist())
+
+    @property
+    def genes_list(self):
+        return self[:]
+
+    @property
+    def _sequence(self):
+        return self.values
+
+    def _offspring(self, sequence):
+        # Children get their own Genes, built from the copied values, so
+        # they do not change with the parents' rows.
+        types_list = self.chromosome_tmplt.types_list
+        return Chromosome._wrap(
+            [Gene._wrap(v, t) for v, t in zip(sequence, types_list)],
+            self.chromosome_tmplt,
+        )
+
+    def _set_value(self, col, value, gene_type):
+        self._population.genomes[self._row, col] = value
+
+    @property
+    def chromosome_tmplt(self):
+        return self._population.chromosome_tmplt
+
+    @property
+    def fitness(self):
+        return self._population.fitness_array[self._row].item()
+
+    @fitness.setter
+    def fitness(self, value):
+        self._population.fitness_array[self._row] = value
+
+
+class PopulationMatrix(Population):
+    """Population storing all genomes in one contiguous 2D array.
+
+    Row ``i`` of ``genomes`` is the i-th chromosome and column ``j`` holds
+    the values of the j-th gene, with a dtype chosen from the chromosome
+    template. Fitness values are kept in a parallel 1D array. Indexing the
+    population returns ChromosomeView objects, so code written against
+    Population keeps working.
+    """
+
+    def __init__(
+        self, genomes, chromosome_tmplt: ChromosomeTemplate, fitness=None
+    ):
+        dtype = chromosome_tmplt.dtype
+        # Mixed templates keep the Python values, so e.g. ints and strings
+        # are not coerced to one string dtype before validation.
+        values = np.array(
+            genomes, dtype=object if dtype.hasobject else None, ndmin=2
+        )
+        if values.ndim != 2 or values.shape[1] != len(
+            chromosome_tmplt.types_list
+        ):
+            raise ValueError()
+        instrument.count("validations", values.size)
+        for col, t in enumerate(chromosome_tmplt.types_list):
+            if not t.validate_batch(values[:, col]).all():
+                raise ValueError()
+        self._init(values.astype(dtype), chromosome_tmplt, fitness)
+
+    def _init(self, genomes, chromosome_tmplt, fitness=None):
+        if fitness is None:
+            fitness = np.zeros(len(genomes), dtype=np.float64)
+        else:
+            fitness = np.array(fitness, dtype=np.float64)
+            if fitness.shape != (len(genomes),):
+                raise ValueError()
+        self._genomes = genomes
+        self._fitness = fitness
+        self._chromosome_tmplt = chromosome_tmplt
+        self._sort_mode = None
+
+    @classmethod
+    def _wrap(cls, genomes, chromosome_tmplt, fitness=None):
+        population = cls.__new__(cls)
+        population._init(genomes, chromosome_tmplt, fitness)
+        return population
+
+    def __len__(self) -> int:
+        return len(self._genomes)
+
+    def __getitem__(self, i):
+        self._apply_sort()
+        if isinstance(i, slice):
+            return [ChromosomeView(self, row) for row in range(len(self))[i]]
+        return ChromosomeView(self, range(len(self))[i])
+
+    @property
+    def chromosome_list(self):
+        return self[:]
+
+    @property
+    def chromosome_tmplt(self):
+        return self._chromosome_tmplt
+
+    @property
+    def genomes(self):
+        self._apply_sort()
+        return self._genomes
+
+    @property
+    def fitness_array(self):
+        self._apply_sort()
+        return self._fitness
+
+    def _set_fitness(self, values):
+        self._fitness[:] = values
+
+    @instrument.timed("sort")
+    def _sort(self, mode):
+        order = np.argsort(self._fitness, kind="stable")
+        if mode == "maximize":
+            order = order[::-1]
+        self._genomes[:] = self._genomes[order]
+        self._fitness[:] = self._fitness[order]
+
+    @instrument.timed("get_parents")
+    def get_parents(self, parents_count=2):
+        if parents_count > len(self):
+            raise ValueError()
+        elif parents_count < 1:
+            raise ValueError()
+        if self._sort_mode is None or parents_count == len(self):
+            self._apply_sort()
+            rows = slice(parents_count)
+        else:
+            rows = top_k_indices(
+                self._fitness, parents_count, self._sort_mode == "maximize"
+            )
+        return PopulationMatrix._wrap(
+            self._genomes[rows].copy(),
+            self._chromosome_tmplt,
+            self._fitness[rows],
+        )
+
+    def _allocate(self, rows_count):
+        return PopulationMatrix._wrap(
+            np.empty((rows_count, self._genomes.shape[1]), self._genomes.dtype),
+            self._chromosome_tmplt,
+        )
+
+    def _recombine(self, indices, mask, out=None, start=0):
+        # Writes the children of the pairs into rows 2 * start onwards.
+        if out is None:
+            out = self._allocate(len(mask) * 2)
+        stop = start + len(mask)
+        if (
+            out is self
+            or out._genomes.shape[1] != mask.shape[1]
+            or len(out) < stop * 2
+        ):
+            raise ValueError()
+        for child, (first, second) in enumerate([(0, 1), (1, 0)]):
+            rows = out._genomes[start * 2 + child : stop * 2 : 2]
+            np.copyto(rows, self._genomes[indices[:, second]])
+            np.copyto(rows, self._genomes[indices[:, first]], where=mask)
+        out._fitness[start * 2 : stop * 2] = 0
+        out._sort_mode = None
+        return out
+
+    def _take(self, rows):
+        return PopulationMatrix._wrap(
+            self._genomes[rows], self._chromosome_tmplt, self._fitness[rows]
+        )
+
+    def to_population(self, compact=False):
+        chromosome_list = _chromosomes(
+            self._genomes.tolist(), self._chromosome_tmplt, compact
+        )
+        for chromosome, fitness in zip(chromosome_list, self._fitness.tolist()):
+            chromosome._fitness = fitness
+        return Population._wrap(chromosome_list)
+
+    @staticmethod
+    def from_population(population: Population):
+        return PopulationMatrix._wrap(
+            population.genomes,
+            population.chromosome_tmplt,
+            [c.fitness for c in population.chromosome_list],
         )
 
+    @staticmethod
+    @instrument.timed("generate")
+    def generate_random_population(
+        population_size,
+        chromosome_tmplt: ChromosomeTemplate,
+        rng=None,
+        workers=None,
+        chunk_size=None,
+    ):
+        """Random population, filled by ``random_genomes``: reproducible
+        for a given ``rng`` and ``chunk_size`` with any number of
+        ``workers``."""
+        genomes = np.empty(
+            (population_size, len(chromosome_tmplt.types_list)),
+            dtype=chromosome_tmplt.dtype,
+        )
+        random_genomes(genomes, chromosome_tmplt, rng, workers, chunk_size)
+        return PopulationMatrix._wrap(genomes, chromosome_tmplt)
+
 
 ################################################################################
 
 
 class Crossover(ABC):
+    """Base class for crossover operators.
+
+    ``parents`` is either a list of chromosomes or an array-backed
+    population (PopulationMatrix, binary.PackedBinaryPopulation). For lists,
+    offspring are built pair by pair as Chromosome objects. For array-backed
+    parents the whole next generation is produced at once: parent indices
+    for all pairs are drawn as arrays and the parents' ``_recombine``
+    assembles offspring with the boolean mask returned by
+    ``_crossover_mask`` (True takes the gene of the first parent for the
+    first child and of the second parent for the second child). Offspring
+    are recombined the parents' ``chunk_size`` (e.g. for
+    mapped.MappedPopulation) or grandom.DEFAULT_CHUNK_SIZE at a time, so
+    masks never cover a huge generation. Each chunk draws its masks from
+    its own random stream and chunks run on up to ``workers`` threads:
+    offspring depend on ``rng`` and the chunk size, not on ``workers``.
+
+    Parent pairs for the whole generation are drawn in one call by
+    ``selection`` (a selection.Selection). By default this is roulette
+    selection when ``proportionate_selection`` is set and uniform selection
+    of distinct pairs otherwise.
+
+    All randomness comes from ``rng``, a seed, SeedSequence or Generator
+    (see grandom.get_rng).
+    """
+
     def __init__(
-        self, parents, next_population_size, proportionate_selection=True
+        self,
+        parents,
+        next_population_size,
+        proportionate_selection=True,
+        rng=None,
+        selection=None,
+        workers=None,
     ) -> None:
         self._parents = parents
         self._next_population_size = next_population_size
-        self._proportionate_selection = proportionate_selection
-
-    def _select_parents(self):
-        if self._proportionate_selection:
-            weights = [p.fitness for p in self._parents]
-            if sum(weights) == 0:
-                weights = [1] * len(weights)
-            selected_parents = random.choices(
-                self._parents, weights=weights, k=2
-            )
+        self._rng = None if rng is None else grandom.get_rng(rng)
+        self._workers = workers
+        if selection is None:
+            if proportionate_selection:
+                selection = RouletteSelection()
+            else:
+                selection = RandomSelection()
+        self._selection = selection
+
+    def _get_rng(self):
+        return grandom.get_rng(self._rng)
+
+    @instrument.timed("selection")
+    def _select_parents_indices(self, pairs_count, rng):
+        if hasattr(self._parents, "_recombine"):
+            # Rows in evaluation order, as used by _recombine.
+            fitness = self._parents._fitness
+        else:
+            fitness = [p.fitness for p in self._parents]
+        self._selection.prepare(fitness)
+        return self._selection.select_pairs(pairs_count, rng)
+
+    def _parents_template(self):
+        # Offspring genes are copied from the parents, so checking that the
+        # parents share a template (and kind of chromosome) once per
+        # generation validates them all.
+        if len({type(p) for p in self._parents}) > 1:
+            raise ValueError("Parents mix kinds of chromosomes")
+        return Population(self._parents).chromosome_tmplt
+
+    def _select_parent_pairs(self, rng):
+        pairs_count = round(self._next_population_size / 2)
+        indices = self._select_parents_indices(pairs_count, rng)
+        return [(self._parents[i], self._parents[j]) for i, j in indices]
+
+    @instrument.timed("crossover")
+    def generate_new_population(self, out=None):
+        """Returns the offspring population.
+
+        For array-backed parents, ``out`` can be a population of the same
+        kind with room for the offspring; it is then overwritten and
+        returned instead of allocating a new one.
+        """
+        if hasattr(self._parents, "_recombine"):
+            return self._generate_new_batch(out)
+        elif out is not None:
+            raise ValueError()
+        return self._generate_new_list()
+
+    def _generate_new_batch(self, out=None):
+        rng = self._get_rng()
+        pairs_count = round(self._next_population_size / 2)
+        indices = self._select_parents_indices(pairs_count, rng)
+        genes_count = len(self._parents.chromosome_tmplt.types_list)
+        if out is None:
+            out = self._parents._allocate(pairs_count * 2)
+        elif len(out) != pairs_count * 2:
+            raise ValueError()
+        if getattr(self._parents, "packed", False):
+            crossover_mask = self._crossover_word_mask
         else:
-            selected_parents = random.sample(self._parents, k=2)
-        return tuple(selected_parents)
+            crossover_mask = self._crossover_mask
+        chunk_size = getattr(self._parents, "chunk_size", None)
+        chunk_size = chunk_size or grandom.DEFAULT_CHUNK_SIZE
+
+        def recombine(start, stop, chunk_rng):
+            mask = crossover_mask(stop - start, genes_count, chunk_rng)
+            self._parents._recombine(indices[start:stop], mask, out, start)
+
+        grandom.map_chunks(
+            recombine, pairs_count, max(chunk_size // 2, 1), rng, self._workers
+        )
+        return out
+
+    def _crossover_word_mask(self, pairs_count, genes_count, rng):
+        import binary
+
+        return binary.pack(self._crossover_mask(pairs_count, genes_count, rng))
+
+    @abstractmethod
+    def _generate_new_list(self):
+        pass
 
     @abstractmethod
-    def generate_new_population(self):
+    def _crossover_mask(self, pairs_count, genes_count, rng):
         pass
 
 
 class OnePointCrossover(Crossover):
-    def generate_new_population(self):
+    def _crossover_mask(self, pairs_count, genes_count, rng):
+        cut_points = rng.integers(1, genes_count, size=(pairs_count, 1))
+        return np.arange(genes_count) < cut_points
+
+    def _crossover_word_mask(self, pairs_count, genes_count, rng):
+        import binary
+
+        cut_points = rng.integers(1, genes_count, size=(pairs_count, 1))
+        return binary.prefix_mask(cut_points, binary.words_count(genes_count))
+
+    def _generate_new_list(self):
+        self._parents_template()
+        rng = self._get_rng()
+        pairs = self._select_parent_pairs(rng)
+        genes_count = len(self._parents[0])
+        cut_points = rng.integers(1, genes_count, size=len(pairs)).tolist()
         new_population_list = []
-        for i in range(round(self._next_population_size / 2)):
-            p1, p2 = self._select_parents()
-            cut_point = random.randint(1, len(p1) - 1)
-            c1 = Chromosome(p1[:cut_point] + p2[cut_point:])
-            c2 = Chromosome(p2[:cut_point] + p1[cut_point:])
+        for (p1, p2), cut_point in zip(pairs, cut_points):
+            s1, s2 = p1._sequence, p2._sequence
+            c1 = p1._offspring(s1[:cut_point] + s2[cut_point:])
+            c2 = p1._offspring(s2[:cut_point] + s1[cut_point:])
             new_population_list.append(c1)
             new_population_list.append(c2)
-            print(list(range(1, len(p1))))
-        return Population(new_population_list)
+        return Population._wrap(new_population_list)
 
 
 class MultipointCrossover(Crossover):
@@ -210,50 +1031,161 @@ class MultipointCrossover(Crossover):
         next_population_size,
         proportionate_selection=True,
         cut_points_count=3,
+        rng=None,
+        selection=None,
+        workers=None,
     ) -> None:
-        super().__init__(parents, next_population_size, proportionate_selection)
+        super().__init__(
+            parents,
+            next_population_size,
+            proportionate_selection,
+            rng,
+            selection,
+            workers,
+        )
         self._cut_points_count = cut_points_count
 
-    def generate_new_population(self):
-        new_population_list = []
-        for i in range(round(self._next_population_size / 2)):
-            p1, p2 = self._select_parents()
-
-            cut_points = sorted(
-                random.sample(range(1, len(p1)), k=self._cut_points_count)
+    def _cut_points(self, pairs_count, genes_count, rng):
+        if not 0 < self._cut_points_count < genes_count:
+            raise ValueError()
+        if self._cut_points_count * 2 > genes_count - 1:
+            return (
+                np.argpartition(
+                    rng.random((pairs_count, genes_count - 1)),
+                    self._cut_points_count - 1,
+                    axis=1,
+                )[:, : self._cut_points_count]
+                + 1
+            )
+        # Sparse cut points: resample the rare rows with repeated points.
+        cut_points = rng.integers(
+            1, genes_count, size=(pairs_count, self._cut_points_count)
+        )
+        cut_points.sort(axis=1)
+        repeated = (cut_points[:, 1:] == cut_points[:, :-1]).any(axis=1)
+        while repeated.any():
+            cut_points[repeated] = np.sort(
+                rng.integers(
+                    1,
+                    genes_count,
+                    size=(repeated.sum(), self._cut_points_count),
+                ),
+                axis=1,
             )
+            repeated = (cut_points[:, 1:] == cut_points[:, :-1]).any(axis=1)
+        return cut_points
+
+    def _crossover_mask(self, pairs_count, genes_count, rng):
+        cuts = np.zeros((pairs_count, genes_count + 1), dtype=np.uint8)
+        np.put_along_axis(
+            cuts, self._cut_points(pairs_count, genes_count, rng), 1, axis=1
+        )
+        return (np.cumsum(cuts[:, :-1], axis=1, dtype=np.uint8) & 1).astype(
+            bool
+        )
+
+    def _crossover_word_mask(self, pairs_count, genes_count, rng):
+        import binary
+
+        words = binary.words_count(genes_count)
+        cut_points = self._cut_points(pairs_count, genes_count, rng)
+        mask = np.zeros((pairs_count, words), dtype=np.uint64)
+        for i in range(self._cut_points_count):
+            mask ^= binary.prefix_mask(cut_points[:, i : i + 1], words)
+        if self._cut_points_count % 2:
+            mask = ~mask
+        return mask
+
+    def _generate_new_list(self):
+        self._parents_template()
+        rng = self._get_rng()
+        pairs = self._select_parent_pairs(rng)
+        all_cut_points = np.sort(
+            self._cut_points(len(pairs), len(self._parents[0]), rng), axis=1
+        ).tolist()
+        new_population_list = []
+        for (p1, p2), cut_points in zip(pairs, all_cut_points):
+            s1, s2 = p1._sequence, p2._sequence
 
             c1 = []
             c2 = []
 
             for i in range(len(cut_points) + 1):
                 if i == 0:
-                    c1 += p2[: cut_points[i]]
-                    c2 += p1[: cut_points[i]]
+                    c1 += s2[: cut_points[i]]
+                    c2 += s1[: cut_points[i]]
                 elif i == len(cut_points):
                     if i % 2:
-                        c1 += p1[cut_points[i - 1] :]
-                        c2 += p2[cut_points[i - 1] :]
+                        c1 += s1[cut_points[i - 1] :]
+                        c2 += s2[cut_points[i - 1] :]
                     else:
-                        c1 += p2[cut_points[i - 1] :]
-                        c2 += p1[cut_points[i - 1] :]
+                        c1 += s2[cut_points[i - 1] :]
+                        c2 += s1[cut_points[i - 1] :]
                 elif i % 2:
-                    c1 += p1[cut_points[i - 1] : cut_points[i]]
-                    c2 += p2[cut_points[i - 1] : cut_points[i]]
+                    c1 += s1[cut_points[i - 1] : cut_points[i]]
+                    c2 += s2[cut_points[i - 1] : cut_points[i]]
                 else:
-                    c1 += p2[cut_points[i - 1] : cut_points[i]]
-                    c2 += p1[cut_points[i - 1] : cut_points[i]]
-            new_population_list.append(Chromosome(c1))
-            new_population_list.append(Chromosome(c2))
-        return Population(new_population_list)
+                    c1 += s2[cut_points[i - 1] : cut_points[i]]
+                    c2 += s1[cut_points[i - 1] : cut_points[i]]
+            new_population_list.append(p1._offspring(c1))
+            new_population_list.append(p1._offspring(c2))
+        return Population._wrap(new_population_list)
+
 
+class UniformCrossover(Crossover):
+    """Swaps each gene between the two parents with ``swap_probability``.
 
-# class UniformCrossover(Crossover):
-#     def __init__(self) -> None:
-#         super().__init__()
+    The swap mask for all pairs is drawn as one boolean matrix, also for
+    list parents.
+    """
 
-#     def get_parents(self):
-#         pass
+    def __init__(
+        self,
+        parents,
+        next_population_size,
+        proportionate_selection=True,
+        swap_probability=0.5,
+        rng=None,
+        selection=None,
+        workers=None,
+    ) -> None:
+        if not 0 <= swap_probability <= 1:
+            raise ValueError("Invalid swap probability")
+        super().__init__(
+            parents,
+            next_population_size,
+            proportionate_selection,
+            rng,
+            selection,
+            workers,
+        )
+        self._swap_probability = swap_probability
+
+    def _crossover_mask(self, pairs_count, genes_count, rng):
+        return rng.random((pairs_count, genes_count)) >= self._swap_probability
+
+    def _crossover_word_mask(self, pairs_count, genes_count, rng):
+        if self._swap_probability != 0.5:
+            return super()._crossover_word_mask(pairs_count, genes_count, rng)
+        import binary
+
+        return binary.random_words(
+            (pairs_count, binary.words_count(genes_count)), rng
+        )
+
+    def _generate_new_list(self):
+        self._parents_template()
+        rng = self._get_rng()
+        pairs = self._select_parent_pairs(rng)
+        masks = self._crossover_mask(len(pairs), len(self._parents[0]), rng)
+        new_population_list = []
+        for (p1, p2), mask in zip(pairs, masks.tolist()):
+            s1, s2 = p1._sequence, p2._sequence
+            c1 = [g1 if m else g2 for g1, g2, m in zip(s1, s2, mask)]
+            c2 = [g2 if m else g1 for g1, g2, m in zip(s1, s2, mask)]
+            new_population_list.append(p1._offspring(c1))
+            new_population_list.append(p1._offspring(c2))
+        return Population._wrap(new_population_list)
 
 
 ################################################################################
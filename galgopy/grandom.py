@@ -0,0 +1,76 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+################################################################################
+
+# Rows generated or pairs recombined per independent random stream.
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def iter_chunks(size, chunk_size=None):
+    """``(start, stop)`` bounds of consecutive chunks of ``range(size)``
+    of at most ``chunk_size`` items (one chunk by default)."""
+    if chunk_size is None:
+        chunk_size = max(size, 1)
+    elif chunk_size < 1:
+        raise ValueError("Invalid chunk size")
+    for start in range(0, size, chunk_size):
+        yield start, min(start + chunk_size, size)
+
+
+def get_rng(rng=None):
+    """``rng`` (a seed, SeedSequence or Generator) as a numpy Generator.
+
+    Without one, a Generator is seeded from the random module, so
+    ``random.seed`` keeps runs reproducible.
+    """
+    if rng is None:
+        return np.random.default_rng(random.getrandbits(64))
+    return np.random.default_rng(rng)
+
+
+def spawn(rng, n):
+    """``n`` independent Generators derived from ``rng``.
+
+    Seeds and SeedSequences are spawned directly. Generators (and None, see
+    ``get_rng``) seed a SeedSequence with numbers drawn from them, which
+    advances their state: the children only depend on that state, so a
+    run restored from a checkpoint spawns the same children.
+    """
+    if isinstance(rng, np.random.SeedSequence):
+        seed = rng
+    elif rng is None or isinstance(rng, np.random.Generator):
+        seed = np.random.SeedSequence(
+            get_rng(rng).integers(2**63, size=4).tolist()
+        )
+    else:
+        seed = np.random.SeedSequence(rng)
+    return [np.random.default_rng(child) for child in seed.spawn(n)]
+
+
+def map_chunks(func, size, chunk_size=None, rng=None, workers=None):
+    """Calls ``func(start, stop, rng)`` for consecutive chunks of
+    ``range(size)`` and returns the results in order.
+
+    Every chunk draws from its own Generator: ``rng`` itself when there is
+    a single chunk, otherwise the i-th Generator spawned from it. Results
+    therefore depend on ``rng`` and ``chunk_size`` but not on ``workers``,
+    the number of threads the chunks run on (numpy releases the GIL while
+    drawing and copying arrays, so chunks run in parallel).
+    """
+    chunks = list(iter_chunks(size, chunk_size))
+    if len(chunks) == 1:
+        rngs = [get_rng(rng)]
+    else:
+        rngs = spawn(rng, len(chunks))
+    if workers is None or workers <= 1 or len(chunks) == 1:
+        return [
+            func(start, stop, chunk_rng)
+            for (start, stop), chunk_rng in zip(chunks, rngs)
+        ]
+    with ThreadPoolExecutor(workers) as pool:
+        return list(
+            pool.map(lambda args: func(*args[0], args[1]), zip(chunks, rngs))
+        )
@@ -1,10 +1,59 @@
 import numbers
 import random
 import string
-from abc import ABC, abstractmethod
+import weakref
+from abc import ABCMeta, abstractmethod
 
+import numpy as np
+
+################################################################################
+
+
+def _get_rng(rng):
+    # Same as grandom.get_rng: gene types are the bottom layer and import no
+    # other galgopy module.
+    if rng is None:
+        return np.random.default_rng(random.getrandbits(64))
+    return np.random.default_rng(rng)
+
+
+# Canonical gene type instances by fingerprint.
+_interned = weakref.WeakValueDictionary()
+
+
+def intern(gene_type):
+    """Canonical instance equal to ``gene_type`` (flyweight).
+
+    Only types hashed with ``GeneType.__hash__`` (the built-in types, and
+    custom types that set ``__hash__ = GeneType.__hash__`` because their
+    ``params`` describe them completely) are interned; other objects are
+    returned as they are.
+    """
+    if getattr(gene_type, "_canonical", False):
+        return gene_type
+    if type(gene_type).__hash__ is not GeneType.__hash__:
+        return gene_type
+    canonical = _interned.setdefault(gene_type.fingerprint, gene_type)
+    canonical._canonical = True
+    return canonical
+
+
+class _InternedType(ABCMeta):
+    # Constructing a gene type returns the interned instance.
+    def __call__(cls, *args, **kwargs):
+        return intern(super().__call__(*args, **kwargs))
+
+
+class GeneType(metaclass=_InternedType):
+    """Base class for gene types.
+
+    Built-in gene types are immutable and interned: constructing a type
+    equal to an existing one returns the existing instance, so equal types
+    are usually identical and compare by identity.
+    """
+
+    _canonical = False
 
-class GeneType(ABC):
     def __init__(self) -> None:
         pass
 
@@ -24,19 +73,94 @@ class GeneType(ABC):
     def validate(self, n):
         pass
 
+    def sample(self, n, rng=None):
+        """Array of ``n`` random valid values with dtype ``self.dtype``.
+
+        The built-in types draw all values at once from ``rng`` (see
+        grandom.get_rng); the default draws them one by one with
+        ``get_random_val``, so custom types that do not override ``sample``
+        use the random module.
+        """
+        return np.fromiter(
+            (self.get_random_val() for _ in range(n)), dtype=self.dtype, count=n
+        )
+
+    def validate_batch(self, values):
+        """Boolean array telling which of ``values`` are valid, with the
+        shape of ``values``.
+
+        The built-in types compare native numpy arrays vectorized; other
+        arrays (e.g. of dtype object) are checked with ``validate`` value by
+        value.
+        """
+        values = np.asarray(values)
+        return np.fromiter(
+            (self.validate(v) for v in values.flat),
+            dtype=bool,
+            count=values.size,
+        ).reshape(values.shape)
+
+    @property
+    def dtype(self):
+        return np.dtype(object)
+
+    @property
+    def params(self):
+        """Constructor arguments: ``type(t)(**t.params) == t``."""
+        return {}
+
+    @property
+    def fingerprint(self):
+        """Hashable structural key: the class and its ``params``."""
+        return (type(self), tuple(sorted(self.params.items())))
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(self.fingerprint)
+            return self._hash
+
+    def __getstate__(self):
+        # Unpickled copies are not canonical, and string hashes differ
+        # between processes.
+        state = self.__dict__.copy()
+        state.pop("_canonical", None)
+        state.pop("_hash", None)
+        return state
+
 
 class BinaryType(GeneType):
+    __hash__ = GeneType.__hash__
+
     def __eq__(self, __o: object) -> bool:
         return isinstance(__o, type(self))
 
     def __str__(self) -> str:
         return "BinaryType()"
 
-    def get_random_val(self):
+    def get_random_val(self, rng=None):
+        if rng is not None:
+            return self.sample(1, rng).item()
         return random.randint(0, 1)
 
+    def sample(self, n, rng=None):
+        # Eight values per random byte.
+        random_bytes = _get_rng(rng).bytes(-(-n // 8))
+        return np.unpackbits(np.frombuffer(random_bytes, dtype=np.uint8))[:n]
+
     def validate(self, n):
-        return n in [0, 1]
+        return n in (0, 1)
+
+    def validate_batch(self, values):
+        values = np.asarray(values)
+        if values.dtype.kind not in "buif":
+            return super().validate_batch(values)
+        return (values == 0) | (values == 1)
+
+    @property
+    def dtype(self):
+        return np.dtype(np.uint8)
 
 
 class IntType(GeneType):
@@ -48,6 +172,20 @@ class IntType(GeneType):
     def __str__(self) -> str:
         return f"IntType(min={self._min_val} max={self._max_val})"
 
+    @property
+    def min_val(self):
+        return self._min_val
+
+    @property
+    def max_val(self):
+        return self._max_val
+
+    @property
+    def params(self):
+        return {"min_val": self._min_val, "max_val": self._max_val}
+
+    __hash__ = GeneType.__hash__
+
     def __eq__(self, __o: object) -> bool:
         return (
             isinstance(__o, type(self))
@@ -55,11 +193,57 @@ class IntType(GeneType):
             and (self._max_val == __o._max_val)
         )
 
-    def get_random_val(self):
+    def get_random_val(self, rng=None):
+        if rng is not None:
+            return self.sample(1, rng).item()
         return random.randint(self._min_val, self._max_val)
 
+    def sample(self, n, rng=None):
+        dtype = self.dtype
+        if dtype.hasobject:
+            # Beyond 64 bits: Python integers drawn by a generator seeded
+            # from ``rng``.
+            generator = random.Random(int(_get_rng(rng).integers(2**63)))
+            return np.fromiter(
+                (
+                    generator.randint(self._min_val, self._max_val)
+                    for _ in range(n)
+                ),
+                dtype=dtype,
+                count=n,
+            )
+        return _get_rng(rng).integers(
+            self._min_val, self._max_val, size=n, dtype=dtype, endpoint=True
+        )
+
     def validate(self, n):
-        return n in range(self._min_val, self._max_val + 1)
+        if type(n) is int or isinstance(n, numbers.Integral):
+            return self._min_val <= n <= self._max_val
+        # Integral floats (e.g. 2.0) are accepted, as by ``n in range(...)``.
+        return (
+            isinstance(n, numbers.Real)
+            and n % 1 == 0
+            and self._min_val <= n <= self._max_val
+        )
+
+    def validate_batch(self, values):
+        values = np.asarray(values)
+        if values.dtype.kind not in "buif":
+            return super().validate_batch(values)
+        valid = (values >= self._min_val) & (values <= self._max_val)
+        if values.dtype.kind == "f":
+            valid &= values % 1 == 0
+        return valid
+
+    @property
+    def dtype(self):
+        kind = "u" if self._min_val >= 0 else "i"
+        for size in (1, 2, 4, 8):
+            dtype = np.dtype(f"{kind}{size}")
+            info = np.iinfo(dtype)
+            if info.min <= self._min_val and self._max_val <= info.max:
+                return dtype
+        return np.dtype(object)
 
 
 class FloatType(GeneType):
@@ -72,6 +256,28 @@ class FloatType(GeneType):
     def __str__(self) -> str:
         return f"FloatType(min={self._min_val} max={self._max_val} ndigits={self._ndigits})"
 
+    @property
+    def min_val(self):
+        return self._min_val
+
+    @property
+    def max_val(self):
+        return self._max_val
+
+    @property
+    def ndigits(self):
+        return self._ndigits
+
+    @property
+    def params(self):
+        return {
+            "min_val": self._min_val,
+            "max_val": self._max_val,
+            "ndigits": self._ndigits,
+        }
+
+    __hash__ = GeneType.__hash__
+
     def __eq__(self, __o: object) -> bool:
         return (
             isinstance(__o, type(self))
@@ -80,15 +286,40 @@ class FloatType(GeneType):
             and (self._ndigits == __o._ndigits)
         )
 
-    def get_random_val(self):
+    def get_random_val(self, rng=None):
+        if rng is not None:
+            return self.sample(1, rng).item()
         num = random.random() * (self._max_val - self._min_val) + self._min_val
-        return round(num, ndigits=self._ndigits)
+        num = round(num, ndigits=self._ndigits)
+        # Rounding may reach the excluded upper bound.
+        if num >= self._max_val:
+            num = round(self._max_val - 10**-self._ndigits, self._ndigits)
+        return max(num, self._min_val)
+
+    def sample(self, n, rng=None):
+        values = _get_rng(rng).random(n)
+        values *= self._max_val - self._min_val
+        values += self._min_val
+        values = np.round(values, self._ndigits)
+        upper = round(self._max_val - 10**-self._ndigits, self._ndigits)
+        np.minimum(values, upper, out=values)
+        return np.maximum(values, self._min_val, out=values)
 
     def validate(self, n):
-        return isinstance(n, numbers.Number) and (
+        return (type(n) is float or isinstance(n, numbers.Number)) and (
             self._min_val <= n < self._max_val
         )
 
+    def validate_batch(self, values):
+        values = np.asarray(values)
+        if values.dtype.kind not in "buif":
+            return super().validate_batch(values)
+        return (values >= self._min_val) & (values < self._max_val)
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float64)
+
 
 class StrType(GeneType):
     def __init__(self, mode="all") -> None:
@@ -102,15 +333,60 @@ class StrType(GeneType):
             self._data = list(string.ascii_uppercase)
         else:
             self._data = list(string.ascii_letters)
+        self._symbols = frozenset(self._data)
+        # Bitmap of the alphabet code points, for validate_batch.
+        codes = [ord(c) for c in self._data]
+        self._bitmap = np.zeros(max(codes) + 1, dtype=bool)
+        self._bitmap[codes] = True
 
     def __str__(self) -> str:
         return f"StrType(mode={self._mode})"
 
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def alphabet(self):
+        return self._data
+
+    @property
+    def params(self):
+        return {"mode": self._mode}
+
+    __hash__ = GeneType.__hash__
+
     def __eq__(self, __o: object) -> bool:
         return isinstance(__o, type(self)) and self._data == __o._data
 
-    def get_random_val(self):
+    def get_random_val(self, rng=None):
+        if rng is not None:
+            return self.sample(1, rng).item()
         return random.choice(self._data)
 
+    def sample(self, n, rng=None):
+        return _get_rng(rng).choice(np.array(self._data), size=n)
+
     def validate(self, n):
-        return n in self._data
+        return isinstance(n, str) and n in self._symbols
+
+    def validate_batch(self, values):
+        values = np.asarray(values)
+        if values.dtype.kind != "U" or not values.dtype.itemsize:
+            return super().validate_batch(values)
+        # Each value is a row of UTF-32 code points, padded with zeros.
+        chars = (
+            np.ascontiguousarray(values)
+            .view(np.uint32)
+            .reshape(values.shape + (values.dtype.itemsize // 4,))
+        )
+        first = chars[..., 0]
+        valid = first < len(self._bitmap)
+        valid &= self._bitmap[np.where(valid, first, 0)]
+        if chars.shape[-1] > 1:
+            valid &= ~chars[..., 1:].any(axis=-1)
+        return valid
+
+    @property
+    def dtype(self):
+        return np.dtype("<U1")
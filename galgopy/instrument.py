@@ -0,0 +1,250 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+################################################################################
+
+# The enabled Profiler, if any. Instrumented code only checks this global,
+# so disabled instrumentation costs one comparison per call.
+active = None
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def phase(name, **args):
+    """Context manager timing ``name`` in the active profiler."""
+    if active is None:
+        return _NULL_PHASE
+    return active.phase(name, **args)
+
+
+def count(name, n=1):
+    if active is not None:
+        active.count(name, n)
+
+
+def timed(name):
+    """Decorator timing every call of a function (or coroutine function) as
+    the phase ``name``."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if active is None:
+                    return await func(*args, **kwargs)
+                with active.phase(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if active is None:
+                return func(*args, **kwargs)
+            with active.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class _Phase:
+    __slots__ = ("_profiler", "_name", "_args", "_start")
+
+    def __init__(self, profiler, name, args) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._args = args
+
+    def __enter__(self):
+        self._profiler._depth += 1
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        duration = time.perf_counter() - self._start
+        self._profiler._depth -= 1
+        self._profiler._record(self._name, self._start, duration, self._args)
+        return False
+
+
+class Profiler:
+    """Collects per-phase timings and counters of instrumented code.
+
+    The GA engine, populations, crossover, mutation and the caching
+    evaluator report phases (``generation``, ``fitness``, ``sort``,
+    ``get_parents``, ``selection``, ``crossover``, ``mutation``, ...) and
+    counters (``evaluations``, ``validations``, ``cache_hits``, ...) while
+    a profiler is enabled, either with ``enable``/``disable`` or as a
+    context manager. Phases nest, so the time of a phase includes the
+    phases it contains.
+
+    Callbacks registered with ``add_callback`` are called as
+    ``callback(name, start, duration, args)`` at the end of every phase
+    (times in seconds from ``time.perf_counter``). With ``trace`` the
+    phases are also kept, up to ``max_events``, as Chrome trace events
+    (see ``write_trace``), with a snapshot of the counters at the end of
+    every top-level phase.
+    """
+
+    def __init__(self, trace=True, max_events=1000000) -> None:
+        self._trace = trace
+        self._max_events = max_events
+        self._callbacks = []
+        self._previous = None
+        self.reset()
+
+    def reset(self):
+        self._phases = {}
+        self._counters = {}
+        self._events = []
+        self._dropped_events = 0
+        self._depth = 0
+        self._origin = time.perf_counter()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def enable(self):
+        global active
+        if active is not self:
+            self._previous = active
+            active = self
+
+    def disable(self):
+        global active
+        if active is self:
+            active = self._previous
+            self._previous = None
+
+    @property
+    def enabled(self):
+        return active is self
+
+    @property
+    def counters(self):
+        return dict(self._counters)
+
+    @property
+    def dropped_events(self):
+        return self._dropped_events
+
+    def add_callback(self, callback):
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        self._callbacks.remove(callback)
+
+    def phase(self, name, **args):
+        return _Phase(self, name, args)
+
+    def count(self, name, n=1):
+        self._counters[name] = self._counters.get(name, 0) + n
+
+    def _record(self, name, start, duration, args):
+        stats = self._phases.get(name)
+        if stats is None:
+            self._phases[name] = [1, duration, duration, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = min(stats[2], duration)
+            stats[3] = max(stats[3], duration)
+        if self._trace:
+            self._add_event(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": duration * 1e6,
+                    "args": args,
+                }
+            )
+            if not self._depth and self._counters:
+                self._add_event(
+                    {
+                        "name": "counters",
+                        "ph": "C",
+                        "ts": (start + duration - self._origin) * 1e6,
+                        "args": dict(self._counters),
+                    }
+                )
+        for callback in self._callbacks:
+            callback(name, start, duration, args)
+
+    def _add_event(self, event):
+        if len(self._events) >= self._max_events:
+            self._dropped_events += 1
+            return
+        event["pid"] = os.getpid()
+        event["tid"] = threading.get_ident()
+        self._events.append(event)
+
+    def summary(self):
+        """One dict per phase (name, calls, total, mean, min, max seconds),
+        by decreasing total time."""
+        rows = [
+            {
+                "name": name,
+                "calls": calls,
+                "total": total,
+                "mean": total / calls,
+                "min": min_time,
+                "max": max_time,
+            }
+            for name, (calls, total, min_time, max_time) in self._phases.items()
+        ]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def format_summary(self):
+        lines = [
+            f"{'phase':<20} {'calls':>8} {'total s':>12} {'mean ms':>10} "
+            f"{'min ms':>10} {'max ms':>10}"
+        ]
+        for row in self.summary():
+            lines.append(
+                f"{row['name']:<20} {row['calls']:>8} {row['total']:>12.6f} "
+                f"{row['mean'] * 1e3:>10.3f} {row['min'] * 1e3:>10.3f} "
+                f"{row['max'] * 1e3:>10.3f}"
+            )
+        if self._counters:
+            lines.append("")
+            lines.append(f"{'counter':<20} {'value':>12}")
+            for name, value in sorted(self._counters.items()):
+                lines.append(f"{name:<20} {value:>12}")
+        return "\n".join(lines)
+
+    def trace(self):
+        return {
+            "traceEvents": list(self._events),
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "counters": dict(self._counters),
+                "dropped_events": self._dropped_events,
+            },
+        }
+
+    def write_trace(self, path):
+        """Writes a Chrome trace event file, which chrome://tracing and
+        Perfetto can open."""
+        with open(path, "w") as f:
+            json.dump(self.trace(), f)
@@ -0,0 +1,254 @@
+import multiprocessing
+import os
+import random
+
+import numpy as np
+
+import gbase
+import gobjs2
+
+################################################################################
+
+TOPOLOGIES = ("ring", "full", "random")
+
+
+class IslandModel:
+    """Island model GA: ``islands_count`` gbase.GAlgo instances evolving in
+    separate processes.
+
+    Every ``migration_interval`` generations each island sends the genomes
+    and fitness values of its ``migrants_count`` best chromosomes to the
+    coordinating process, which routes them over the ``topology``:
+
+    * ``"ring"`` - island i receives the migrants of island i - 1;
+    * ``"full"`` - every island receives the best ``migrants_count`` of
+      all other islands' migrants;
+    * ``"random"`` - every island receives the migrants of another island
+      drawn at random at each migration.
+
+    Immigrants replace non-elite chromosomes of the next generation. Only
+    genome arrays cross process boundaries, so ``fitness_func`` and the
+    ``galgo_kwargs`` (passed to every GAlgo) must be picklable. The run
+    ends when one island reaches ``target_fitness`` or every island has
+    stopped.
+    """
+
+    def __init__(
+        self,
+        chromosome_tmplt: gobjs2.ChromosomeTemplate,
+        fitness_func,
+        islands_count=None,
+        migration_interval=10,
+        migrants_count=2,
+        topology="ring",
+        rng=None,
+        **galgo_kwargs,
+    ) -> None:
+        if islands_count is None:
+            islands_count = os.cpu_count() or 1
+        if islands_count < 1:
+            raise ValueError("Invalid islands count")
+        if migration_interval < 1:
+            raise ValueError("Invalid migration interval")
+        if migrants_count < 0:
+            raise ValueError("Invalid migrants count")
+        if topology not in TOPOLOGIES:
+            raise ValueError("Invalid topology")
+        # Fail fast on invalid GA arguments instead of in every process.
+        gbase.GAlgo(chromosome_tmplt, fitness_func, **galgo_kwargs)
+        population_size = galgo_kwargs.get("population_size", 100)
+        if migrants_count > population_size - galgo_kwargs.get("elitism", 1):
+            raise ValueError("Too many migrants")
+
+        self._chromosome_tmplt = chromosome_tmplt
+        self._fitness_func = fitness_func
+        self._islands_count = islands_count
+        self._migration_interval = migration_interval
+        self._migrants_count = migrants_count
+        self._topology = topology
+        self._mode = galgo_kwargs.get("mode", "maximize")
+        self._galgo_kwargs = galgo_kwargs
+        seed = np.random.SeedSequence(rng)
+        self._entropy = seed.entropy
+        self._spawn_key = seed.spawn_key
+        self._best = None
+        self._generation = 0
+        self._evaluations = 0
+        self._stop_reason = None
+
+    @property
+    def islands_count(self):
+        return self._islands_count
+
+    @property
+    def topology(self):
+        return self._topology
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def evaluations(self):
+        return self._evaluations
+
+    @property
+    def best(self):
+        return self._best[0] if self._best is not None else None
+
+    @property
+    def best_fitness(self):
+        return self._best[0].fitness if self._best is not None else None
+
+    @property
+    def stop_reason(self):
+        return self._stop_reason
+
+    def run(self):
+        """Runs all islands until the stop condition and returns the best
+        chromosome found."""
+        # A fresh SeedSequence every run: spawning advances its state, so
+        # reusing one would give a second run different island seeds.
+        seed = np.random.SeedSequence(self._entropy, spawn_key=self._spawn_key)
+        seeds = seed.spawn(self._islands_count)
+        rng = np.random.default_rng(seed.spawn(1)[0])
+        self._best = None
+        self._stop_reason = None
+        connections = []
+        processes = []
+        try:
+            for seed in seeds:
+                parent_conn, child_conn = multiprocessing.Pipe()
+                process = multiprocessing.Process(
+                    target=_island_worker,
+                    args=(
+                        child_conn,
+                        self._chromosome_tmplt,
+                        self._fitness_func,
+                        self._galgo_kwargs,
+                        self._migrants_count,
+                        seed,
+                    ),
+                    daemon=True,
+                )
+                process.start()
+                child_conn.close()
+                connections.append(parent_conn)
+                processes.append(process)
+
+            immigrants = [None] * self._islands_count
+            while self._stop_reason is None:
+                for conn, genomes in zip(connections, immigrants):
+                    conn.send((self._migration_interval, genomes))
+                reports = [_receive(conn) for conn in connections]
+                self._update(reports)
+                immigrants = self._route(
+                    [report["migrants"] for report in reports], rng
+                )
+        finally:
+            for conn in connections:
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+                conn.close()
+            for process in processes:
+                process.join()
+        return self.best
+
+    def _update(self, reports):
+        for report in reports:
+            genome, fitness = report["best"]
+            if self._best is None or self._is_better(
+                fitness, self._best.fitness_array[0]
+            ):
+                self._best = gobjs2.PopulationMatrix._wrap(
+                    genome[np.newaxis], self._chromosome_tmplt, [fitness]
+                )
+        self._generation = max(report["generation"] for report in reports)
+        self._evaluations = sum(report["evaluations"] for report in reports)
+
+        stop_reasons = [report["stop_reason"] for report in reports]
+        if "target_fitness" in stop_reasons:
+            self._stop_reason = "target_fitness"
+        elif all(stop_reasons):
+            self._stop_reason = stop_reasons[0]
+
+    def _route(self, migrants, rng):
+        count = self._islands_count
+        if count == 1 or not self._migrants_count:
+            return [None] * count
+        if self._topology == "ring":
+            sources = [[(i - 1) % count] for i in range(count)]
+        elif self._topology == "full":
+            sources = [
+                [j for j in range(count) if j != i] for i in range(count)
+            ]
+        else:
+            drawn = rng.integers(count - 1, size=count)
+            sources = [[j + (j >= i)] for i, j in enumerate(drawn)]
+
+        immigrants = []
+        for island_sources in sources:
+            genomes = np.concatenate([migrants[j][0] for j in island_sources])
+            fitness = np.concatenate([migrants[j][1] for j in island_sources])
+            if len(genomes) > self._migrants_count:
+                rows = gobjs2.top_k_indices(
+                    fitness, self._migrants_count, self._mode == "maximize"
+                )
+                genomes = genomes[rows]
+            immigrants.append(genomes)
+        return immigrants
+
+    def _is_better(self, a, b):
+        if self._mode == "maximize":
+            return a > b
+        return a < b
+
+
+def _receive(conn):
+    message = conn.recv()
+    if isinstance(message, BaseException):
+        raise message
+    return message
+
+
+def _island_worker(
+    conn, chromosome_tmplt, fitness_func, galgo_kwargs, migrants_count, seed
+):
+    # Custom gene types that do not override sample draw from the random
+    # module, which a forked process would share with its siblings.
+    random.seed(int(seed.generate_state(1)[0]))
+    try:
+        galgo = gbase.GAlgo(
+            chromosome_tmplt, fitness_func, rng=seed, **galgo_kwargs
+        )
+        galgo.reset()
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            generations, immigrants = message
+            if immigrants is not None and galgo.stop_reason is None:
+                galgo.add_migrants(immigrants)
+            for _ in range(generations):
+                if galgo.step():
+                    break
+            best = galgo.best
+            conn.send(
+                {
+                    "migrants": (
+                        galgo.get_migrants(migrants_count)
+                        if migrants_count
+                        else None
+                    ),
+                    "best": (best.genome.copy(), best.fitness),
+                    "generation": galgo.generation,
+                    "evaluations": galgo.evaluations,
+                    "stop_reason": galgo.stop_reason,
+                }
+            )
+    except Exception as e:
+        conn.send(e)
+    finally:
+        conn.close()
@@ -0,0 +1,230 @@
+import os
+import tempfile
+import weakref
+
+import numpy as np
+
+import gobjs2
+import instrument
+from grandom import DEFAULT_CHUNK_SIZE, iter_chunks
+
+################################################################################
+
+
+class MappedPopulation(gobjs2.PopulationMatrix):
+    """PopulationMatrix whose genomes live in a memory-mapped ``.npy`` file.
+
+    Only the fitness vector is kept in memory; the OS page cache decides
+    which genome rows are resident. Everything that touches the whole
+    matrix works ``chunk_size`` rows at a time: BatchEvaluator and
+    AsyncEvaluator use it as their default chunk size, the batch crossover
+    engine recombines chunk by chunk into a new mapped population, and
+    sorting and parent selection gather rows chunk by chunk through another
+    mapped file. ProcessPoolEvaluator workers map the same file instead of
+    receiving a copy of the genomes.
+
+    Populations created without a ``path`` use a temporary file in
+    ``directory`` that is removed when the population is garbage
+    collected. Files opened with ``open`` or created at a given ``path``
+    are kept.
+    """
+
+    def __init__(
+        self,
+        genomes,
+        chromosome_tmplt: gobjs2.ChromosomeTemplate,
+        fitness=None,
+        path=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        directory=None,
+    ) -> None:
+        genomes = gobjs2.PopulationMatrix(genomes, chromosome_tmplt).genomes
+        self._map(
+            len(genomes), chromosome_tmplt, path, chunk_size, directory, fitness
+        )
+        self._genomes[:] = genomes
+
+    def _map(
+        self,
+        population_size,
+        chromosome_tmplt,
+        path,
+        chunk_size,
+        directory,
+        fitness=None,
+    ):
+        dtype = chromosome_tmplt.dtype
+        if dtype.hasobject:
+            raise ValueError("Gene values cannot be memory-mapped")
+        temporary = path is None
+        if temporary:
+            fd, path = tempfile.mkstemp(suffix=".npy", dir=directory)
+            os.close(fd)
+        genomes = np.lib.format.open_memmap(
+            path,
+            mode="w+",
+            dtype=dtype,
+            shape=(population_size, len(chromosome_tmplt.types_list)),
+        )
+        self._init_mapped(
+            genomes, chromosome_tmplt, fitness, path, chunk_size, directory
+        )
+        if temporary:
+            weakref.finalize(self, _remove, self._path)
+
+    def _init_mapped(
+        self, genomes, chromosome_tmplt, fitness, path, chunk_size, directory
+    ):
+        if chunk_size < 1:
+            raise ValueError("Invalid chunk size")
+        self._init(genomes, chromosome_tmplt, fitness)
+        self._path = os.fspath(path)
+        self._chunk_size = chunk_size
+        self._directory = directory
+
+    @staticmethod
+    def create(
+        population_size,
+        chromosome_tmplt: gobjs2.ChromosomeTemplate,
+        path=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        directory=None,
+    ):
+        """Mapped population of ``population_size`` zero-filled rows."""
+        population = MappedPopulation.__new__(MappedPopulation)
+        population._map(
+            population_size, chromosome_tmplt, path, chunk_size, directory
+        )
+        return population
+
+    @staticmethod
+    def open(
+        path,
+        chromosome_tmplt: gobjs2.ChromosomeTemplate,
+        fitness=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        directory=None,
+        mode="r+",
+    ):
+        """Maps an existing ``.npy`` genome file (e.g. one written by another
+        process); its values are not validated."""
+        genomes = np.lib.format.open_memmap(path, mode=mode)
+        if (
+            genomes.ndim != 2
+            or genomes.shape[1] != len(chromosome_tmplt.types_list)
+            or genomes.dtype != chromosome_tmplt.dtype
+        ):
+            raise ValueError()
+        population = MappedPopulation.__new__(MappedPopulation)
+        population._init_mapped(
+            genomes, chromosome_tmplt, fitness, path, chunk_size, directory
+        )
+        return population
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    def flush(self):
+        self._genomes.flush()
+
+    @instrument.timed("sort")
+    def _sort(self, mode):
+        order = np.argsort(self._fitness, kind="stable")
+        if mode == "maximize":
+            order = order[::-1]
+        ordered = self._gather(order)
+        for start, stop in iter_chunks(len(self), self._chunk_size):
+            self._genomes[start:stop] = ordered._genomes[start:stop]
+        self._fitness[:] = ordered._fitness
+
+    @instrument.timed("get_parents")
+    def get_parents(self, parents_count=2):
+        if parents_count > len(self):
+            raise ValueError()
+        elif parents_count < 1:
+            raise ValueError()
+        if self._sort_mode is None or parents_count == len(self):
+            self._apply_sort()
+            rows = np.arange(parents_count)
+        else:
+            rows = gobjs2.top_k_indices(
+                self._fitness, parents_count, self._sort_mode == "maximize"
+            )
+        return self._gather(rows)
+
+    def _gather(self, rows):
+        population = self._allocate(len(rows))
+        for start, stop in iter_chunks(len(rows), self._chunk_size):
+            population._genomes[start:stop] = self._genomes[rows[start:stop]]
+        population._fitness[:] = self._fitness[rows]
+        return population
+
+    def _allocate(self, rows_count):
+        return MappedPopulation.create(
+            rows_count,
+            self._chromosome_tmplt,
+            chunk_size=self._chunk_size,
+            directory=self._directory,
+        )
+
+    def _take(self, rows):
+        return self._gather(np.asarray(rows, dtype=np.intp))
+
+    def to_population_matrix(self):
+        return gobjs2.PopulationMatrix._wrap(
+            np.array(self.genomes), self._chromosome_tmplt, self._fitness
+        )
+
+    @staticmethod
+    def from_population(
+        population: gobjs2.Population,
+        path=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        directory=None,
+    ):
+        genomes = population.genomes
+        mapped = MappedPopulation.create(
+            len(genomes),
+            population.chromosome_tmplt,
+            path,
+            chunk_size,
+            directory,
+        )
+        for start, stop in iter_chunks(len(genomes), chunk_size):
+            mapped._genomes[start:stop] = genomes[start:stop]
+        if hasattr(population, "fitness_array"):
+            mapped._fitness[:] = population.fitness_array
+        else:
+            mapped._fitness[:] = [c.fitness for c in population.chromosome_list]
+        return mapped
+
+    @staticmethod
+    @instrument.timed("generate")
+    def generate_random_population(
+        population_size,
+        chromosome_tmplt: gobjs2.ChromosomeTemplate,
+        path=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        directory=None,
+        rng=None,
+        workers=None,
+    ):
+        population = MappedPopulation.create(
+            population_size, chromosome_tmplt, path, chunk_size, directory
+        )
+        gobjs2.random_genomes(
+            population._genomes, chromosome_tmplt, rng, workers, chunk_size
+        )
+        return population
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,169 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+import gobjs2
+import grandom
+import gtypes
+import instrument
+
+################################################################################
+
+
+class Mutation(ABC):
+    """Base class for mutation operators.
+
+    Every gene whose type is an instance of ``gene_type_class`` mutates
+    independently with probability ``mutation_rate``. Instead of visiting
+    every gene, the number of mutations is drawn from the binomial
+    distribution and that many distinct (row, gene) positions are sampled,
+    so the cost scales with the number of mutations. Works both on a
+    PopulationMatrix (cells are written in place) and on an object
+    Population (the sampled Gene values are replaced).
+    """
+
+    gene_type_class = gtypes.GeneType
+
+    def __init__(self, population, mutation_rate=0.01, rng=None) -> None:
+        if not 0 <= mutation_rate <= 1:
+            raise ValueError("Invalid mutation rate")
+        self._population = population
+        self._mutation_rate = mutation_rate
+        self._rng = rng
+
+    @property
+    def mutation_rate(self):
+        return self._mutation_rate
+
+    @instrument.timed("mutation")
+    def apply_mutation(self):
+        rng = grandom.get_rng(self._rng)
+        types_list = self._population.chromosome_tmplt.types_list
+        columns = []
+        gene_types = []
+        groups = []
+        for col, t in enumerate(types_list):
+            if isinstance(t, self.gene_type_class):
+                if t not in gene_types:
+                    gene_types.append(t)
+                columns.append(col)
+                groups.append(gene_types.index(t))
+        total = len(self._population) * len(columns)
+        if not total:
+            return self._population
+
+        positions = rng.choice(
+            total, size=rng.binomial(total, self._mutation_rate), replace=False
+        )
+        instrument.count("mutated_genes", len(positions))
+        rows = positions // len(columns)
+        cols = np.array(columns)[positions % len(columns)]
+        groups = np.array(groups)[positions % len(columns)]
+        for group, t in enumerate(gene_types):
+            selected = groups == group
+            self._write(
+                rows[selected],
+                cols[selected],
+                self._mutate(
+                    self._read(rows[selected], cols[selected], t), t, rng
+                ),
+                t,
+            )
+        return self._population
+
+    def _read(self, rows, cols, gene_type):
+        if isinstance(self._population, gobjs2.PopulationMatrix):
+            return self._population.genomes[rows, cols].astype(gene_type.dtype)
+        return np.array(
+            [self._population[r][c].value for r, c in zip(rows, cols)],
+            dtype=gene_type.dtype,
+        )
+
+    def _write(self, rows, cols, values, gene_type):
+        if isinstance(self._population, gobjs2.PopulationMatrix):
+            self._population.genomes[rows, cols] = values
+            return
+        # The new values are validated once for the whole batch.
+        if not gene_type.validate_batch(values).all():
+            raise ValueError()
+        for r, c, value in zip(rows.tolist(), cols.tolist(), values.tolist()):
+            self._population[r]._set_value(c, value, gene_type)
+
+    @abstractmethod
+    def _mutate(self, values, gene_type, rng):
+        pass
+
+
+class FlipMutation(Mutation):
+    gene_type_class = gtypes.BinaryType
+
+    def _mutate(self, values, gene_type, rng):
+        return 1 - values
+
+
+class RandomResetMutation(Mutation):
+    gene_type_class = gtypes.IntType
+
+    def _mutate(self, values, gene_type, rng):
+        return rng.integers(
+            gene_type.min_val,
+            gene_type.max_val,
+            size=len(values),
+            endpoint=True,
+        )
+
+
+class CreepMutation(Mutation):
+    """Moves an IntType value by a random non-zero step of at most ``step``,
+    clipped to the type bounds."""
+
+    gene_type_class = gtypes.IntType
+
+    def __init__(self, population, mutation_rate=0.01, step=1, rng=None):
+        if step < 1:
+            raise ValueError("Invalid step")
+        super().__init__(population, mutation_rate, rng)
+        self._step = step
+
+    def _mutate(self, values, gene_type, rng):
+        steps = rng.integers(1, self._step, size=len(values), endpoint=True)
+        steps *= rng.choice([-1, 1], size=len(values))
+        return np.clip(
+            values.astype(np.int64) + steps,
+            gene_type.min_val,
+            gene_type.max_val,
+        )
+
+
+class GaussianMutation(Mutation):
+    """Adds normal noise to a FloatType value, clipped to the type bounds.
+
+    ``sigma`` defaults to a tenth of the type range.
+    """
+
+    gene_type_class = gtypes.FloatType
+
+    def __init__(self, population, mutation_rate=0.01, sigma=None, rng=None):
+        if sigma is not None and sigma <= 0:
+            raise ValueError("Invalid sigma")
+        super().__init__(population, mutation_rate, rng)
+        self._sigma = sigma
+
+    def _mutate(self, values, gene_type, rng):
+        sigma = self._sigma
+        if sigma is None:
+            sigma = (gene_type.max_val - gene_type.min_val) / 10
+        values = np.round(
+            values + rng.normal(0, sigma, size=len(values)), gene_type.ndigits
+        )
+        upper = max(
+            gene_type.max_val - 10**-gene_type.ndigits, gene_type.min_val
+        )
+        return np.clip(values, gene_type.min_val, upper)
+
+
+class AlphabetResetMutation(Mutation):
+    gene_type_class = gtypes.StrType
+
+    def _mutate(self, values, gene_type, rng):
+        return rng.choice(gene_type.alphabet, size=len(values))
@@ -0,0 +1,451 @@
+import bisect
+import time
+
+import numpy as np
+
+import gbase
+import gobjs2
+import grandom
+import instrument
+from selection import TournamentSelection
+
+################################################################################
+
+# Rows of the dominance bit matrix combined at once.
+BLOCK_ROWS = 4096
+
+_ONE = np.uint64(1)
+
+
+def minimization(objectives, mode="maximize"):
+    """``objectives`` as a 2D float array to be minimized.
+
+    ``mode`` is "maximize" or "minimize" for all objectives, or a sequence
+    with one of them per objective (column).
+    """
+    objectives = np.asarray(objectives, dtype=np.float64)
+    if objectives.ndim == 1:
+        objectives = objectives[:, None]
+    if objectives.ndim != 2:
+        raise ValueError("Invalid objectives")
+    modes = [mode] * objectives.shape[1] if isinstance(mode, str) else mode
+    if len(modes) != objectives.shape[1] or any(
+        m not in ("maximize", "minimize") for m in modes
+    ):
+        raise ValueError("Invalid mode")
+    return np.where(np.array(modes) == "maximize", -objectives, objectives)
+
+
+@instrument.timed("non_dominated_sort")
+def non_dominated_sort(objectives, mode="maximize"):
+    """Index of the Pareto front of every individual: 0 for non-dominated
+    individuals, 1 for those only dominated by front 0, and so on.
+
+    ``objectives`` has one row per individual and one column per objective
+    (see ``minimization`` for ``mode``). Identical rows share a front.
+
+    With one or two objectives the individuals are swept in sorted order,
+    keeping the last individual added to each front: O(N log N). With more
+    objectives the dominators of every individual are computed as a bit
+    matrix, one sorted cumulative OR per objective, and the fronts are
+    assigned 64 individuals at a time by binary search over the bit sets of
+    the fronts found so far: O(M N^2 / 64) word operations and N^2 / 4
+    bytes of temporary memory (100 MB for 20 000 individuals).
+    """
+    values = minimization(objectives, mode)
+    if values.shape[1] <= 2:
+        return _sweep_sort(values)
+    return _bitset_sort(values)
+
+
+def _sweep_sort(values):
+    first = values[:, 0]
+    second = values[:, 1] if values.shape[1] == 2 else np.zeros(len(values))
+    # Swept by (first, second), an individual is dominated by a front iff
+    # it comes after the front's last individual by (second, first): codes
+    # of this second order make the fronts' last individuals an increasing
+    # list of ints.
+    by_second = np.lexsort((first, second))
+    new = np.ones(len(values), dtype=bool)
+    new[1:] = (np.diff(second[by_second]) != 0) | (
+        np.diff(first[by_second]) != 0
+    )
+    codes = np.empty(len(values), dtype=np.intp)
+    codes[by_second] = np.cumsum(new) - 1
+
+    order = np.lexsort((second, first))
+    lasts = []
+    fronts = []
+    for code in codes[order].tolist():
+        front = bisect.bisect_left(lasts, code)
+        if front == len(lasts):
+            lasts.append(code)
+        else:
+            lasts[front] = code
+        fronts.append(front)
+    ranks = np.empty(len(values), dtype=np.intp)
+    ranks[order] = fronts
+    return ranks
+
+
+def _bitset_sort(values):
+    # Lexicographic order puts every dominator before the individuals it
+    # dominates; bit j of row i of ``dominators`` is set when individual j
+    # dominates individual i (both in this order).
+    count = len(values)
+    order = np.lexsort(values.T[::-1])
+    values = values[order]
+    words = -(-count // 64)
+    positions = np.arange(count)
+    bits = _ONE << (positions & 63).astype(np.uint64)
+
+    # Individuals before the first copy of a row are no worse in the first
+    # objective and, unlike the copies, differ from it.
+    new = np.ones(count, dtype=bool)
+    new[1:] = (values[1:] != values[:-1]).any(axis=1)
+    starts = np.maximum.accumulate(np.where(new, positions, 0))
+    dominators = np.where(
+        np.arange(words) < (starts >> 6)[:, None], ~np.uint64(0), np.uint64(0)
+    )
+    dominators[positions, starts >> 6] = bits[starts] - _ONE
+
+    # Individuals no worse in another objective: sorted by it, prefixes
+    # accumulated with OR.
+    no_worse = np.empty((count, words), dtype=np.uint64)
+    for column in values.T[1:]:
+        by_value = np.argsort(column, kind="stable")
+        no_worse[:] = 0
+        no_worse[positions, by_value >> 6] = bits[by_value]
+        np.bitwise_or.accumulate(no_worse, axis=0, out=no_worse)
+        last = np.searchsorted(column[by_value], column, side="right") - 1
+        for start, stop in grandom.iter_chunks(count, BLOCK_ROWS):
+            dominators[start:stop] &= no_worse[last[start:stop]]
+    del no_worse
+
+    ranks = np.empty(count, dtype=np.intp)
+    ranks[order] = _rank_dominators(dominators, bits)
+    return ranks
+
+
+def _rank_dominators(dominators, bits):
+    # The front of an individual is one more than the last front holding
+    # one of its dominators, and every earlier front holds one too: the
+    # fronts found so far are searched by bisection, 64 rows (one word of
+    # dominators) at a time, before dominators within the word are
+    # resolved.
+    count, words = dominators.shape
+    ranks = np.empty(count, dtype=np.intp)
+    fronts = np.zeros((8, words), dtype=np.uint64)
+    fronts_count = 0
+    shifts = np.arange(64, dtype=np.uint64)
+    for word in range(words):
+        start, stop = word * 64, min(word * 64 + 64, count)
+        rows = dominators[start:stop, :word]
+        low = np.zeros(stop - start, dtype=np.intp)
+        high = np.full(stop - start, fronts_count)
+        while True:
+            active = low < high
+            if not active.any():
+                break
+            middle = (low + high) // 2
+            hit = (rows & fronts[middle, :word]).any(axis=1)
+            low = np.where(active & hit, middle + 1, low)
+            high = np.where(active & ~hit, middle, high)
+
+        inner = (dominators[start:stop, word, None] >> shifts) & _ONE
+        inner = inner[:, : stop - start].astype(bool)
+        block = low
+        while True:
+            chained = np.where(inner, block + 1, 0).max(axis=1)
+            updated = np.maximum(low, chained)
+            if np.array_equal(updated, block):
+                break
+            block = updated
+        ranks[start:stop] = block
+
+        fronts_count = max(fronts_count, int(block.max()) + 1)
+        if fronts_count >= len(fronts):
+            fronts = np.concatenate([fronts, np.zeros_like(fronts)])
+        np.bitwise_or.at(fronts[:, word], block, bits[start:stop])
+    return ranks
+
+
+@instrument.timed("crowding")
+def crowding_distance(objectives, ranks):
+    """Crowding distance of every individual within its front: the sum over
+    objectives of the gap between its neighbours, relative to the front's
+    range. Individuals at either end of a front get infinity."""
+    objectives = np.asarray(objectives, dtype=np.float64)
+    if objectives.ndim == 1:
+        objectives = objectives[:, None]
+    ranks = np.asarray(ranks)
+    count = len(ranks)
+    distance = np.zeros(count)
+    if not count:
+        return distance
+    for column in objectives.T:
+        order = np.lexsort((column, ranks))
+        values = column[order]
+        first = np.ones(count, dtype=bool)
+        first[1:] = ranks[order][1:] != ranks[order][:-1]
+        last = np.ones(count, dtype=bool)
+        last[:-1] = first[1:]
+        span = values[last] - values[first]
+        span = span[np.cumsum(first) - 1]
+        gap = np.zeros(count)
+        gap[1:-1] = values[2:] - values[:-2]
+        contribution = np.divide(gap, span, out=np.zeros(count), where=span > 0)
+        contribution[first | last] = np.inf
+        distance[order] += contribution
+    return distance
+
+
+def crowded_order(ranks, crowding):
+    """Indices sorted by front, then by decreasing crowding distance."""
+    return np.lexsort((-np.asarray(crowding), ranks))
+
+
+################################################################################
+
+
+class NSGA2:
+    """Multi-objective Genetic Algorithm (NSGA-II)
+
+    ``fitness_func`` returns a vector of objectives per chromosome (or,
+    with an evaluators.BatchEvaluator, one row of objectives per genome
+    row); ``mode`` is "maximize" or "minimize" for all objectives or a
+    sequence with one of them per objective.
+
+    Parents and offspring share one preallocated gobjs2.PopulationMatrix of
+    ``2 * population_size`` rows. Every generation the offspring are bred
+    from the parents with ``crossover``, ``selection`` and every
+    ``mutation`` operator (as in gbase.GAlgo) and evaluated; the parents
+    and offspring are then ranked together (``non_dominated_sort``,
+    ``crowding_distance``) and the best ``population_size`` become the
+    next parents. Parents are kept in crowded-comparison order, and their
+    fitness is ``population_size`` minus their row: the default binary
+    TournamentSelection is NSGA-II's crowded tournament.
+
+    The run stops after ``max_generations``, or when the ``time_limit``
+    (seconds) or ``max_evaluations`` budget would be exceeded. ``rng`` and
+    ``workers`` are those of gbase.GAlgo.
+    """
+
+    def __init__(
+        self,
+        chromosome_tmplt: gobjs2.ChromosomeTemplate,
+        fitness_func,
+        population_size=100,
+        mode="maximize",
+        crossover=gobjs2.OnePointCrossover,
+        mutation=None,
+        selection=None,
+        evaluator=None,
+        max_generations=100,
+        time_limit=None,
+        max_evaluations=None,
+        rng=None,
+        workers=None,
+    ) -> None:
+        if population_size < 2 or population_size % 2:
+            raise ValueError("Population size must be an even number")
+        if max_evaluations is not None and max_evaluations < population_size:
+            raise ValueError("Invalid evaluations budget")
+        if not isinstance(mode, str):
+            mode = tuple(mode)
+        if any(m not in ("maximize", "minimize") for m in np.atleast_1d(mode)):
+            raise ValueError("Invalid mode")
+        if mutation is None:
+            mutation = gbase._default_mutations(chromosome_tmplt)
+        elif callable(mutation):
+            mutation = [mutation]
+
+        self._chromosome_tmplt = chromosome_tmplt
+        self._fitness_func = fitness_func
+        self._population_size = population_size
+        self._mode = mode
+        self._crossover = crossover
+        self._mutation = list(mutation)
+        self._selection = selection or TournamentSelection(mode="maximize")
+        self._evaluator = evaluator or gobjs2._default_evaluator(fitness_func)
+        self._max_generations = max_generations
+        self._time_limit = time_limit
+        self._max_evaluations = max_evaluations
+        self._rng = grandom.get_rng(rng)
+        self._workers = workers
+        self._genomes = None
+        self._population = None
+        self._objectives = None
+        self._ranks = None
+        self._crowding = None
+        self._evaluated = False
+        self._generation = 0
+        self._evaluations = 0
+        self._stop_reason = None
+
+    @property
+    def chromosome_tmplt(self):
+        return self._chromosome_tmplt
+
+    @property
+    def population(self):
+        return self._population
+
+    @property
+    def objectives(self):
+        """Objectives of the parents (rows of ``population``)."""
+        if self._objectives is None:
+            return None
+        return self._objectives[: self._population_size]
+
+    @property
+    def ranks(self):
+        return self._ranks
+
+    @property
+    def crowding(self):
+        return self._crowding
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def evaluations(self):
+        return self._evaluations
+
+    @property
+    def stop_reason(self):
+        return self._stop_reason
+
+    @instrument.timed("initialization")
+    def reset(self):
+        size = self._population_size
+        genomes = np.empty(
+            (size * 2, len(self._chromosome_tmplt.types_list)),
+            dtype=self._chromosome_tmplt.dtype,
+        )
+        gobjs2.random_genomes(
+            genomes[:size], self._chromosome_tmplt, self._rng, self._workers
+        )
+        self._genomes = genomes
+        self._population = gobjs2.PopulationMatrix._wrap(
+            genomes[:size], self._chromosome_tmplt
+        )
+        self._offspring = gobjs2.PopulationMatrix._wrap(
+            genomes[size:], self._chromosome_tmplt
+        )
+        self._objectives = None
+        self._ranks = None
+        self._crowding = None
+        self._evaluated = False
+        self._generation = 0
+        self._evaluations = 0
+        self._stop_reason = None
+        self._start_time = time.perf_counter()
+
+    def pareto_front(self):
+        """Genomes and objectives of the non-dominated parents."""
+        if not self._evaluated:
+            raise ValueError("No evaluated generation")
+        rows = np.flatnonzero(self._ranks == 0)
+        return self._population._genomes[rows], self.objectives[rows]
+
+    def run(self):
+        """Runs the GA from a new random population and returns
+        ``pareto_front()``."""
+        self.reset()
+        while not self.step():
+            pass
+        return self.pareto_front()
+
+    @instrument.timed("generation")
+    def step(self):
+        """Evaluates the initial population, or breeds and evaluates the
+        offspring and selects the next parents.
+
+        Returns True when the run has to stop.
+        """
+        if self._population is None:
+            self.reset()
+        elif self._stop_reason is not None:
+            return True
+        if (
+            self._max_evaluations is not None
+            and self._evaluations + self._population_size
+            > self._max_evaluations
+        ):
+            self._stop_reason = "max_evaluations"
+            return True
+
+        if not self._evaluated:
+            objectives = self._evaluate(self._population)
+            self._objectives = np.empty(
+                (self._population_size * 2,) + objectives.shape[1:]
+            )
+            self._objectives[: self._population_size] = objectives
+            self._select(self._population_size)
+            self._evaluated = True
+        else:
+            self._breed()
+            self._objectives[self._population_size :] = self._evaluate(
+                self._offspring
+            )
+            self._select(self._population_size * 2)
+        self._evaluations += self._population_size
+        self._generation += 1
+        self._stop_reason = self._check_stop()
+        return self._stop_reason is not None
+
+    @instrument.timed("fitness")
+    def _evaluate(self, population):
+        objectives = np.asarray(
+            self._evaluator.evaluate(self._fitness_func, population),
+            dtype=np.float64,
+        )
+        if objectives.ndim == 1:
+            objectives = objectives[:, None]
+        if objectives.shape[0] != len(population) or (
+            self._objectives is not None
+            and objectives.shape[1:] != self._objectives.shape[1:]
+        ):
+            raise ValueError("Fitness function returned invalid objectives")
+        instrument.count("evaluations", len(population))
+        return objectives
+
+    def _breed(self):
+        workers = {} if self._workers is None else {"workers": self._workers}
+        offspring = self._crossover(
+            self._population,
+            self._population_size,
+            rng=self._rng,
+            selection=self._selection,
+            **workers,
+        ).generate_new_population(out=self._offspring)
+        for operator in self._mutation:
+            operator(offspring, rng=self._rng).apply_mutation()
+
+    def _select(self, count):
+        # Ranks the first ``count`` rows and moves the best population_size
+        # of them, in crowded-comparison order, to the parents' rows.
+        size = self._population_size
+        objectives = self._objectives[:count]
+        ranks = non_dominated_sort(objectives, self._mode)
+        crowding = crowding_distance(objectives, ranks)
+        survivors = crowded_order(ranks, crowding)[:size]
+        self._genomes[:size] = self._genomes[survivors]
+        self._objectives[:size] = objectives[survivors]
+        self._ranks = ranks[survivors]
+        self._crowding = crowding[survivors]
+        self._population._fitness[:] = np.arange(size, 0, -1)
+        self._population._sort_mode = None
+
+    def _check_stop(self):
+        if self._generation >= self._max_generations:
+            return "max_generations"
+        elif (
+            self._time_limit is not None
+            and time.perf_counter() - self._start_time >= self._time_limit
+        ):
+            return "time_limit"
+        return None
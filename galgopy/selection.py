@@ -0,0 +1,132 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+################################################################################
+
+
+class Selection(ABC):
+    """Base class for parent selection strategies.
+
+    ``prepare`` is called once per generation with the parents' fitness
+    values; ``select`` then draws any number of parent indices in one call.
+    """
+
+    def __init__(self) -> None:
+        self._fitness = None
+
+    def prepare(self, fitness):
+        self._fitness = np.asarray(fitness, dtype=np.float64)
+        if not len(self._fitness):
+            raise ValueError("No parents to select from")
+
+    @abstractmethod
+    def select(self, count, rng):
+        pass
+
+    def select_pairs(self, pairs_count, rng):
+        return self.select(pairs_count * 2, rng).reshape(pairs_count, 2)
+
+
+class RandomSelection(Selection):
+    """Uniform selection of pairs of two distinct parents."""
+
+    def select(self, count, rng):
+        return rng.integers(len(self._fitness), size=count)
+
+    def select_pairs(self, pairs_count, rng):
+        parents_count = len(self._fitness)
+        if parents_count < 2:
+            raise ValueError("At least two parents are required")
+        first = rng.integers(parents_count, size=pairs_count)
+        second = rng.integers(parents_count - 1, size=pairs_count)
+        second += second >= first
+        return np.stack([first, second], axis=1)
+
+
+class RouletteSelection(Selection):
+    """Fitness-proportionate selection using Walker's alias method.
+
+    The alias table is built in O(n) by ``prepare`` and every draw costs
+    O(1). If all fitness values are zero, parents are drawn uniformly.
+    """
+
+    def prepare(self, fitness):
+        super().prepare(fitness)
+        weights = self._fitness
+        if (weights < 0).any():
+            raise ValueError("Fitness values must be non-negative")
+        total = weights.sum()
+        count = len(weights)
+        if total == 0:
+            weights = np.ones(count)
+            total = count
+        probability = weights * (count / total)
+        alias = np.arange(count)
+        small = list(np.flatnonzero(probability < 1))
+        large = list(np.flatnonzero(probability >= 1))
+        while small and large:
+            s = small.pop()
+            l = large[-1]
+            alias[s] = l
+            probability[l] -= 1 - probability[s]
+            if probability[l] < 1:
+                small.append(large.pop())
+        probability[small + large] = 1
+        self._probability = probability
+        self._alias = alias
+
+    def select(self, count, rng):
+        indices = rng.integers(len(self._probability), size=count)
+        return np.where(
+            rng.random(count) < self._probability[indices],
+            indices,
+            self._alias[indices],
+        )
+
+
+class StochasticUniversalSampling(Selection):
+    """Fitness-proportionate selection with evenly spaced pointers.
+
+    One random offset places all ``count`` pointers over the cumulative
+    fitness, which keeps the number of copies of every parent within one
+    of its expected value. The selection is shuffled before pairing.
+    """
+
+    def prepare(self, fitness):
+        super().prepare(fitness)
+        if (self._fitness < 0).any():
+            raise ValueError("Fitness values must be non-negative")
+        weights = self._fitness
+        if weights.sum() == 0:
+            weights = np.ones(len(weights))
+        self._cumulative = np.cumsum(weights)
+
+    def select(self, count, rng):
+        total = self._cumulative[-1]
+        pointers = (rng.random() + np.arange(count)) * (total / count)
+        indices = np.searchsorted(self._cumulative, pointers, side="right")
+        return rng.permutation(np.minimum(indices, len(self._cumulative) - 1))
+
+
+class TournamentSelection(Selection):
+    """Each selected parent is the best of ``tournament_size`` parents drawn
+    uniformly with replacement."""
+
+    def __init__(self, tournament_size=2, mode="maximize") -> None:
+        super().__init__()
+        if tournament_size < 1:
+            raise ValueError("Invalid tournament size")
+        self._tournament_size = tournament_size
+        self._mode = mode
+
+    def select(self, count, rng):
+        candidates = rng.integers(
+            len(self._fitness), size=(count, self._tournament_size)
+        )
+        scores = self._fitness[candidates]
+        if self._mode == "maximize":
+            winners = np.argmax(scores, axis=1)
+        else:
+            winners = np.argmin(scores, axis=1)
+        return candidates[np.arange(count), winners]
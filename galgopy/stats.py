@@ -0,0 +1,131 @@
+import collections
+
+import numpy as np
+
+import grandom
+
+################################################################################
+
+# Upper bound on the number of genome cells processed at once.
+BLOCK_CELLS = 1 << 20
+
+
+class RunningStats:
+    """Count, mean, standard deviation, minimum and maximum of a stream of
+    values.
+
+    Batches passed to ``update`` are merged with Chan's parallel variance
+    formula, so the values themselves are never stored.
+    """
+
+    def __init__(self) -> None:
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = np.inf
+        self._max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        count = len(values)
+        if not count:
+            return
+        mean = values.mean()
+        m2 = ((values - mean) ** 2).sum()
+        total = self._count + count
+        delta = mean - self._mean
+        self._mean += delta * count / total
+        self._m2 += m2 + delta**2 * self._count * count / total
+        self._count = total
+        self._min = min(self._min, values.min())
+        self._max = max(self._max, values.max())
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def mean(self):
+        return self._mean if self._count else np.nan
+
+    @property
+    def variance(self):
+        return self._m2 / self._count if self._count else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def min(self):
+        return self._min if self._count else np.nan
+
+    @property
+    def max(self):
+        return self._max if self._count else np.nan
+
+
+def fitness_stats(fitness, chunk_size=None):
+    stats = RunningStats()
+    for start, stop in grandom.iter_chunks(len(fitness), chunk_size):
+        stats.update(fitness[start:stop])
+    return stats
+
+
+def diversity(genomes):
+    """Probability that two chromosomes drawn at random (with replacement)
+    differ at a random gene, i.e. the mean Gini-Simpson index of the genome
+    columns: 0 for a converged population.
+
+    Columns are processed in blocks of about BLOCK_CELLS cells. Values of
+    integer blocks with a small range are counted directly; other blocks
+    are sorted and the sizes of runs of equal values are counted.
+    """
+    rows_count, genes_count = genomes.shape
+    if not rows_count or not genes_count:
+        return 0.0
+    block = max(BLOCK_CELLS // rows_count, 1)
+    total = 0.0
+    for start, stop in grandom.iter_chunks(genes_count, block):
+        columns = np.asarray(genomes[:, start:stop])
+        width = stop - start
+        codes, codes_count = _value_codes(columns)
+        sizes = np.bincount(
+            (codes + np.arange(width) * codes_count).ravel(),
+            minlength=width * codes_count,
+        )
+        squares = (sizes.astype(np.float64) ** 2).reshape(width, -1).sum(1)
+        total += (1 - squares / rows_count**2).sum()
+    return total / genes_count
+
+
+def _value_codes(columns):
+    # Per-column codes in [0, codes_count) that are equal iff values are.
+    rows_count = len(columns)
+    if columns.dtype.kind in "biu":
+        low = int(columns.min())
+        codes_count = int(columns.max()) - low + 1
+        if codes_count <= rows_count:
+            return columns.astype(np.int64) - low, codes_count
+    columns = np.sort(columns, axis=0)
+    new_run = np.ones(columns.shape, dtype=bool)
+    new_run[1:] = columns[1:] != columns[:-1]
+    return np.cumsum(new_run, axis=0) - 1, rows_count
+
+
+Snapshot = collections.namedtuple(
+    "Snapshot",
+    [
+        "generation",
+        "evaluations",
+        "elapsed",
+        "best_fitness",
+        "mean_fitness",
+        "std_fitness",
+        "best_genome",
+        "diversity",
+    ],
+)
+Snapshot.__doc__ = """Statistics of one evaluated generation (see
+gbase.GAlgo.iterate); ``best_genome`` is a copy of the generation's best
+genome and ``diversity`` is None when it is not computed."""
@@ -0,0 +1,29 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.getcwd(), "benchmarks"))
+
+import bench_core
+
+
+def test_benchmark_suite(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    args = ["--sizes", "10", "--lengths", "4", "--repeat", "1"]
+    results = bench_core.main(args + ["--output", str(output)])
+    benchmarks = {r["benchmark"] for r in results}
+    assert benchmarks == set(bench_core.BENCHMARKS)
+    assert len(results) == len(benchmarks) * 3 * 4
+    assert all(r["seconds"] > 0 and r["peak_memory_bytes"] > 0 for r in results)
+
+    with open(output) as f:
+        saved = json.load(f)
+    assert saved["results"] == results
+    assert saved["metadata"]["numpy"]
+
+    capsys.readouterr()
+    bench_core.main(
+        args + ["--benchmarks", "fitness", "--compare", str(output)]
+    )
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 12 and all(" x" in line for line in lines)
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import binary
+import gobjs2
+
+
+@pytest.mark.parametrize("genes_count", [1, 8, 63, 64, 65, 130])
+def test_pack_unpack(genes_count):
+    rng = np.random.default_rng(0)
+    genomes = rng.integers(0, 2, (20, genes_count)).astype(np.uint8)
+    words = binary.pack(genomes)
+    assert words.shape == (20, binary.words_count(genes_count))
+    assert (binary.unpack(words, genes_count) == genomes).all()
+    assert binary.count_ones(words).tolist() == genomes.sum(axis=1).tolist()
+    assert (
+        binary.hamming_distance(words, words[0]).tolist()
+        == (genomes != genomes[0]).sum(axis=1).tolist()
+    )
+    assert binary.match_count(words, words[0], genes_count)[0] == genes_count
+
+
+def test_packed_population_validation():
+    binary.PackedBinaryPopulation([[0b101]], 3)
+    with pytest.raises(ValueError):
+        binary.PackedBinaryPopulation([[0b1101]], 3)
+    with pytest.raises(ValueError):
+        binary.PackedBinaryPopulation([[0, 0]], 3)
+
+
+crossover_data = [
+    (gobjs2.OnePointCrossover, {}),
+    (gobjs2.MultipointCrossover, {"cut_points_count": 3}),
+    (gobjs2.UniformCrossover, {}),
+    (gobjs2.UniformCrossover, {"swap_probability": 0.2}),
+]
+
+
+@pytest.mark.parametrize("crossover, kwargs", crossover_data)
+def test_packed_crossover(crossover, kwargs):
+    parents = binary.PackedBinaryPopulation(
+        binary.pack([[0] * 100, [1] * 100]), 100
+    )
+    new_population = crossover(
+        parents, 500, proportionate_selection=False, **kwargs
+    ).generate_new_population()
+    assert isinstance(new_population, binary.PackedBinaryPopulation)
+    genomes = new_population.genomes
+    assert (genomes[0::2] != genomes[1::2]).all()
+    binary.PackedBinaryPopulation(new_population.words, 100)
+
+
+def test_packed_fitness_and_mutation():
+    rng = np.random.default_rng(0)
+    population = binary.PackedBinaryPopulation.generate_random_population(
+        200, 130, rng
+    )
+    matrix = population.to_population_matrix()
+    population.fitness(binary.count_ones, chunk_size=64)
+    matrix.fitness(lambda c: sum([g.value for g in c.genes_list]))
+    assert (population.genomes == matrix.genomes).all()
+    assert (population.fitness_array == matrix.fitness_array).all()
+
+    before = population.words.copy()
+    binary.PackedFlipMutation(population, 0.1, rng=rng).apply_mutation()
+    flipped = binary.hamming_distance(before, population.words).sum()
+    assert 2200 < flipped < 3000
+    binary.PackedBinaryPopulation(population.words, 130)
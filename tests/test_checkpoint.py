@@ -0,0 +1,137 @@
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import checkpoint
+import evaluators
+import gbase
+import gobjs2
+import gtypes
+
+mixed_types = (
+    [gtypes.BinaryType()] * 3
+    + [gtypes.IntType(-3, 3), gtypes.FloatType(0, 1, 3)]
+    + [gtypes.StrType("lowercase")] * 2
+)
+
+
+def test_template_description():
+    ct = gobjs2.ChromosomeTemplate(mixed_types)
+    description = checkpoint.describe_template(ct)
+    assert description[0] == [3, "BinaryType", {}]
+    assert description[-1] == [2, "StrType", {"mode": "lowercase"}]
+    assert checkpoint.template_from_description(description) == ct
+    with pytest.raises(ValueError):
+        checkpoint.template_from_description([[1, "Custom", {}]])
+
+
+@pytest.mark.parametrize(
+    "types_list, as_matrix",
+    [
+        ([gtypes.IntType(0, 300)] * 5, True),
+        ([gtypes.IntType(0, 300)] * 5, False),
+        (mixed_types, True),
+    ],
+)
+def test_save_load_population(tmp_path, types_list, as_matrix):
+    ct = gobjs2.ChromosomeTemplate(types_list)
+    population = gobjs2.PopulationMatrix.generate_random_population(30, ct)
+    population.fitness_array[:] = np.arange(30)
+    if not as_matrix:
+        population = population.to_population()
+    path = tmp_path / "population.npz"
+    checkpoint.save_population(path, population)
+    assert os.listdir(tmp_path) == ["population.npz"]
+
+    loaded = checkpoint.load_population(path)
+    assert loaded.chromosome_tmplt == ct
+    assert loaded.genomes.tolist() == population.genomes.tolist()
+    assert loaded.fitness_array.tolist() == list(range(30))
+
+
+def make_galgo(max_generations=10, **kwargs):
+    ct = gobjs2.ChromosomeTemplate(mixed_types)
+    return gbase.GAlgo(
+        ct,
+        lambda g: (g[:, :5].astype(float)).sum(axis=1),
+        population_size=20,
+        evaluator=evaluators.BatchEvaluator(),
+        max_generations=max_generations,
+        **kwargs,
+    )
+
+
+def test_galgo_resume(tmp_path):
+    random.seed(0)
+    expected = make_galgo(rng=0)
+    expected.run()
+
+    random.seed(0)
+    cp = checkpoint.Checkpoint(tmp_path, interval=4)
+    galgo = make_galgo(rng=0, checkpoint=cp)
+    galgo.reset()
+    for _ in range(6):
+        galgo.step()
+    assert sorted(os.listdir(tmp_path)) == ["state.npz", "template.json"]
+
+    resumed = make_galgo(rng=1, checkpoint=checkpoint.Checkpoint(tmp_path))
+    resumed.run(resume=True)
+    assert resumed.generation == expected.generation == 10
+    assert resumed.evaluations == expected.evaluations
+    assert resumed.population.genomes.tolist() == (
+        expected.population.genomes.tolist()
+    )
+    assert resumed.best.genome.tolist() == expected.best.genome.tolist()
+
+    resumed = make_galgo(checkpoint=checkpoint.Checkpoint(tmp_path))
+    resumed.run(resume=True)
+    assert resumed.generation == 10
+    assert resumed.stop_reason == "max_generations"
+
+
+def test_checkpoint_template_mismatch(tmp_path):
+    cp = checkpoint.Checkpoint(tmp_path)
+    make_galgo(max_generations=1, checkpoint=cp).run()
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 7)
+    galgo = gbase.GAlgo(ct, sum, population_size=20)
+    with pytest.raises(ValueError):
+        cp.load(galgo)
+
+
+def test_steady_state_galgo_resume(tmp_path):
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType(0, 3)] * 6)
+
+    def make_steady_galgo(**kwargs):
+        return gbase.SteadyStateGAlgo(
+            ct,
+            lambda g: g.sum(axis=1),
+            population_size=20,
+            replacement_count=3,
+            evaluator=evaluators.BatchEvaluator(),
+            max_generations=40,
+            **kwargs,
+        )
+
+    expected = make_steady_galgo(rng=0)
+    expected.run()
+
+    galgo = make_steady_galgo(
+        rng=0, checkpoint=checkpoint.Checkpoint(tmp_path, interval=7)
+    )
+    galgo.reset()
+    for _ in range(15):
+        galgo.step()
+
+    resumed = make_steady_galgo(checkpoint=checkpoint.Checkpoint(tmp_path))
+    resumed.run(resume=True)
+    assert resumed.generation == expected.generation == 40
+    assert resumed.evaluations == expected.evaluations == 20 + 39 * 3
+    assert resumed.ranking.tolist() == expected.ranking.tolist()
+    assert resumed.population.genomes.tolist() == (
+        expected.population.genomes.tolist()
+    )
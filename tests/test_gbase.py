@@ -0,0 +1,247 @@
+import asyncio
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import evaluators
+import gbase
+import gobjs2
+import gtypes
+
+
+def onemax(genomes):
+    return genomes.sum(axis=1)
+
+
+def sphere(genomes):
+    return (genomes**2).sum(axis=1)
+
+
+def test_galgo_target_fitness():
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 50)
+    galgo = gbase.GAlgo(
+        ct,
+        onemax,
+        population_size=100,
+        evaluator=evaluators.BatchEvaluator(),
+        max_generations=500,
+        target_fitness=50,
+        rng=0,
+    )
+    best = galgo.run()
+    assert galgo.stop_reason == "target_fitness"
+    assert best.fitness == 50
+    assert best.genome.tolist() == [1] * 50
+    assert galgo.evaluations == galgo.generation * 100
+
+
+def test_galgo_elitism_and_buffers():
+    ct = gobjs2.ChromosomeTemplate([gtypes.FloatType(-5, 5, 3)] * 5)
+    galgo = gbase.GAlgo(
+        ct,
+        sphere,
+        population_size=40,
+        mode="minimize",
+        evaluator=evaluators.BatchEvaluator(),
+        rng=0,
+    )
+    galgo.reset()
+    buffers = {id(galgo.population), id(galgo._next_population)}
+    best_fitness = []
+    for _ in range(30):
+        assert not galgo.step()
+        assert id(galgo.population) in buffers
+        elite = galgo.population.genomes[:1]
+        assert sphere(elite)[0] == pytest.approx(galgo.best_fitness)
+        best_fitness.append(galgo.best_fitness)
+    assert best_fitness == sorted(best_fitness, reverse=True)
+    assert best_fitness[-1] < best_fitness[0]
+
+
+@pytest.mark.parametrize(
+    "kwargs, reason",
+    [
+        ({"max_generations": 7}, "max_generations"),
+        ({"max_evaluations": 250}, "max_evaluations"),
+        ({"stagnation_limit": 3, "max_generations": 1000}, "stagnation"),
+        ({"time_limit": 0}, "time_limit"),
+    ],
+)
+def test_galgo_stop_conditions(kwargs, reason):
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType(0, 3)] * 4)
+    galgo = gbase.GAlgo(
+        ct,
+        onemax,
+        population_size=50,
+        evaluator=evaluators.BatchEvaluator(),
+        **kwargs,
+    )
+    galgo.run()
+    assert galgo.stop_reason == reason
+    if reason == "max_generations":
+        assert galgo.generation == 7
+    elif reason == "max_evaluations":
+        assert galgo.evaluations == 250
+    assert galgo.step()
+
+
+def test_galgo_invalid_arguments():
+    ct = gobjs2.ChromosomeTemplate()
+    with pytest.raises(ValueError):
+        gbase.GAlgo(ct, onemax, population_size=11)
+    with pytest.raises(ValueError):
+        gbase.GAlgo(ct, onemax, population_size=10, elitism=11)
+    with pytest.raises(ValueError):
+        gbase.GAlgo(ct, onemax, population_size=10, parents_count=0)
+
+
+def test_galgo_migrants():
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType(0, 9)] * 3)
+    galgo = gbase.GAlgo(
+        ct, onemax, population_size=10, evaluator=evaluators.BatchEvaluator()
+    )
+    galgo.reset()
+    with pytest.raises(ValueError):
+        galgo.get_migrants(2)
+    galgo.step()
+    genomes, fitness = galgo.get_migrants(2)
+    assert fitness.tolist() == sorted(onemax(genomes).tolist(), reverse=True)
+    assert fitness[0] == galgo.best_fitness
+    galgo.add_migrants([[9, 9, 9]])
+    assert galgo.population.genomes[-1].tolist() == [9, 9, 9]
+    with pytest.raises(ValueError):
+        galgo.add_migrants(np.zeros((10, 3)))
+    galgo.step()
+    assert galgo.best_fitness == 27
+
+
+def test_galgo_run_async():
+    async def func(genomes):
+        await asyncio.sleep(0)
+        return onemax(genomes)
+
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 20)
+    kwargs = {"population_size": 20, "max_generations": 10, "rng": 0}
+    galgo = gbase.GAlgo(
+        ct, func, evaluator=evaluators.AsyncEvaluator(batch=True), **kwargs
+    )
+    random.seed(0)
+    best = asyncio.run(galgo.run_async())
+    expected = gbase.GAlgo(
+        ct, onemax, evaluator=evaluators.BatchEvaluator(), **kwargs
+    )
+    random.seed(0)
+    assert expected.run().genome.tolist() == best.genome.tolist()
+    assert expected.generation == galgo.generation == 10
+
+
+def test_galgo_random_seed():
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 20)
+    results = []
+    for _ in range(2):
+        random.seed(0)
+        galgo = gbase.GAlgo(
+            ct,
+            onemax,
+            population_size=20,
+            evaluator=evaluators.BatchEvaluator(),
+            max_generations=5,
+        )
+        results.append(galgo.run().genome.tolist())
+    assert results[0] == results[1]
+
+
+def check_ranking(galgo):
+    fitness = galgo.population.fitness_array
+    ranking = galgo.ranking
+    assert sorted(ranking.tolist()) == list(range(len(fitness)))
+    ranked = fitness[ranking]
+    if galgo._mode == "maximize":
+        ranked = -ranked
+    assert (np.diff(ranked) >= 0).all()
+    assert galgo._keys.tolist() == ranked.tolist()
+
+
+@pytest.mark.parametrize(
+    "mode, replacement_count, parents_count",
+    [("maximize", 4, None), ("minimize", 3, 10), ("maximize", 1, None)],
+)
+def test_steady_state_galgo(mode, replacement_count, parents_count):
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType(0, 9)] * 10)
+    evaluated = []
+
+    def func(genomes):
+        evaluated.append(len(genomes))
+        return onemax(genomes)
+
+    galgo = gbase.SteadyStateGAlgo(
+        ct,
+        func,
+        population_size=30,
+        replacement_count=replacement_count,
+        mode=mode,
+        parents_count=parents_count,
+        evaluator=evaluators.BatchEvaluator(),
+        max_generations=300,
+        rng=0,
+    )
+    galgo.reset()
+    galgo.step()
+    assert evaluated == [30]
+    check_ranking(galgo)
+    best_fitness = [galgo.best_fitness]
+    for _ in range(100):
+        population = galgo.population
+        kept_rows = galgo.ranking[:-replacement_count].copy()
+        kept = population.genomes[kept_rows]
+        assert not galgo.step()
+        assert galgo.population is population
+        assert population.genomes[kept_rows].tolist() == kept.tolist()
+        check_ranking(galgo)
+        best_fitness.append(galgo.best_fitness)
+    assert evaluated[1:] == [replacement_count] * 100
+    assert galgo.evaluations == 30 + 100 * replacement_count
+    assert galgo.generation == 101
+    if mode == "maximize":
+        assert best_fitness == sorted(best_fitness)
+        assert best_fitness[-1] > best_fitness[0]
+    else:
+        assert best_fitness == sorted(best_fitness, reverse=True)
+        assert best_fitness[-1] < best_fitness[0]
+    genomes, fitness = galgo.get_migrants(3)
+    assert fitness[0] == galgo.best_fitness
+    assert fitness.tolist() == onemax(genomes).tolist()
+
+
+def test_steady_state_galgo_budget_and_migrants():
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 20)
+    galgo = gbase.SteadyStateGAlgo(
+        ct,
+        onemax,
+        population_size=20,
+        replacement_count=4,
+        evaluator=evaluators.BatchEvaluator(),
+        max_generations=10**6,
+        max_evaluations=103,
+        rng=0,
+    )
+    with pytest.raises(ValueError):
+        gbase.SteadyStateGAlgo(
+            ct, onemax, population_size=20, replacement_count=20
+        )
+    galgo.reset()
+    galgo.step()
+    galgo.add_migrants([[1] * 20])
+    with pytest.raises(ValueError):
+        galgo.add_migrants(np.ones((5, 20)))
+    galgo.step()
+    assert galgo.best_fitness == 20
+    assert galgo.population.genomes[galgo.ranking[0]].tolist() == [1] * 20
+    galgo.run()
+    assert galgo.stop_reason == "max_evaluations"
+    assert galgo.evaluations == 100
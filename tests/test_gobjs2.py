@@ -0,0 +1,508 @@
+import asyncio
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import evaluators
+import gobjs2
+import gtypes
+
+
+def fitness_sum(chromosome):
+    return sum([g.value for g in chromosome.genes_list])
+
+
+dtype_data = [
+    ([gtypes.BinaryType()] * 4, np.uint8),
+    ([gtypes.IntType(0, 200)] * 4, np.uint8),
+    ([gtypes.IntType(-5, 5)] * 4, np.int8),
+    ([gtypes.FloatType()] * 4, np.float64),
+    ([gtypes.StrType()] * 4, np.dtype("<U1")),
+    ([gtypes.BinaryType(), gtypes.FloatType()], np.float64),
+    ([gtypes.BinaryType(), gtypes.StrType()], object),
+]
+
+
+@pytest.mark.parametrize("types_list, expected", dtype_data)
+def test_template_dtype(types_list, expected):
+    assert gobjs2.ChromosomeTemplate(types_list).dtype == np.dtype(expected)
+
+
+class ListType(gtypes.IntType):
+    # Custom type without a hash: not interned.
+    __hash__ = None
+
+
+def test_template_interning():
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType(), gtypes.StrType()] * 3)
+    assert gobjs2.ChromosomeTemplate(list(ct.types_list)) is ct
+    assert hash(ct) == hash(ct.fingerprint)
+    assert pickle.loads(pickle.dumps(ct)) is ct
+    assert gobjs2.ChromosomeTemplate([gtypes.IntType()] * 6) != ct
+    # Shared templates cannot be changed through their gene types.
+    assert isinstance(ct.types_list, tuple)
+    assert gobjs2.ChromosomeTemplate(ct.types_list) is ct
+
+    genes = [gobjs2.Gene(1, gtypes.IntType()) for _ in range(4)]
+    c1 = gobjs2.Chromosome(genes)
+    c2 = gobjs2.Chromosome([gobjs2.Gene(2, gtypes.IntType(9, 0))] * 4)
+    assert c1.chromosome_tmplt is c2.chromosome_tmplt
+    with pytest.raises(ValueError):
+        gobjs2.Population([c1, gobjs2.Chromosome(genes[:3])])
+
+    custom = gobjs2.ChromosomeTemplate([ListType(), ListType()])
+    assert custom == gobjs2.ChromosomeTemplate([ListType(), ListType()])
+    gobjs2.Population(
+        [gobjs2.Chromosome([gobjs2.Gene(1, ListType())] * 2) for _ in range(3)]
+    )
+
+
+def test_population_matrix_validation():
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 3)
+    gobjs2.PopulationMatrix([[0, 1, 1], [1, 0, 0]], ct)
+    with pytest.raises(ValueError):
+        gobjs2.PopulationMatrix([[0, 1, 2]], ct)
+    with pytest.raises(ValueError):
+        gobjs2.PopulationMatrix([[0, 1]], ct)
+    ct = gobjs2.ChromosomeTemplate([gtypes.StrType()] * 2)
+    with pytest.raises(ValueError):
+        gobjs2.PopulationMatrix([["a", "bc"]], ct)
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType(), gtypes.StrType()])
+    p = gobjs2.PopulationMatrix([[1, "a"], [2.0, "b"]], ct)
+    assert p.genomes.tolist() == [[1, "a"], [2.0, "b"]]
+    with pytest.raises(ValueError):
+        gobjs2.PopulationMatrix([["1", "a"]], ct)
+
+
+@pytest.mark.parametrize("as_matrix", [False, True])
+def test_generate_random_population(as_matrix):
+    ct = gobjs2.ChromosomeTemplate(
+        [
+            gtypes.IntType(),
+            gtypes.StrType(),
+            gtypes.IntType(),
+            gtypes.FloatType(),
+        ]
+    )
+    cls = gobjs2.PopulationMatrix if as_matrix else gobjs2.Population
+    p = cls.generate_random_population(500, ct, np.random.default_rng(3))
+    genomes = p.genomes
+    assert genomes.shape == (500, 4)
+    assert p.chromosome_tmplt is ct
+    assert [type(v) for v in genomes[0]] == [int, str, int, float]
+    gobjs2.PopulationMatrix(genomes, ct)
+    assert (genomes[:, 0] != genomes[:, 2]).any()
+    assert (cls.generate_random_population(500, ct, 3).genomes == genomes).all()
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize(
+    "types_list, value_types",
+    [
+        (
+            [gtypes.IntType(), gtypes.BinaryType(), gtypes.FloatType()],
+            [int, int, float],
+        ),
+        (
+            [
+                gtypes.IntType(),
+                gtypes.BinaryType(),
+                gtypes.FloatType(),
+                gtypes.StrType(),
+            ],
+            [int, int, float, str],
+        ),
+    ],
+)
+def test_generate_random_population_value_types(
+    compact, types_list, value_types
+):
+    ct = gobjs2.ChromosomeTemplate(types_list)
+    p = gobjs2.Population.generate_random_population(20, ct, 0, compact)
+    for c in p.chromosome_list:
+        assert [type(g.value) for g in c.genes_list] == value_types
+
+
+def test_population_matrix_views():
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType()] * 3)
+    p = gobjs2.PopulationMatrix([[1, 2, 3], [4, 5, 6]], ct)
+    c = p[1]
+    assert len(p) == 2 and len(c) == 3
+    assert [g.value for g in c.genes_list] == [4, 5, 6]
+    assert str(c) == "Chromosome(4 5 6)"
+    assert c.chromosome_tmplt is ct
+    c[0].value = 9
+    assert p.genomes[1, 0] == 9
+    with pytest.raises(ValueError):
+        c[0].value = 10
+    c.fitness = 2.5
+    assert p.fitness_array[1] == 2.5
+
+
+@pytest.mark.parametrize("mode", ["maximize", "minimize"])
+def test_population_matrix_fitness_matches_population(mode):
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType()] * 6)
+    matrix = gobjs2.PopulationMatrix.generate_random_population(50, ct)
+    population = matrix.to_population()
+    matrix.fitness(fitness_sum, mode)
+    population.fitness(fitness_sum, mode)
+    assert np.array_equal(matrix.genomes, population.genomes)
+    assert [c.fitness for c in matrix.get_parents(5)] == [
+        c.fitness for c in population.get_parents(5)
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 7, 100])
+def test_batch_fitness_matches_serial(chunk_size):
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType()] * 6)
+    matrix = gobjs2.PopulationMatrix.generate_random_population(50, ct)
+    population = matrix.to_population()
+    matrix.fitness(
+        lambda genomes: genomes.sum(axis=1),
+        evaluator=evaluators.BatchEvaluator(chunk_size),
+    )
+    population.fitness(fitness_sum)
+    assert np.array_equal(matrix.genomes, population.genomes)
+    assert matrix.fitness_array.tolist() == [
+        c.fitness for c in population.chromosome_list
+    ]
+
+
+def test_batch_fitness_invalid_vector():
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType()] * 6)
+    matrix = gobjs2.PopulationMatrix.generate_random_population(10, ct)
+    with pytest.raises(ValueError):
+        matrix.fitness(
+            lambda genomes: genomes.sum(),
+            evaluator=evaluators.BatchEvaluator(),
+        )
+
+
+def fitness_batch_sum(genomes):
+    return genomes.sum(axis=1)
+
+
+def fitness_first_gene(chromosome):
+    return chromosome[0].value
+
+
+pool_data = [
+    ([gtypes.IntType()] * 6, fitness_sum, False),
+    ([gtypes.IntType()] * 6, fitness_batch_sum, True),
+    ([gtypes.BinaryType(), gtypes.StrType()], fitness_first_gene, False),
+]
+
+
+@pytest.mark.parametrize("types_list, func, batch", pool_data)
+def test_process_pool_fitness_matches_serial(types_list, func, batch):
+    ct = gobjs2.ChromosomeTemplate(types_list)
+    matrix = gobjs2.PopulationMatrix.generate_random_population(101, ct)
+    expected = gobjs2.PopulationMatrix._wrap(matrix.genomes.copy(), ct)
+    serial = evaluators.BatchEvaluator() if batch else None
+    expected.fitness(func, evaluator=serial)
+    expected.fitness(func, evaluator=serial)
+    with evaluators.ProcessPoolEvaluator(2, chunk_size=10, batch=batch) as e:
+        matrix.fitness(func, evaluator=e)
+        matrix.fitness(func, evaluator=e)
+    assert np.array_equal(matrix.genomes, expected.genomes)
+    assert np.array_equal(matrix.fitness_array, expected.fitness_array)
+
+
+def test_cached_fitness():
+    calls = []
+
+    def func(chromosome):
+        calls.append(str(chromosome))
+        return fitness_sum(chromosome)
+
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 2)
+    genomes = [[0, 0], [0, 1], [0, 0], [1, 1], [0, 1]]
+    cache = evaluators.CachedEvaluator(maxsize=2)
+    matrix = gobjs2.PopulationMatrix(genomes, ct)
+    matrix.fitness(func, evaluator=cache)
+    assert len(calls) == 3
+    assert (cache.hits, cache.misses, len(cache)) == (2, 3, 2)
+    assert matrix.fitness_array.tolist() == [2, 1, 1, 0, 0]
+
+    population = gobjs2.PopulationMatrix(genomes, ct).to_population()
+    population.fitness(func, evaluator=cache)
+    assert len(calls) == 4
+    assert [c.fitness for c in population.chromosome_list] == [2, 1, 1, 0, 0]
+
+    class Bit(gtypes.BinaryType):
+        pass
+
+    # Same string as ct, but another template.
+    other = gobjs2.ChromosomeTemplate([Bit()] * 2)
+    assert str(other) == str(ct) and other != ct
+    cache = evaluators.CachedEvaluator()
+    for tmplt in (ct, other):
+        gobjs2.PopulationMatrix([[1, 1]], tmplt).fitness(func, evaluator=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+@pytest.mark.parametrize("as_matrix", [True, False])
+def test_async_fitness(as_matrix):
+    in_flight = [0, 0]
+
+    async def func(chromosome):
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        await asyncio.sleep(0.001 * (chromosome[0].value % 3))
+        in_flight[0] -= 1
+        return fitness_sum(chromosome)
+
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType()] * 4)
+    population = gobjs2.PopulationMatrix.generate_random_population(50, ct)
+    if not as_matrix:
+        population = population.to_population()
+    expected = [fitness_sum(c) for c in population.chromosome_list]
+    population.fitness(func, mode="minimize")
+    assert [c.fitness for c in population.chromosome_list] == sorted(expected)
+    assert in_flight[1] == 50
+
+    in_flight[1] = 0
+    evaluator = evaluators.AsyncEvaluator(concurrency=7)
+    asyncio.run(population.fitness_async(func, evaluator=evaluator))
+    fitness = [c.fitness for c in population.chromosome_list]
+    assert fitness == sorted(expected, reverse=True)
+    assert in_flight[1] == 7
+
+
+def test_async_batch_fitness():
+    async def func(genomes):
+        await asyncio.sleep(0)
+        return genomes.sum(axis=1)
+
+    async def failing(chromosome):
+        raise RuntimeError()
+
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType()] * 4)
+    matrix = gobjs2.PopulationMatrix.generate_random_population(50, ct)
+    expected = np.sort(matrix.genomes.sum(axis=1))[::-1]
+    evaluator = evaluators.AsyncEvaluator(batch=True, chunk_size=8)
+    matrix.fitness(func, evaluator=evaluator)
+    assert matrix.fitness_array.tolist() == expected.tolist()
+    with pytest.raises(RuntimeError):
+        matrix.fitness(failing)
+
+
+@pytest.mark.parametrize(
+    "crossover, kwargs, transitions",
+    [
+        (gobjs2.OnePointCrossover, {}, 1),
+        (gobjs2.MultipointCrossover, {"cut_points_count": 1}, 1),
+        (gobjs2.MultipointCrossover, {"cut_points_count": 3}, 3),
+    ],
+)
+def test_batch_crossover(crossover, kwargs, transitions):
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 8)
+    parents = gobjs2.PopulationMatrix([[0] * 8, [1] * 8], ct)
+    new_population = crossover(
+        parents, 1000, proportionate_selection=False, **kwargs
+    ).generate_new_population()
+    genomes = new_population.genomes
+    assert isinstance(new_population, gobjs2.PopulationMatrix)
+    assert genomes.shape == (1000, 8)
+    assert (genomes[0::2] != genomes[1::2]).all()
+    cuts = np.diff(genomes.astype(int), axis=1) != 0
+    assert cuts.sum(axis=1).tolist() == [transitions] * 1000
+    assert cuts.any(axis=0).all()
+
+
+def test_batch_crossover_proportionate_selection():
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 4)
+    parents = gobjs2.PopulationMatrix(
+        [[0] * 4, [1] * 4], ct, fitness=[0.0, 1.0]
+    )
+    new_population = gobjs2.OnePointCrossover(
+        parents, 10
+    ).generate_new_population()
+    assert (new_population.genomes == 1).all()
+
+
+@pytest.mark.parametrize("swap_probability", [0, 0.3, 1])
+def test_uniform_crossover_mixed_types(swap_probability):
+    ct = gobjs2.ChromosomeTemplate(
+        [gtypes.BinaryType(), gtypes.StrType(), gtypes.FloatType()] * 20
+    )
+    parents = gobjs2.PopulationMatrix(
+        [[0, "a", 1.5] * 20, [1, "b", 2.5] * 20], ct
+    )
+    crossover = gobjs2.UniformCrossover(
+        parents,
+        2000,
+        proportionate_selection=False,
+        swap_probability=swap_probability,
+        rng=np.random.default_rng(1),
+    )
+    mask = crossover._crossover_mask(1000, 60, np.random.default_rng(2))
+    assert abs(mask.mean() - (1 - swap_probability)) < 0.01
+
+    new_population = crossover.generate_new_population()
+    genomes = new_population.genomes
+    assert new_population.chromosome_tmplt is ct
+    assert genomes.shape == (2000, 60)
+    assert (genomes[0::2] != genomes[1::2]).all()
+    from_p1 = genomes == parents.genomes[0]
+    assert (from_p1 | (genomes == parents.genomes[1])).all()
+    if swap_probability in (0, 1):
+        assert (from_p1.all(axis=1) | (~from_p1).all(axis=1)).all()
+
+
+@pytest.mark.parametrize(
+    "crossover",
+    [
+        gobjs2.OnePointCrossover,
+        gobjs2.MultipointCrossover,
+        gobjs2.UniformCrossover,
+    ],
+)
+def test_list_crossover_shares_template(crossover):
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType()] * 10)
+    parents = gobjs2.PopulationMatrix.generate_random_population(
+        6, ct
+    ).to_population()
+    offspring = crossover(parents.chromosome_list, 10).generate_new_population()
+    assert len(offspring) == 10
+    assert all(c.chromosome_tmplt is ct for c in offspring)
+    with pytest.raises(ValueError):
+        other = gobjs2.Chromosome.generate_random_chromosome(
+            gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 10)
+        )
+        crossover(
+            parents.chromosome_list + [other], 10
+        ).generate_new_population()
+
+
+@pytest.mark.parametrize(
+    "crossover",
+    [
+        gobjs2.OnePointCrossover,
+        gobjs2.MultipointCrossover,
+        gobjs2.UniformCrossover,
+    ],
+)
+def test_list_crossover_of_views(crossover):
+    import mutation
+
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType()] * 10)
+    matrix = gobjs2.PopulationMatrix.generate_random_population(6, ct, 0)
+    offspring = crossover(
+        matrix.chromosome_list, 10, rng=0
+    ).generate_new_population()
+    assert len(offspring) == 10
+    assert all(type(c) is gobjs2.Chromosome for c in offspring)
+    assert all(c.chromosome_tmplt is ct for c in offspring)
+    parent_values = set(matrix.genomes.ravel().tolist())
+    assert set(offspring.genomes.ravel().tolist()) <= parent_values
+
+    # Children do not share memory with the parents' rows.
+    children = offspring.genomes.copy()
+    matrix.genomes[:] = 9
+    assert offspring.genomes.tolist() == children.tolist()
+
+    # Object-path mutation of views writes into the matrix.
+    before = matrix.genomes.copy()
+    views = gobjs2.Population(matrix.chromosome_list)
+    mutation.RandomResetMutation(views, 0.5, rng=0).apply_mutation()
+    assert (matrix.genomes != before).any()
+    assert matrix.genomes.tolist() == [list(c.values) for c in views]
+
+
+@pytest.mark.parametrize("maximize", [True, False])
+@pytest.mark.parametrize("k", [1, 3, 10, 50])
+@pytest.mark.parametrize("nan", [False, True])
+def test_top_k_indices(maximize, k, nan):
+    values = np.random.default_rng(k).integers(0, 5, size=50).astype(float)
+    if nan:
+        values[[3, 17]] = np.nan
+    order = np.argsort(values, kind="stable")
+    if maximize:
+        order = order[::-1]
+    result = gobjs2.top_k_indices(values, k, maximize)
+    assert result.tolist() == order[:k].tolist()
+
+
+@pytest.mark.parametrize("mode", ["maximize", "minimize"])
+def test_get_parents_nan_fitness(mode):
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType(0, 3)] * 3)
+    matrix = gobjs2.PopulationMatrix.generate_random_population(10, ct)
+    matrix.fitness(fitness_sum, mode)
+    matrix.fitness_array[0] = np.nan
+    assert len(matrix.get_parents(2)) == 2
+
+
+@pytest.mark.parametrize("mode", ["maximize", "minimize"])
+def test_get_parents_without_sort(mode):
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType(0, 3)] * 3)
+    matrix = gobjs2.PopulationMatrix.generate_random_population(100, ct)
+    population = matrix.to_population()
+    expected = matrix.to_population()
+    expected.fitness(fitness_sum, mode)
+    expected = [str(c) for c in expected.chromosome_list[:7]]
+
+    for p in (matrix, population):
+        p.fitness(fitness_sum, mode)
+        assert p._sort_mode == mode
+        assert [str(c) for c in p.get_parents(7)] == expected
+        assert p._sort_mode == mode
+        assert [str(c) for c in p.chromosome_list[:7]] == expected
+        assert p._sort_mode is None
+
+
+@pytest.mark.parametrize(
+    "crossover",
+    [
+        gobjs2.OnePointCrossover,
+        gobjs2.MultipointCrossover,
+        gobjs2.UniformCrossover,
+    ],
+)
+def test_compact_chromosomes(crossover):
+    import mutation
+
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType()] * 10)
+    p = gobjs2.Population.generate_random_population(20, ct, 0, compact=True)
+    c = p[0]
+    assert isinstance(c, gobjs2.CompactChromosome)
+    assert not hasattr(c, "__dict__") and not hasattr(c[0], "__dict__")
+    assert [g.value for g in c.genes_list] == list(c.values)
+    assert [g.value for g in c[:]] == list(c.values)
+    assert (
+        p.genomes
+        == gobjs2.PopulationMatrix.generate_random_population(20, ct, 0).genomes
+    ).all()
+    c[0].value = 9
+    c.genes_list[-1].value = 8
+    assert c.values[0] == 9 and c.values[-1] == 8
+    with pytest.raises(ValueError):
+        c[1].value = 10
+
+    p.fitness(lambda c: sum(c.values))
+    assert [c.fitness for c in p] == sorted(
+        (sum(c.values) for c in p), reverse=True
+    )
+    offspring = crossover(p.get_parents(10), 20).generate_new_population()
+    assert all(isinstance(c, gobjs2.CompactChromosome) for c in offspring)
+    gobjs2.PopulationMatrix(offspring.genomes, ct)
+    before = offspring.genomes
+    mutation.RandomResetMutation(
+        offspring, 0.5, rng=np.random.default_rng(0)
+    ).apply_mutation()
+    assert (offspring.genomes != before).any()
+    gobjs2.PopulationMatrix(offspring.genomes, ct)
+
+    with pytest.raises(ValueError):
+        gobjs2.CompactChromosome([1] * 9 + [10], ct)
+    mixed = (
+        p.get_parents(5)
+        + gobjs2.Population.generate_random_population(5, ct).chromosome_list
+    )
+    with pytest.raises(ValueError):
+        crossover(mixed, 10).generate_new_population()
@@ -0,0 +1,107 @@
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import evaluators
+import gbase
+import gobjs2
+import grandom
+import gtypes
+
+
+def test_spawn():
+    first = [g.integers(1000, size=5).tolist() for g in grandom.spawn(3, 4)]
+    second = [g.integers(1000, size=5).tolist() for g in grandom.spawn(3, 4)]
+    assert first == second and len({tuple(v) for v in first}) == 4
+
+    rng = np.random.default_rng(5)
+    state = rng.bit_generator.state
+    children = grandom.spawn(rng, 2)
+    rng.bit_generator.state = state
+    assert [g.random() for g in grandom.spawn(rng, 2)] == [
+        g.random() for g in children
+    ]
+
+    random.seed(0)
+    first = grandom.get_rng().random()
+    random.seed(0)
+    assert grandom.get_rng().random() == first
+
+
+def test_map_chunks_independent_of_workers():
+    def draw(start, stop, rng):
+        return (start, stop, rng.random(stop - start).tolist())
+
+    expected = grandom.map_chunks(draw, 100, 7, rng=1)
+    assert [chunk[:2] for chunk in expected][-2:] == [(91, 98), (98, 100)]
+    for workers in (2, 5):
+        assert grandom.map_chunks(draw, 100, 7, 1, workers) == expected
+    single = grandom.map_chunks(draw, 5, 7, rng=np.random.default_rng(1))
+    assert single[0][2] == np.random.default_rng(1).random(5).tolist()
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_generation_and_crossover(workers):
+    ct = gobjs2.ChromosomeTemplate(
+        [gtypes.IntType(), gtypes.FloatType(), gtypes.StrType()] * 5
+    )
+    generate = gobjs2.PopulationMatrix.generate_random_population
+    serial = generate(1000, ct, 11, chunk_size=64)
+    parallel = generate(1000, ct, 11, workers=workers, chunk_size=64)
+    assert (parallel.genomes == serial.genomes).all()
+    assert (generate(1000, ct, 11).genomes != serial.genomes).any()
+    gobjs2.PopulationMatrix(serial.genomes, ct)
+
+    serial.chunk_size = parallel.chunk_size = 100
+    offspring = [
+        gobjs2.UniformCrossover(p, 1000, rng=3, workers=w)
+        .generate_new_population()
+        .genomes
+        for p, w in [(serial, None), (parallel, workers)]
+    ]
+    assert (offspring[0] == offspring[1]).all()
+
+
+def test_seeded_list_crossover():
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType()] * 12)
+    parents = gobjs2.Population.generate_random_population(10, ct, 0)
+    for crossover in (
+        gobjs2.OnePointCrossover,
+        gobjs2.MultipointCrossover,
+        gobjs2.UniformCrossover,
+    ):
+        runs = []
+        for seed in (1, 2):
+            random.seed(seed)
+            runs.append(
+                crossover(parents.chromosome_list, 20, rng=4)
+                .generate_new_population()
+                .genomes
+            )
+        assert (runs[0] == runs[1]).all()
+
+
+def onemax(genomes):
+    return genomes.sum(axis=1)
+
+
+def test_galgo_workers():
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 30)
+    results = []
+    for workers in (None, 4):
+        galgo = gbase.GAlgo(
+            ct,
+            onemax,
+            evaluator=evaluators.BatchEvaluator(),
+            population_size=40,
+            max_generations=10,
+            rng=0,
+            workers=workers,
+        )
+        results.append((galgo.run().genome.tolist(), galgo.best_fitness))
+    assert results[0] == results[1]
@@ -1,6 +1,9 @@
 import os
+import pickle
+import random
 import sys
 
+import numpy as np
 import pytest
 
 sys.path.append(os.getcwd())
@@ -69,3 +72,64 @@ eq_data = [
 @pytest.mark.parametrize("gen_type1, gen_type2, expected", eq_data)
 def test_eq(gen_type1, gen_type2, expected):
     assert (gen_type1 == gen_type2) == expected
+
+
+def test_float_random_val_is_valid():
+    random.seed(0)
+    gene_type = gtypes.FloatType(0, 1, 1)
+    values = [gene_type.get_random_val() for _ in range(1000)]
+    assert all(gene_type.validate(v) for v in values)
+    assert max(values) == 0.9
+
+
+@pytest.mark.parametrize(
+    "gen_type", list({str(t): t for t, _, _ in validation_data}.values())
+)
+def test_validate_batch_matches_validate(gen_type):
+    values = [v for _, v, _ in validation_data] + [2.0, 8.5, "", "ab", None]
+    expected = [gen_type.validate(v) for v in values]
+    assert gen_type.validate_batch(np.array(values, dtype=object)).tolist() == (
+        expected
+    )
+    for kind in (int, float, str):
+        native = np.array([v for v in values if type(v) is kind])
+        assert gen_type.validate_batch(
+            native.reshape(-1, 1)
+        ).ravel().tolist() == [gen_type.validate(v) for v in native.tolist()]
+
+
+@pytest.mark.parametrize(
+    "gen_type",
+    [
+        gtypes.BinaryType(),
+        gtypes.IntType(-3, 3),
+        gtypes.IntType(0, 2**70),
+        gtypes.FloatType(0, 1, 1),
+        gtypes.StrType("uppercase"),
+    ],
+)
+def test_sample(gen_type):
+    values = gen_type.sample(5000, np.random.default_rng(0))
+    assert values.shape == (5000,) and values.dtype == gen_type.dtype
+    assert gen_type.validate_batch(values).all()
+    assert (values == gen_type.sample(5000, 0)).all()
+    random.seed(1)
+    first = gen_type.sample(10)
+    random.seed(1)
+    assert (first == gen_type.sample(10)).all()
+    if not isinstance(gen_type, gtypes.IntType) or gen_type.max_val < 10:
+        assert len(set(values.tolist())) == len(
+            set(gen_type.get_random_val() for _ in range(5000))
+        )
+
+
+def test_interning():
+    assert gtypes.IntType(8, 4) is gtypes.IntType(4, 8)
+    assert gtypes.FloatType(9, 0) is gtypes.FloatType()
+    assert gtypes.StrType("lowercase") is not gtypes.StrType()
+    assert (
+        len({gtypes.BinaryType(), gtypes.BinaryType(), gtypes.IntType()}) == 2
+    )
+    t = pickle.loads(pickle.dumps(gtypes.IntType(1, 5)))
+    assert t == gtypes.IntType(1, 5) and hash(t) == hash(gtypes.IntType(1, 5))
+    assert gtypes.intern(t) is gtypes.IntType(1, 5)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import evaluators
+import gbase
+import gobjs2
+import gtypes
+import instrument
+
+
+def onemax(genomes):
+    return genomes.sum(axis=1)
+
+
+def test_disabled_instrumentation():
+    assert instrument.active is None
+    with instrument.phase("anything") as p:
+        assert p is instrument._NULL_PHASE
+    instrument.count("anything")
+
+    @instrument.timed("double")
+    def double(x):
+        return 2 * x
+
+    @instrument.timed("double_async")
+    async def double_async(x):
+        return 2 * x
+
+    assert double(2) == 4
+    assert asyncio.run(double_async(2)) == 4
+    with instrument.Profiler() as profiler:
+        assert double(2) == 4
+        assert asyncio.run(double_async(2)) == 4
+        with instrument.Profiler(trace=False) as inner:
+            double(1)
+        assert instrument.active is profiler
+    assert instrument.active is None
+    assert [r["name"] for r in profiler.summary()].count("double") == 1
+    assert [r["calls"] for r in inner.summary()] == [1]
+
+
+def test_profile_galgo(tmp_path):
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 8)
+    cache = evaluators.CachedEvaluator(evaluators.BatchEvaluator())
+    galgo = gbase.GAlgo(
+        ct, onemax, population_size=20, evaluator=cache, max_generations=5
+    )
+    events = []
+    profiler = instrument.Profiler()
+    profiler.add_callback(lambda *event: events.append(event))
+    with profiler:
+        galgo.run()
+        gobjs2.PopulationMatrix([[0] * 8] * 3, ct)
+
+    calls = {row["name"]: row["calls"] for row in profiler.summary()}
+    assert calls["generation"] == calls["fitness"] == 5
+    assert calls["crossover"] == calls["selection"] == calls["mutation"] == 4
+    assert calls["initialization"] == calls["generate"] == 1
+    counters = profiler.counters
+    assert counters["evaluations"] == galgo.evaluations == 100
+    assert counters["cache_hits"] == cache.hits
+    assert counters["cache_misses"] == cache.misses
+    assert counters["validations"] == 24
+    assert len(events) == sum(calls.values())
+    assert "fitness" in profiler.format_summary()
+
+    path = tmp_path / "trace.json"
+    profiler.write_trace(path)
+    with open(path) as f:
+        trace = json.load(f)["traceEvents"]
+    complete = [e for e in trace if e["ph"] == "X"]
+    assert len(complete) == len(events)
+    assert all(e["dur"] >= 0 for e in complete)
+    generation = next(e for e in complete if e["name"] == "generation")
+    fitness = next(e for e in complete if e["name"] == "fitness")
+    assert generation["ts"] <= fitness["ts"]
+    assert (
+        fitness["ts"] + fitness["dur"] <= generation["ts"] + generation["dur"]
+    )
+    assert any(e["ph"] == "C" for e in trace)
+
+
+def test_profiler_max_events():
+    profiler = instrument.Profiler(max_events=3)
+    with profiler:
+        for _ in range(5):
+            with instrument.phase("step", index=1):
+                pass
+    assert len(profiler.trace()["traceEvents"]) == 3
+    assert profiler.dropped_events == 2
+    assert profiler.summary()[0]["calls"] == 5
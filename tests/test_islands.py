@@ -0,0 +1,102 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import evaluators
+import gobjs2
+import gtypes
+import islands
+
+ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 64)
+
+
+def onemax(genomes):
+    return genomes.sum(axis=1)
+
+
+def failing(genomes):
+    raise RuntimeError("fitness failed")
+
+
+def make_model(**kwargs):
+    kwargs = {
+        "islands_count": 3,
+        "population_size": 20,
+        "evaluator": evaluators.BatchEvaluator(),
+        "rng": 0,
+        **kwargs,
+    }
+    return islands.IslandModel(ct, onemax, **kwargs)
+
+
+@pytest.mark.parametrize("topology", islands.TOPOLOGIES)
+def test_island_model_target_fitness(topology):
+    model = make_model(
+        topology=topology,
+        migration_interval=5,
+        max_generations=1000,
+        target_fitness=64,
+    )
+    best = model.run()
+    assert model.stop_reason == "target_fitness"
+    assert best.fitness == 64
+    assert best.genome.tolist() == [1] * 64
+
+
+def test_island_model_budget_and_reproducibility():
+    results = []
+    for _ in range(2):
+        model = make_model(max_generations=12, migration_interval=5)
+        best = model.run()
+        assert model.stop_reason == "max_generations"
+        assert model.generation == 12
+        assert model.evaluations == 3 * 12 * 20
+        results.append((best.genome.tolist(), best.fitness))
+    assert results[0] == results[1]
+
+
+def test_island_model_run_twice():
+    model = make_model(max_generations=12, migration_interval=5)
+    results = []
+    for _ in range(2):
+        best = model.run()
+        results.append((best.genome.tolist(), best.fitness))
+    assert results[0] == results[1]
+
+
+def test_island_model_route():
+    model = make_model(migrants_count=2, topology="full")
+    migrants = [
+        (np.full((2, 64), i, dtype=np.uint8), np.array([i, i + 0.5]))
+        for i in range(3)
+    ]
+    immigrants = model._route(migrants, np.random.default_rng(0))
+    assert [m[:, 0].tolist() for m in immigrants] == [[2, 2], [2, 2], [1, 1]]
+
+    model = make_model(migrants_count=2, topology="ring")
+    immigrants = model._route(migrants, np.random.default_rng(0))
+    assert [m[0, 0] for m in immigrants] == [2, 0, 1]
+
+    model = make_model(migrants_count=2, topology="random")
+    immigrants = model._route(migrants, np.random.default_rng(0))
+    assert all(m[0, 0] != i for i, m in enumerate(immigrants))
+
+
+def test_island_model_errors():
+    with pytest.raises(ValueError):
+        make_model(topology="star")
+    with pytest.raises(ValueError):
+        make_model(migrants_count=20)
+    model = islands.IslandModel(
+        ct,
+        failing,
+        islands_count=2,
+        population_size=20,
+        evaluator=evaluators.BatchEvaluator(),
+    )
+    with pytest.raises(RuntimeError):
+        model.run()
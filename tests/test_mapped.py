@@ -0,0 +1,126 @@
+import gc
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import evaluators
+import gobjs2
+import gtypes
+import mapped
+
+ct = gobjs2.ChromosomeTemplate([gtypes.IntType(0, 9)] * 10)
+
+
+def fitness_batch_sum(genomes):
+    return genomes.sum(axis=1)
+
+
+def make_populations(size=100, chunk_size=16, directory=None):
+    matrix = gobjs2.PopulationMatrix.generate_random_population(size, ct)
+    population = mapped.MappedPopulation(
+        matrix.genomes, ct, chunk_size=chunk_size, directory=directory
+    )
+    return matrix, population
+
+
+def test_mapped_population_file(tmp_path):
+    matrix, population = make_populations(directory=tmp_path)
+    assert isinstance(population.genomes, np.memmap)
+    assert os.path.dirname(population.path) == str(tmp_path)
+    path = population.path
+    population.flush()
+    opened = mapped.MappedPopulation.open(path, ct, mode="r")
+    assert np.array_equal(opened.genomes, matrix.genomes)
+    del population, opened
+    gc.collect()
+    assert not os.path.exists(path)
+
+    kept = mapped.MappedPopulation(matrix.genomes, ct, path=tmp_path / "g.npy")
+    del kept
+    gc.collect()
+    assert os.listdir(tmp_path) == ["g.npy"]
+
+    with pytest.raises(ValueError):
+        mapped.MappedPopulation([[10] * 10], ct)
+    with pytest.raises(ValueError):
+        mapped.MappedPopulation.open(
+            tmp_path / "g.npy", gobjs2.ChromosomeTemplate()
+        )
+    with pytest.raises(ValueError):
+        mapped.MappedPopulation.create(
+            2, gobjs2.ChromosomeTemplate([gtypes.IntType(), gtypes.StrType()])
+        )
+
+
+@pytest.mark.parametrize("mode", ["maximize", "minimize"])
+def test_mapped_fitness_and_parents(mode):
+    matrix, population = make_populations()
+    chunks = []
+
+    def func(genomes):
+        chunks.append(len(genomes))
+        return fitness_batch_sum(genomes)
+
+    population.fitness(func, mode, evaluators.BatchEvaluator())
+    matrix.fitness(fitness_batch_sum, mode, evaluators.BatchEvaluator())
+    assert max(chunks) == 16 and sum(chunks) == 100
+
+    parents = population.get_parents(10)
+    assert isinstance(parents, mapped.MappedPopulation)
+    assert np.array_equal(parents.genomes, matrix.get_parents(10).genomes)
+    assert np.array_equal(population.genomes, matrix.genomes)
+    assert np.array_equal(population.fitness_array, matrix.fitness_array)
+
+
+def test_mapped_crossover():
+    matrix, population = make_populations(chunk_size=1000)
+    offspring = [
+        gobjs2.UniformCrossover(
+            parents, 60, rng=np.random.default_rng(0)
+        ).generate_new_population()
+        for parents in (matrix, population)
+    ]
+    assert isinstance(offspring[1], mapped.MappedPopulation)
+    assert np.array_equal(offspring[0].genomes, offspring[1].genomes)
+
+    population = mapped.MappedPopulation(
+        np.arange(100)[:, np.newaxis] % 10 * np.ones(10, int), ct, chunk_size=7
+    )
+    offspring = gobjs2.OnePointCrossover(
+        population, 60, proportionate_selection=False
+    ).generate_new_population()
+    genomes = offspring.genomes
+    assert genomes.shape == (60, 10)
+    for child1, child2 in zip(genomes[0::2], genomes[1::2]):
+        a, b = child1[0], child2[0]
+        assert any(
+            child1.tolist() == [a] * cut + [b] * (10 - cut)
+            and child2.tolist() == [b] * cut + [a] * (10 - cut)
+            for cut in range(1, 10)
+        )
+
+
+def test_mapped_process_pool():
+    matrix, population = make_populations()
+    with evaluators.ProcessPoolEvaluator(2, batch=True) as e:
+        population.fitness(fitness_batch_sum, evaluator=e)
+    matrix.fitness(fitness_batch_sum, evaluator=evaluators.BatchEvaluator())
+    assert np.array_equal(population.fitness_array, matrix.fitness_array)
+
+
+def test_mapped_process_pool_recreated_file(tmp_path):
+    path = tmp_path / "g.npy"
+    with evaluators.ProcessPoolEvaluator(1, batch=True) as e:
+        for value in (1, 2):
+            population = mapped.MappedPopulation.create(4, ct, path)
+            population.genomes[:] = value
+            population.genomes.flush()
+            population.fitness(fitness_batch_sum, evaluator=e)
+            assert population.fitness_array.tolist() == [10.0 * value] * 4
+            del population
+            gc.collect()
+            os.remove(path)
@@ -0,0 +1,75 @@
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import gobjs2
+import gtypes
+import mutation
+
+types_list = (
+    [gtypes.BinaryType()] * 3
+    + [gtypes.IntType(0, 5)] * 3
+    + [gtypes.IntType(-3, 3)] * 3
+    + [gtypes.FloatType(0, 1, 2)] * 3
+    + [gtypes.StrType("lowercase")] * 3
+)
+
+mutation_data = [
+    (mutation.FlipMutation, {}, gtypes.BinaryType),
+    (mutation.RandomResetMutation, {}, gtypes.IntType),
+    (mutation.CreepMutation, {"step": 2}, gtypes.IntType),
+    (mutation.GaussianMutation, {}, gtypes.FloatType),
+    (mutation.GaussianMutation, {"sigma": 5}, gtypes.FloatType),
+    (mutation.AlphabetResetMutation, {}, gtypes.StrType),
+]
+
+
+@pytest.mark.parametrize("operator, kwargs, gene_type_class", mutation_data)
+def test_mutation_matrix(operator, kwargs, gene_type_class):
+    ct = gobjs2.ChromosomeTemplate(types_list)
+    population = gobjs2.PopulationMatrix.generate_random_population(200, ct)
+    genomes = population.genomes.copy()
+    result = operator(population, 0.5, **kwargs).apply_mutation()
+    assert result is population
+
+    changed = genomes != population.genomes
+    eligible = [isinstance(t, gene_type_class) for t in types_list]
+    assert changed.any(axis=0).tolist() == eligible
+    for row, col in zip(*np.nonzero(changed)):
+        value = population[int(row)][int(col)].value
+        assert types_list[col].validate(value)
+
+
+@pytest.mark.parametrize("operator, kwargs, gene_type_class", mutation_data)
+def test_mutation_population(operator, kwargs, gene_type_class):
+    random.seed(0)
+    ct = gobjs2.ChromosomeTemplate([gene_type_class()] * 6)
+    parents = gobjs2.PopulationMatrix.generate_random_population(20, ct)
+    population = gobjs2.OnePointCrossover(
+        parents.to_population().chromosome_list, 20
+    ).generate_new_population()
+    genes = [g for c in population.chromosome_list for g in c.genes_list]
+    values = [g.value for g in genes]
+    operator(population, 0.5, **kwargs).apply_mutation()
+    assert [g.value for g in genes] == values
+    assert population.genomes.tolist() != parents.genomes.tolist()
+
+
+def test_mutation_rate_bounds():
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 100)
+    population = gobjs2.PopulationMatrix._wrap(
+        np.zeros((100, 100), dtype=np.uint8), ct
+    )
+    mutation.FlipMutation(population, 0).apply_mutation()
+    assert population.genomes.sum() == 0
+    mutation.FlipMutation(population, 0.1).apply_mutation()
+    assert 800 < population.genomes.sum() < 1200
+    mutation.FlipMutation(population, 1).apply_mutation()
+    assert population.genomes.sum() > 8800
+    with pytest.raises(ValueError):
+        mutation.FlipMutation(population, 1.5)
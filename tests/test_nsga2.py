@@ -0,0 +1,151 @@
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import evaluators
+import gobjs2
+import gtypes
+import nsga2
+
+
+def brute_force_ranks(objectives):
+    # Minimization; Deb's front peeling over the full dominance matrix.
+    no_worse = (objectives[:, None] <= objectives[None, :]).all(axis=2)
+    better = (objectives[:, None] < objectives[None, :]).any(axis=2)
+    dominates = no_worse & better
+    ranks = np.full(len(objectives), -1)
+    remaining = np.ones(len(objectives), dtype=bool)
+    front = 0
+    while remaining.any():
+        current = remaining & ~dominates[remaining].any(axis=0)
+        ranks[current] = front
+        remaining &= ~current
+        front += 1
+    return ranks
+
+
+@pytest.mark.parametrize("objectives_count", [1, 2, 3, 4])
+@pytest.mark.parametrize("levels", [3, 10, None])
+def test_non_dominated_sort(objectives_count, levels):
+    rng = np.random.default_rng(objectives_count)
+    size = (300, objectives_count)
+    if levels is None:
+        objectives = rng.random(size)
+    else:
+        # Many ties and duplicate rows.
+        objectives = rng.integers(levels, size=size).astype(float)
+    expected = brute_force_ranks(objectives)
+    ranks = nsga2.non_dominated_sort(objectives, mode="minimize")
+    assert ranks.tolist() == expected.tolist()
+    assert nsga2.non_dominated_sort(-objectives).tolist() == expected.tolist()
+
+
+def test_non_dominated_sort_modes():
+    objectives = np.array([[1, 5, 0], [2, 4, 0], [2, 5, 1], [0, 0, 0]])
+    ranks = nsga2.non_dominated_sort(objectives, ["maximize"] * 3)
+    assert ranks.tolist() == [1, 1, 0, 2]
+    ranks = nsga2.non_dominated_sort(
+        objectives, ("maximize", "minimize", "minimize")
+    )
+    assert ranks.tolist() == [1, 0, 1, 0]
+    assert nsga2.non_dominated_sort(np.zeros((0, 3))).tolist() == []
+    with pytest.raises(ValueError):
+        nsga2.non_dominated_sort(objectives, ["maximize"] * 2)
+
+
+@pytest.mark.parametrize("objectives_count", [2, 3])
+def test_non_dominated_sort_speed(objectives_count):
+    objectives = np.random.default_rng(0).random((20000, objectives_count))
+    start = time.perf_counter()
+    nsga2.non_dominated_sort(objectives)
+    assert time.perf_counter() - start < 1
+
+
+def test_crowding_distance():
+    objectives = np.array([[0, 4], [1, 2], [2, 1], [4, 0], [3, 3], [5, 5]])
+    ranks = np.array([0, 0, 0, 0, 1, 1])
+    distance = nsga2.crowding_distance(objectives, ranks)
+    assert distance[[0, 3, 4, 5]].tolist() == [np.inf] * 4
+    assert distance[1] == pytest.approx(2 / 4 + 3 / 4)
+    assert distance[2] == pytest.approx(3 / 4 + 2 / 4)
+    order = nsga2.crowded_order(ranks, distance)
+    assert order[:2].tolist() == [0, 3]
+    assert sorted(order[2:4].tolist()) == [1, 2]
+
+
+def zdt1(genomes):
+    x = genomes / 1000
+    g = 1 + 9 * x[:, 1:].mean(axis=1)
+    first = x[:, 0]
+    return np.stack([first, g * (1 - np.sqrt(first / g))], axis=1)
+
+
+def test_nsga2_zdt1():
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType(0, 1000)] * 10)
+    galgo = nsga2.NSGA2(
+        ct,
+        zdt1,
+        population_size=60,
+        mode="minimize",
+        evaluator=evaluators.BatchEvaluator(),
+        max_generations=80,
+        rng=0,
+    )
+    galgo.reset()
+    galgo.step()
+    initial = galgo.objectives[:, 1].mean()
+    genomes, objectives = galgo.run()
+    assert galgo.stop_reason == "max_generations"
+    assert galgo.generation == 80
+    assert galgo.evaluations == 80 * 60
+    assert objectives.tolist() == zdt1(genomes).tolist()
+    assert (nsga2.non_dominated_sort(objectives, "minimize") == 0).all()
+    assert objectives[:, 1].mean() < initial / 2
+    assert objectives[:, 0].max() - objectives[:, 0].min() > 0.5
+
+    ranks = galgo.ranks
+    assert (np.diff(ranks) >= 0).all()
+    assert galgo.population.fitness_array.tolist() == list(range(60, 0, -1))
+    assert galgo.objectives.tolist() == zdt1(galgo.population.genomes).tolist()
+
+
+def test_nsga2_serial_evaluator_and_budget():
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 8)
+    galgo = nsga2.NSGA2(
+        ct,
+        lambda c: (sum(c.values[:4]), -sum(c.values[4:])),
+        population_size=10,
+        max_evaluations=35,
+        rng=1,
+    )
+    genomes, objectives = galgo.run()
+    assert galgo.stop_reason == "max_evaluations"
+    assert galgo.evaluations == 30
+    assert objectives.shape[1] == 2
+    with pytest.raises(ValueError):
+        nsga2.NSGA2(ct, len, mode=["maximize", "up"])
+    with pytest.raises(ValueError):
+        nsga2.NSGA2(ct, len).pareto_front()
+
+
+def test_nsga2_random_seed():
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType(0, 1000)] * 10)
+    results = []
+    for _ in range(2):
+        random.seed(0)
+        galgo = nsga2.NSGA2(
+            ct,
+            zdt1,
+            population_size=20,
+            mode="minimize",
+            evaluator=evaluators.BatchEvaluator(),
+            max_generations=5,
+        )
+        results.append(galgo.run()[0].tolist())
+    assert results[0] == results[1]
@@ -0,0 +1,79 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import gobjs2
+import gtypes
+import selection
+
+fitness = [0.0, 1.0, 2.0, 3.0, 4.0, 10.0]
+
+
+@pytest.mark.parametrize(
+    "strategy",
+    [selection.RouletteSelection(), selection.StochasticUniversalSampling()],
+)
+def test_proportionate_selection(strategy):
+    rng = np.random.default_rng(0)
+    strategy.prepare(fitness)
+    counts = np.bincount(strategy.select(100000, rng), minlength=len(fitness))
+    expected = np.array(fitness) / sum(fitness) * 100000
+    assert counts[0] == 0
+    assert np.abs(counts - expected).max() < 600
+    if isinstance(strategy, selection.StochasticUniversalSampling):
+        assert np.abs(counts - expected).max() <= 1
+
+
+@pytest.mark.parametrize(
+    "strategy",
+    [selection.RouletteSelection(), selection.StochasticUniversalSampling()],
+)
+def test_proportionate_selection_zero_fitness(strategy):
+    strategy.prepare([0, 0, 0, 0])
+    counts = np.bincount(strategy.select(4000, np.random.default_rng(0)))
+    assert counts.min() > 900
+    with pytest.raises(ValueError):
+        strategy.prepare([1, -1])
+
+
+def test_random_selection_pairs():
+    strategy = selection.RandomSelection()
+    strategy.prepare([1, 2])
+    pairs = strategy.select_pairs(1000, np.random.default_rng(0))
+    assert (pairs[:, 0] != pairs[:, 1]).all()
+    strategy.prepare([1])
+    with pytest.raises(ValueError):
+        strategy.select_pairs(1, np.random.default_rng(0))
+
+
+@pytest.mark.parametrize("mode, best", [("maximize", 5), ("minimize", 0)])
+def test_tournament_selection(mode, best):
+    strategy = selection.TournamentSelection(50, mode)
+    strategy.prepare(fitness)
+    selected = strategy.select(1000, np.random.default_rng(0))
+    assert (selected == best).mean() > 0.99
+    strategy = selection.TournamentSelection(1, mode)
+    strategy.prepare(fitness)
+    selected = strategy.select(6000, np.random.default_rng(0))
+    assert np.bincount(selected).min() > 800
+
+
+@pytest.mark.parametrize("as_matrix", [True, False])
+def test_crossover_selection(as_matrix):
+    ct = gobjs2.ChromosomeTemplate([gtypes.IntType()] * 4)
+    parents = gobjs2.PopulationMatrix(
+        [[0] * 4, [1] * 4, [2] * 4], ct, fitness=[3.0, 2.0, 1.0]
+    )
+    if not as_matrix:
+        parents = parents.to_population().chromosome_list
+    new_population = gobjs2.OnePointCrossover(
+        parents,
+        100,
+        rng=np.random.default_rng(0),
+        selection=selection.TournamentSelection(20, "minimize"),
+    ).generate_new_population()
+    assert (new_population.genomes == 2).mean() > 0.99
@@ -0,0 +1,86 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.getcwd(), "galgopy"))
+
+import evaluators
+import gbase
+import gobjs2
+import gtypes
+import stats
+
+
+def test_running_stats():
+    values = np.random.default_rng(0).normal(5, 3, 1000)
+    running = stats.RunningStats()
+    assert np.isnan(running.mean)
+    for start, stop in [(0, 1), (1, 300), (300, 300), (300, 1000)]:
+        running.update(values[start:stop])
+    assert running.count == 1000
+    assert running.mean == pytest.approx(values.mean())
+    assert running.std == pytest.approx(values.std())
+    assert (running.min, running.max) == (values.min(), values.max())
+    chunked = stats.fitness_stats(values, chunk_size=7)
+    assert chunked.std == pytest.approx(values.std())
+
+
+@pytest.mark.parametrize(
+    "genomes",
+    [
+        np.random.default_rng(0).integers(0, 3, (40, 6)).astype(np.uint8),
+        np.random.default_rng(0).integers(-500, 500, (40, 6)),
+        np.random.default_rng(0).random((40, 6)).round(1),
+        np.random.default_rng(0).choice(list("abc"), (40, 6)),
+        np.zeros((40, 6)),
+    ],
+)
+def test_diversity(genomes, monkeypatch):
+    differ = genomes[:, np.newaxis, :] != genomes[np.newaxis, :, :]
+    expected = differ.mean()
+    assert stats.diversity(genomes) == pytest.approx(expected)
+    monkeypatch.setattr(stats, "BLOCK_CELLS", 100)
+    assert stats.diversity(genomes) == pytest.approx(expected)
+
+
+def test_galgo_iterate():
+    ct = gobjs2.ChromosomeTemplate([gtypes.BinaryType()] * 30)
+    galgo = gbase.GAlgo(
+        ct,
+        lambda genomes: genomes.sum(axis=1),
+        population_size=50,
+        evaluator=evaluators.BatchEvaluator(),
+        max_generations=20,
+        rng=0,
+    )
+    snapshots = galgo.iterate()
+    for snapshot in snapshots:
+        population = galgo._evaluated
+        fitness = population.fitness_array
+        assert snapshot.best_fitness == fitness.max()
+        assert snapshot.best_genome.sum() == fitness.max()
+        assert snapshot.mean_fitness == pytest.approx(fitness.mean())
+        assert snapshot.std_fitness == pytest.approx(fitness.std())
+        assert snapshot.diversity == pytest.approx(
+            stats.diversity(population.genomes)
+        )
+        if snapshot.generation == 5:
+            break
+    assert galgo.generation == 5
+    assert not galgo.step()
+
+    snapshots = list(galgo.iterate(diversity=False))
+    assert [s.generation for s in snapshots] == list(range(1, 21))
+    assert snapshots[-1].diversity is None
+    assert galgo.stop_reason == "max_generations"
+
+
+def test_crossover_does_not_print(capsys):
+    ct = gobjs2.ChromosomeTemplate()
+    parents = gobjs2.Population.generate_random_population(10, ct)
+    gobjs2.OnePointCrossover(
+        parents.chromosome_list, 10
+    ).generate_new_population()
+    assert capsys.readouterr().out == ""